@@ -16,9 +16,8 @@ from utils.logger import get_logger
 from tools.wikipedia_search import wikipedia_search
 from tools.google_news_discovery import google_news_discovery_run
 from tools.jikan_search import jikan_search
-from tools.embedding_search import embedding_search
+from tools.hybrid_search import hybrid_search
 from tools.social_media_search import social_media_search, social_media_trending_search
-from tools.search_articles import search_articles
 from tools.web_search import run_browser_search
 
 load_dotenv()
@@ -71,10 +70,9 @@ def search_agent_run(agent: Agent, query: str) -> str:
             DuckDuckGoTools(),
             wikipedia_search,
             jikan_search,
-            embedding_search,
+            hybrid_search,
             social_media_search,
             social_media_trending_search,
-            search_articles,
             run_browser_search,
         ],
         session_id=session_id,
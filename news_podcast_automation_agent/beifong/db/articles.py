@@ -1,25 +1,32 @@
 import json
-from datetime import datetime
-from .connection import db_connection, execute_query
+from datetime import datetime, timezone
+from .bulk import bulk_insert_ignore, bulk_update
+from .config import get_attach_paths
+from .connection import execute_query
+from .rollups import CATEGORY_COUNTS_SQL
+from .timestamps import apply_epoch_range, to_epoch_or_now
+from .writer import execute_write_many, run_write
 
 
 def store_crawled_article(tracking_db_path, entry, raw_content, metadata):
     metadata_json = json.dumps(metadata)
     query = """
     INSERT INTO crawled_articles 
-    (entry_id, source_id, feed_id, title, url, published_date, raw_content, metadata)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    (entry_id, source_id, feed_id, title, url, published_date, raw_content, metadata, published_ts)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
     try:
+        published_date = entry.get("published_date", datetime.now(timezone.utc).isoformat())
         params = (
             entry["id"],
             entry.get("source_id"),
             entry.get("feed_id"),
             entry.get("title", ""),
             entry.get("link", ""),
-            entry.get("published_date", datetime.now().isoformat()),
+            published_date,
             raw_content,
             metadata_json,
+            to_epoch_or_now(published_date),
         )
         execute_query(tracking_db_path, query, params)
         return True
@@ -27,6 +34,57 @@ def store_crawled_article(tracking_db_path, entry, raw_content, metadata):
         return False
 
 
+def store_crawl_results(tracking_db_path, crawled, entry_statuses=None):
+    """
+    Write one crawl batch in a single transaction.
+
+    `crawled` holds (entry, raw_content, metadata) tuples for the pages that were
+    fetched; `entry_statuses` maps the ids of the remaining entries to their status.
+    Articles are bulk-inserted with duplicate URLs skipped, and every entry's crawl
+    status and attempt counter is updated with one executemany.
+
+    Returns:
+        Dict of entry id to final crawl status
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        (
+            entry["id"],
+            entry.get("source_id"),
+            entry.get("feed_id"),
+            entry.get("title", ""),
+            entry.get("link", ""),
+            entry.get("published_date", now),
+            raw_content,
+            json.dumps(metadata),
+            to_epoch_or_now(entry.get("published_date", now)),
+        )
+        for entry, raw_content, metadata in crawled
+    ]
+    statuses = dict(entry_statuses or {})
+
+    def write(conn):
+        bulk_insert_ignore(
+            conn, "crawled_articles", ["entry_id", "source_id", "feed_id", "title", "url", "published_date", "raw_content", "metadata", "published_ts"], rows
+        )
+        entry_ids = [entry["id"] for entry, _, _ in crawled]
+        stored = set()
+        for i in range(0, len(entry_ids), 500):
+            chunk = entry_ids[i : i + 500]
+            placeholders = ",".join(["?"] * len(chunk))
+            stored.update(row["entry_id"] for row in conn.execute(f"SELECT entry_id FROM crawled_articles WHERE entry_id IN ({placeholders})", chunk))
+        for entry_id in entry_ids:
+            statuses[entry_id] = "success" if entry_id in stored else "failed"
+        bulk_update(
+            conn,
+            "UPDATE feed_entries SET crawl_attempts = crawl_attempts + 1, crawl_status = ? WHERE id = ?",
+            [(status, entry_id) for entry_id, status in statuses.items()],
+        )
+        return statuses
+
+    return run_write(tracking_db_path, write)
+
+
 def update_entry_status(tracking_db_path, entry_id, status):
     query = """
     UPDATE feed_entries
@@ -44,7 +102,7 @@ def get_unprocessed_articles(tracking_db_path, limit=5, max_attempts=1):
     WHERE (ai_status = 'pending' OR ai_status = 'error')
           AND ai_attempts < ?
           AND processed = 0
-    ORDER BY published_date DESC
+    ORDER BY published_ts DESC
     LIMIT ?
     """
     articles = execute_query(tracking_db_path, query, (max_attempts, limit), fetch=True)
@@ -72,23 +130,20 @@ def reset_stuck_articles(tracking_db_path):
 def mark_articles_as_processing(tracking_db_path, article_ids):
     if not article_ids:
         return 0
-    with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        placeholders = ",".join(["?"] * len(article_ids))
-        query = f"""
-        UPDATE crawled_articles 
-        SET ai_status = 'processing' 
-        WHERE id IN ({placeholders})
-        """
-        cursor.execute(query, article_ids)
-        conn.commit()
-        return cursor.rowcount
+    placeholders = ",".join(["?"] * len(article_ids))
+    query = f"""
+    UPDATE crawled_articles 
+    SET ai_status = 'processing' 
+    WHERE id IN ({placeholders})
+    """
+    return run_write(tracking_db_path, execute_write_many, query, [article_ids])
 
 
 def save_article_categories(tracking_db_path, article_id, categories):
     if not categories:
         return 0
-    with db_connection(tracking_db_path) as conn:
+
+    def write(conn):
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -110,9 +165,10 @@ def save_article_categories(tracking_db_path, article_id, categories):
                 count += 1
             except Exception as _:
                 pass
-        conn.commit()
         return count
 
+    return run_write(tracking_db_path, write)
+
 
 def get_article_categories(tracking_db_path, article_id):
     query = """
@@ -125,7 +181,7 @@ def get_article_categories(tracking_db_path, article_id):
 
 
 def update_article_status(tracking_db_path, article_id, results=None, success=False, error_message=None):
-    with db_connection(tracking_db_path) as conn:
+    def write(conn):
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -153,7 +209,6 @@ def update_article_status(tracking_db_path, article_id, results=None, success=Fa
             """,
                 (results.get("summary", ""), results.get("content", ""), article_id),
             )
-            conn.commit()
             if categories:
                 save_article_categories(tracking_db_path, article_id, categories)
         else:
@@ -173,9 +228,10 @@ def update_article_status(tracking_db_path, article_id, results=None, success=Fa
             """,
                 (article_id,),
             )
-            conn.commit()
         return cursor.rowcount
 
+    return run_write(tracking_db_path, write)
+
 
 def get_articles_by_date_range(tracking_db_path, start_date=None, end_date=None, limit=None, offset=0):
     query_parts = [
@@ -186,13 +242,8 @@ def get_articles_by_date_range(tracking_db_path, start_date=None, end_date=None,
         "AND ca.ai_status = 'success'",
     ]
     query_params = []
-    if start_date:
-        query_parts.append("AND ca.published_date >= ?")
-        query_params.append(start_date)
-    if end_date:
-        query_parts.append("AND ca.published_date <= ?")
-        query_params.append(end_date)
-    query_parts.append("ORDER BY ca.published_date DESC")
+    apply_epoch_range(query_parts, query_params, "ca.published_ts", start_date, end_date)
+    query_parts.append("ORDER BY ca.published_ts DESC")
     if limit is not None:
         query_parts.append("LIMIT ? OFFSET ?")
         query_params.append(limit)
@@ -228,36 +279,31 @@ def get_articles_by_category(tracking_db_path, category, limit=20, offset=0):
     WHERE ac.category_name = ?
     AND ca.processed = 1
     AND ca.ai_status = 'success'
-    ORDER BY ca.published_date DESC
+    ORDER BY ca.published_ts DESC
     LIMIT ? OFFSET ?
     """
     return execute_query(tracking_db_path, query, (category, limit, offset), fetch=True)
 
 
 def get_article_stats(tracking_db_path):
+    # Read from the trigger-maintained value_counts rollup (db/rollups.py)
     query = """
     SELECT 
-        COUNT(*) as total_articles,
-        SUM(CASE WHEN processed = 1 THEN 1 ELSE 0 END) as processed_articles,
-        SUM(CASE WHEN ai_status = 'pending' THEN 1 ELSE 0 END) as pending_articles,
-        SUM(CASE WHEN ai_status = 'processing' THEN 1 ELSE 0 END) as processing_articles,
-        SUM(CASE WHEN ai_status = 'success' THEN 1 ELSE 0 END) as success_articles,
-        SUM(CASE WHEN ai_status = 'error' THEN 1 ELSE 0 END) as error_articles,
-        SUM(CASE WHEN ai_status = 'failed' THEN 1 ELSE 0 END) as failed_articles
-    FROM crawled_articles
+        COALESCE(SUM(CASE WHEN column_name = 'ai_status' THEN row_count END), 0) as total_articles,
+        COALESCE(SUM(CASE WHEN column_name = 'processed' AND value = '1' THEN row_count END), 0) as processed_articles,
+        COALESCE(SUM(CASE WHEN column_name = 'ai_status' AND value = 'pending' THEN row_count END), 0) as pending_articles,
+        COALESCE(SUM(CASE WHEN column_name = 'ai_status' AND value = 'processing' THEN row_count END), 0) as processing_articles,
+        COALESCE(SUM(CASE WHEN column_name = 'ai_status' AND value = 'success' THEN row_count END), 0) as success_articles,
+        COALESCE(SUM(CASE WHEN column_name = 'ai_status' AND value = 'error' THEN row_count END), 0) as error_articles,
+        COALESCE(SUM(CASE WHEN column_name = 'ai_status' AND value = 'failed' THEN row_count END), 0) as failed_articles
+    FROM value_counts
+    WHERE table_name = 'crawled_articles'
     """
     return execute_query(tracking_db_path, query, fetch=True, fetch_one=True)
 
 
 def get_categories_with_counts(tracking_db_path, limit=20):
-    query = """
-    SELECT category_name, COUNT(*) as article_count
-    FROM article_categories
-    GROUP BY category_name
-    ORDER BY article_count DESC
-    LIMIT ?
-    """
-    return execute_query(tracking_db_path, query, (limit,), fetch=True)
+    return execute_query(tracking_db_path, f"{CATEGORY_COUNTS_SQL} LIMIT ?", (limit,), fetch=True)
 
 
 def get_articles_with_source_info(tracking_db_path, limit=20, offset=0):
@@ -266,11 +312,64 @@ def get_articles_with_source_info(tracking_db_path, limit=20, offset=0):
            ft.feed_url, s.name as source_name
     FROM crawled_articles ca
     LEFT JOIN feed_tracking ft ON ca.feed_id = ft.feed_id
-    LEFT JOIN source_feeds sf ON ca.feed_id = sf.id
-    LEFT JOIN sources s ON sf.source_id = s.id
+    LEFT JOIN sources.source_feeds sf ON ca.feed_id = sf.id
+    LEFT JOIN sources.sources s ON sf.source_id = s.id
     WHERE ca.processed = 1 
     AND ca.ai_status = 'success'
-    ORDER BY ca.published_date DESC
+    ORDER BY ca.published_ts DESC
     LIMIT ? OFFSET ?
     """
-    return execute_query(tracking_db_path, query, (limit, offset), fetch=True)
+    return execute_query(tracking_db_path, query, (limit, offset), fetch=True, attach=get_attach_paths("sources"))
+
+
+def build_article_filter_clause(from_date=None, to_date=None, source_ids=None, categories=None):
+    clauses = []
+    params = []
+    apply_epoch_range(clauses, params, "ca.published_ts", from_date, to_date, prefix="")
+    if source_ids:
+        placeholders = ",".join(["?"] * len(source_ids))
+        clauses.append(f"ca.source_id IN ({placeholders})")
+        params.extend(source_ids)
+    if categories:
+        placeholders = ",".join(["?"] * len(categories))
+        clauses.append(f"EXISTS (SELECT 1 FROM article_categories ac WHERE ac.article_id = ca.id AND ac.category_name IN ({placeholders}))")
+        params.extend([category.lower().strip() for category in categories])
+    return " AND ".join(clauses), params
+
+
+def get_article_ids_matching_filters(tracking_db_path, from_date=None, to_date=None, source_ids=None, categories=None, limit=None):
+    filter_clause, params = build_article_filter_clause(from_date, to_date, source_ids, categories)
+    query = "SELECT ca.id FROM crawled_articles ca WHERE ca.processed = 1"
+    if filter_clause:
+        query += f" AND {filter_clause}"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return [row["id"] for row in execute_query(tracking_db_path, query, tuple(params), fetch=True)]
+
+
+def filter_article_ids(tracking_db_path, article_ids, from_date=None, to_date=None, source_ids=None, categories=None):
+    if not article_ids:
+        return []
+    filter_clause, params = build_article_filter_clause(from_date, to_date, source_ids, categories)
+    placeholders = ",".join(["?"] * len(article_ids))
+    query = f"SELECT ca.id FROM crawled_articles ca WHERE ca.id IN ({placeholders}) AND ca.processed = 1"
+    if filter_clause:
+        query += f" AND {filter_clause}"
+    matching = {row["id"] for row in execute_query(tracking_db_path, query, tuple(list(article_ids) + params), fetch=True)}
+    return [article_id for article_id in article_ids if article_id in matching]
+
+
+def get_latest_embeddings_for_articles(tracking_db_path, article_ids):
+    if not article_ids:
+        return []
+    placeholders = ",".join(["?"] * len(article_ids))
+    query = f"""
+    SELECT article_id, embedding, vector_offset FROM article_embeddings
+    WHERE id IN (
+        SELECT MAX(id) FROM article_embeddings
+        WHERE article_id IN ({placeholders})
+        GROUP BY article_id
+    )
+    """
+    return execute_query(tracking_db_path, query, tuple(article_ids), fetch=True)
@@ -0,0 +1,57 @@
+DEFAULT_CHUNK_SIZE = 500
+
+
+def build_upsert_sql(table, columns, conflict_columns=None, update_columns=None, update_where=None):
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+    target = f"({', '.join(conflict_columns)})" if conflict_columns else ""
+    if not update_columns:
+        return f"{sql} ON CONFLICT{target} DO NOTHING"
+    if not conflict_columns:
+        raise ValueError("conflict_columns is required for ON CONFLICT DO UPDATE")
+    assignments = [f"{column} = {expression}" for column, expression in normalize_update_columns(update_columns).items()]
+    sql = f"{sql} ON CONFLICT{target} DO UPDATE SET {', '.join(assignments)}"
+    if update_where:
+        sql = f"{sql} WHERE {update_where}"
+    return sql
+
+
+def normalize_update_columns(update_columns):
+    if isinstance(update_columns, dict):
+        return update_columns
+    return {column: f"excluded.{column}" for column in update_columns}
+
+
+def bulk_upsert(conn, table, columns, rows, conflict_columns=None, update_columns=None, update_where=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Insert many rows with executemany and ON CONFLICT handling, without committing.
+
+    Conflicting rows are skipped (DO NOTHING) unless update_columns is given, in which
+    case they are updated from `excluded` (a list of columns, or a dict of column to SQL
+    expression), optionally only when update_where holds. The caller commits, so
+    several bulk writes can share one transaction.
+
+    Returns:
+        Number of rows inserted or updated
+    """
+    if not rows:
+        return 0
+    sql = build_upsert_sql(table, columns, conflict_columns, update_columns, update_where)
+    # cursor.rowcount leaves out rows written by triggers, which conn.total_changes would count
+    changed = 0
+    for i in range(0, len(rows), chunk_size):
+        changed += conn.executemany(sql, rows[i : i + chunk_size]).rowcount
+    return changed
+
+
+def bulk_insert_ignore(conn, table, columns, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Insert rows, skipping any that violate a uniqueness constraint. Returns the inserted count."""
+    return bulk_upsert(conn, table, columns, rows, chunk_size=chunk_size)
+
+
+def bulk_update(conn, sql, params_list, chunk_size=DEFAULT_CHUNK_SIZE):
+    if not params_list:
+        return 0
+    changed = 0
+    for i in range(0, len(params_list), chunk_size):
+        changed += conn.executemany(sql, params_list[i : i + chunk_size]).rowcount
+    return changed
@@ -11,12 +11,16 @@ DEFAULT_DB_PATHS = {
     "tasks_db": "databases/tasks.db",
     "agent_session_db": "databases/agent_sessions.db",
     "faiss_index_db": "databases/faiss/article_index.faiss",
-    "faiss_mapping_file": "databases/faiss/article_id_map.npy",
     "internal_sessions_db": "databases/internal_sessions.db",
     "social_media_db": "databases/social_media.db",
     "slack_sessions_db": "databases/slack_sessions.db",
+    "query_embedding_cache_db": "databases/query_embedding_cache.db",
+    "vector_store": "databases/vectors/article_vectors.bin",
 }
 
+# Schema alias -> database, for attaching one database to another's connection to join across them
+ATTACH_ALIASES = {"sources": "sources_db", "tracking": "tracking_db"}
+
 
 def get_db_path(db_name):
     env_var = f"{db_name.upper()}_PATH"
@@ -47,7 +51,7 @@ def get_agent_session_db_path():
 
 
 def get_faiss_db_path():
-    return get_db_path("faiss_index_db"), get_db_path("faiss_mapping_file")
+    return get_db_path("faiss_index_db")
 
 
 def get_internal_sessions_db_path():
@@ -64,8 +68,20 @@ def get_browser_session_path():
 def get_slack_sessions_db_path():
     return get_db_path("slack_sessions_db")
 
+
+def get_query_embedding_cache_db_path():
+    return get_db_path("query_embedding_cache_db")
+
+
+def get_vector_store_path():
+    return get_db_path("vector_store")
+
 DB_PATH = "databases"
 PODCAST_DIR = "podcasts"
 PODCAST_IMG_DIR = PODCAST_DIR + "/images"
 PODCAST_AUIDO_DIR = PODCAST_DIR + "/audio"
 PODCAST_RECORDINGS_DIR = PODCAST_DIR + "/recordings"
+
+
+def get_attach_paths(*aliases):
+    return {alias: get_db_path(ATTACH_ALIASES[alias]) for alias in aliases}
@@ -1,27 +1,184 @@
+import os
 import sqlite3
+import threading
+import weakref
 from contextlib import contextmanager
+from urllib.request import pathname2url
 
+PRAGMA_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+}
 
-@contextmanager
-def db_connection(db_path):
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+
+def file_identity(db_path):
     try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection that can be weakly referenced, so connections of exited threads are closed by GC."""
+
+
+class ConnectionPool:
+    """
+    Persistent per-thread SQLite connections, one per database file.
+
+    Every thread reuses its own connection to a database instead of opening one per
+    statement, and each connection is set up once with PRAGMA_PROFILE. Connections are
+    reopened when the database file is replaced or the process has forked, and any
+    transaction left open when the outermost db_connection block exits is rolled back,
+    matching the old open-and-close behaviour.
+    """
+
+    def __init__(self, pragmas=None):
+        self.pragmas = PRAGMA_PROFILE if pragmas is None else pragmas
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = weakref.WeakSet()
+        self._stats = {}
+
+    def _count(self, db_path, key):
+        with self._lock:
+            stats = self._stats.setdefault(db_path, {"opened": 0, "reused": 0, "reopened": 0, "rollbacks": 0})
+            stats[key] += 1
+
+    def _open(self, db_path):
+        conn = sqlite3.connect(db_path, check_same_thread=False, factory=PooledConnection, uri=True)
+        conn.row_factory = sqlite3.Row
+        for pragma, value in self.pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {pragma}={value}")
+            except sqlite3.DatabaseError as e:
+                print(f"Could not set PRAGMA {pragma} on {db_path}: {str(e)}")
+        with self._lock:
+            self._connections.add(conn)
+        return conn
+
+    def _slot(self, db_path):
+        slots = getattr(self._local, "slots", None)
+        if slots is None or getattr(self._local, "pid", None) != os.getpid():
+            slots = self._local.slots = {}
+            self._local.pid = os.getpid()
+        key = os.path.abspath(db_path)
+        slot = slots.get(key)
+        identity = file_identity(db_path)
+        if slot is not None and slot["identity"] != identity:
+            # The file was deleted or replaced; the old handle would point at the unlinked inode
+            self._discard(slot["conn"])
+            slot = None
+            self._count(key, "reopened")
+        if slot is None:
+            conn = self._open(db_path)
+            slot = slots[key] = {"conn": conn, "depth": 0, "identity": file_identity(db_path), "attached": {}}
+            self._count(key, "opened")
+        else:
+            self._count(key, "reused")
+        return key, slot
+
+    def _discard(self, conn):
+        with self._lock:
+            self._connections.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _attach(self, conn, slot, attach):
+        attached = slot["attached"]
+        for alias, path in attach.items():
+            target = (os.path.abspath(path), file_identity(path))
+            if attached.get(alias) == target:
+                continue
+            if alias in attached:
+                conn.execute(f"DETACH DATABASE {alias}")
+                del attached[alias]
+            attach_database(conn, alias, path)
+            attached[alias] = target
+
+    @contextmanager
+    def connection(self, db_path, attach=None):
+        key, slot = self._slot(db_path)
+        conn = slot["conn"]
+        if attach:
+            self._attach(conn, slot, attach)
+        slot["depth"] += 1
+        try:
+            yield conn
+        finally:
+            slot["depth"] -= 1
+            if slot["depth"] == 0 and conn.in_transaction:
+                conn.rollback()
+                self._count(key, "rollbacks")
+
+    def stats(self):
+        with self._lock:
+            per_db = {path: dict(stats) for path, stats in self._stats.items()}
+            open_connections = len(self._connections)
+        for stats in per_db.values():
+            checkouts = stats["opened"] + stats["reused"]
+            stats["reuse_rate"] = stats["reused"] / checkouts if checkouts else 0.0
+        return {"open_connections": open_connections, "pragmas": dict(self.pragmas), "databases": per_db}
+
+    def close_all(self):
+        with self._lock:
+            connections, self._connections = list(self._connections), weakref.WeakSet()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+_pool = ConnectionPool()
+
+
+def get_connection_pool():
+    return _pool
+
+
+def get_pool_stats():
+    return _pool.stats()
+
+
+def attach_database(conn, alias, db_path):
+    """ATTACH another database read-only under `alias`; the connection must be opened with uri=True."""
+    if not alias.isidentifier():
+        raise ValueError(f"Invalid database alias: {alias}")
+    conn.execute(f"ATTACH DATABASE ? AS {alias}", (f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro",))
+
+
+@contextmanager
+def db_connection(db_path, attach=None):
+    """
+    Check out this thread's pooled connection to db_path.
+
+    `attach` maps schema aliases to other database files that are ATTACHed read-only, so
+    one query can join across databases (e.g. sources.sources from the tracking DB).
+    Attachments stay on the pooled connection and are only redone when a file changes.
+    """
+    with _pool.connection(db_path, attach) as conn:
         yield conn
-    finally:
-        conn.close()
 
 
-def execute_query(db_path, query, params=(), fetch=False, fetch_one=False):
-    with db_connection(db_path) as conn:
+def execute_query(db_path, query, params=(), fetch=False, fetch_one=False, attach=None):
+    if not fetch and not fetch_one:
+        from .writer import execute_write, run_write
+
+        return run_write(db_path, execute_write, query, params)
+    with db_connection(db_path, attach) as conn:
         cursor = conn.cursor()
         cursor.execute(query, params)
 
         if fetch_one:
             result = cursor.fetchone()
             return dict(result) if result else None
-        elif fetch:
-            return [dict(row) for row in cursor.fetchall()]
-        else:
-            conn.commit()
-            return cursor.lastrowid
+        return [dict(row) for row in cursor.fetchall()]
@@ -0,0 +1,156 @@
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+from db.config import get_query_embedding_cache_db_path
+from db.connection import db_connection
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_DISK_ENTRIES = 50000
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def normalize_query_text(query_text):
+    text = unicodedata.normalize("NFKC", query_text or "")
+    return " ".join(text.lower().split())
+
+
+def make_cache_key(query_text, model):
+    normalized = normalize_query_text(query_text)
+    return hashlib.sha256(f"{model}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache for query embeddings keyed by normalized query text and model.
+
+    The in-memory tier is an LRU bounded by `max_memory_entries`; the SQLite tier
+    survives restarts and is shared by every process on the host. Both tiers expire
+    entries after `ttl_seconds`, and the disk tier drops its oldest rows once it
+    holds more than `max_disk_entries`.
+    """
+
+    def __init__(self, db_path, max_memory_entries=DEFAULT_MEMORY_ENTRIES, max_disk_entries=DEFAULT_DISK_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._disk_available = self._init_disk_tier()
+
+    def _init_disk_tier(self):
+        try:
+            with db_connection(self.db_path) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    query_text TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_query_embeddings_created_at ON query_embeddings(created_at)")
+                conn.commit()
+            return True
+        except Exception as e:
+            print(f"Query embedding disk cache unavailable, using memory only: {str(e)}")
+            return False
+
+    def _is_expired(self, created_at):
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key, embedding, created_at):
+        self._memory[key] = (embedding, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def get(self, query_text, model):
+        key = make_cache_key(query_text, model)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._is_expired(entry[1]):
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return entry[0]
+                del self._memory[key]
+        embedding = self._get_from_disk(key)
+        with self._lock:
+            if embedding is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._remember(key, embedding[0], embedding[1])
+            return embedding[0]
+
+    def _get_from_disk(self, key):
+        if not self._disk_available:
+            return None
+        try:
+            with db_connection(self.db_path) as conn:
+                row = conn.execute("SELECT embedding, created_at FROM query_embeddings WHERE cache_key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                if self._is_expired(row["created_at"]):
+                    conn.execute("DELETE FROM query_embeddings WHERE cache_key = ?", (key,))
+                    conn.commit()
+                    return None
+                return np.frombuffer(row["embedding"], dtype=np.float32), row["created_at"]
+        except Exception as e:
+            print(f"Error reading query embedding cache: {str(e)}")
+            return None
+
+    def put(self, query_text, model, embedding):
+        key = make_cache_key(query_text, model)
+        vector = np.asarray(embedding, dtype=np.float32)
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, vector, created_at)
+        if not self._disk_available:
+            return
+        try:
+            with db_connection(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (cache_key, model, query_text, embedding, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, model, normalize_query_text(query_text), vector.tobytes(), created_at),
+                )
+                if self.ttl_seconds is not None:
+                    conn.execute("DELETE FROM query_embeddings WHERE created_at < ?", (created_at - self.ttl_seconds,))
+                overflow = conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0] - self.max_disk_entries
+                if overflow > 0:
+                    conn.execute(
+                        "DELETE FROM query_embeddings WHERE cache_key IN (SELECT cache_key FROM query_embeddings ORDER BY created_at LIMIT ?)",
+                        (overflow,),
+                    )
+                conn.commit()
+        except Exception as e:
+            print(f"Error writing query embedding cache: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters["memory_entries"] = len(self._memory)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        counters["lookups"] = lookups
+        counters["hit_rate"] = (counters["memory_hits"] + counters["disk_hits"]) / lookups if lookups else 0.0
+        return counters
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryEmbeddingCache(get_query_embedding_cache_db_path())
+        return _cache
@@ -0,0 +1,116 @@
+import math
+import time
+
+ENGAGEMENT_METRICS = ["engagement_reply_count", "engagement_retweet_count", "engagement_like_count", "engagement_bookmark_count", "engagement_view_count"]
+# Snapshot column holding the change of each metric since the post's previous snapshot
+SNAPSHOT_COLUMNS = {metric: metric.replace("engagement_", "").replace("_count", "_delta") for metric in ENGAGEMENT_METRICS}
+# Interactions that make a post trend; views are too noisy and bookmarks are private
+TRENDING_METRICS = ["engagement_like_count", "engagement_retweet_count", "engagement_reply_count"]
+TRENDING_HALF_LIFE_SECONDS = 6 * 3600
+MIN_INTERVAL_SECONDS = 60
+VELOCITY_COLUMNS = ["post_ts", *ENGAGEMENT_METRICS, "engagement_velocity", "velocity_updated_ts"]
+
+
+def ensure_engagement_tracking(conn):
+    """Create the snapshot store and the velocity columns, seeding both from the current totals."""
+    columns = ",\n        ".join(f"{column} INTEGER NOT NULL DEFAULT 0" for column in SNAPSHOT_COLUMNS.values())
+    conn.execute(f"""
+    CREATE TABLE IF NOT EXISTS engagement_snapshots (
+        post_id TEXT NOT NULL,
+        captured_ts INTEGER NOT NULL,
+        {columns}
+    )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_engagement_snapshots_post ON engagement_snapshots(post_id, captured_ts)")
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(posts)")}
+    for column, definition in (("engagement_velocity", "REAL NOT NULL DEFAULT 0"), ("velocity_updated_ts", "INTEGER"), ("trending_score", "REAL")):
+        if column not in existing:
+            conn.execute(f"ALTER TABLE posts ADD COLUMN {column} {definition}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_sentiment_trending ON posts(sentiment, trending_score)")
+    seeded = conn.execute("SELECT 1 FROM engagement_snapshots LIMIT 1").fetchone()
+    if not seeded:
+        rows = conn.execute(f"SELECT post_id, CAST(strftime('%s', updated_at) AS INTEGER), {', '.join(VELOCITY_COLUMNS)} FROM posts").fetchall()
+        posts = {}
+        previous = {}
+        for post_id, updated_ts, *values in rows:
+            current = dict(zip(VELOCITY_COLUMNS, values))
+            posts[post_id] = current
+            previous[post_id] = {"post_ts": current["post_ts"], "captured_ts": updated_ts}
+        record_engagement(conn, posts, previous)
+
+
+def trending_score(velocity, at_ts):
+    """
+    Time-invariant form of a velocity that halves every TRENDING_HALF_LIFE_SECONDS after at_ts.
+
+    velocity * 0.5 ** ((now - at_ts) / half_life) orders posts the same way for every `now` as
+    log(velocity) + at_ts * ln 2 / half_life, so the decayed ranking is a plain index order.
+    """
+    if not velocity or velocity <= 0:
+        return None
+    return math.log(velocity) + at_ts * math.log(2) / TRENDING_HALF_LIFE_SECONDS
+
+
+def record_engagement(conn, posts, previous, now=None):
+    """
+    Append engagement snapshots for `posts` and update their trending velocity.
+
+    posts maps post_id to the data just written and previous maps post_id to the row as it
+    was before (missing for new posts). Metrics absent from the new data keep their previous
+    value, as in the upsert. A snapshot stores only the per-metric change since the previous
+    one and is skipped when nothing changed. Velocity is interactions per hour, blended into
+    the decayed previous velocity; a new post starts at its average rate since publication.
+    A previous entry may carry captured_ts to date the snapshot, as the migration does when
+    it seeds history from the stored totals.
+    """
+    now = now or int(time.time())
+    snapshots = []
+    velocities = []
+    for post_id, data in posts.items():
+        before = previous.get(post_id)
+        deltas = {}
+        for metric in ENGAGEMENT_METRICS:
+            value = data.get(metric)
+            old_value = (before or {}).get(metric)
+            if value is None:
+                value = old_value
+            deltas[metric] = (value or 0) - (old_value or 0)
+        if before and not any(deltas.values()):
+            continue
+        captured_ts = (before or {}).get("captured_ts") or now
+        snapshots.append((post_id, captured_ts, *deltas.values()))
+        gained = max(sum(deltas[metric] for metric in TRENDING_METRICS), 0)
+        last_ts = (before or {}).get("velocity_updated_ts")
+        if last_ts:
+            interval = max(captured_ts - last_ts, MIN_INTERVAL_SECONDS)
+            decay = 0.5 ** (interval / TRENDING_HALF_LIFE_SECONDS)
+            velocity = (before.get("engagement_velocity") or 0) * decay + gained * 3600 / interval * (1 - decay)
+        else:
+            post_ts = data.get("post_ts") or (before or {}).get("post_ts") or captured_ts
+            velocity = gained * 3600 / max(captured_ts - post_ts, MIN_INTERVAL_SECONDS)
+        velocities.append((velocity, captured_ts, trending_score(velocity, captured_ts), post_id))
+    conn.executemany(
+        f"INSERT INTO engagement_snapshots (post_id, captured_ts, {', '.join(SNAPSHOT_COLUMNS.values())}) VALUES (?, ?, {', '.join(['?'] * len(SNAPSHOT_COLUMNS))})",
+        snapshots,
+    )
+    conn.executemany("UPDATE posts SET engagement_velocity = ?, velocity_updated_ts = ?, trending_score = ? WHERE post_id = ?", velocities)
+    return len(snapshots)
+
+
+def load_velocity_state(conn, post_ids):
+    """Current metrics and velocity state of existing posts, keyed by post_id, for record_engagement."""
+    state = {}
+    post_ids = list(post_ids)
+    for i in range(0, len(post_ids), 500):
+        chunk = post_ids[i : i + 500]
+        placeholders = ",".join(["?"] * len(chunk))
+        for post_id, *values in conn.execute(f"SELECT post_id, {', '.join(VELOCITY_COLUMNS)} FROM posts WHERE post_id IN ({placeholders})", chunk):
+            state[post_id] = dict(zip(VELOCITY_COLUMNS, values))
+    return state
+
+
+def get_engagement_history(conn, post_id):
+    """Absolute engagement of a post at each snapshot, rebuilt by summing the deltas."""
+    totals = ", ".join(f"SUM({column}) OVER (ORDER BY captured_ts, rowid) AS {metric}" for metric, column in SNAPSHOT_COLUMNS.items())
+    rows = conn.execute(f"SELECT captured_ts, {totals} FROM engagement_snapshots WHERE post_id = ? ORDER BY captured_ts, rowid", (post_id,)).fetchall()
+    return [dict(zip(["captured_ts", *ENGAGEMENT_METRICS], row)) for row in rows]
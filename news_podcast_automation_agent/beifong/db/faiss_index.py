@@ -0,0 +1,376 @@
+import os
+import re
+import threading
+import time
+from datetime import date, timedelta
+import numpy as np
+import faiss
+from db.config import get_faiss_db_path, get_tracking_db_path
+from db.articles import get_latest_embeddings_for_articles
+from db.vector_store import embedding_rows_to_vectors
+
+EXACT_SEARCH_MAX_IDS = 2000
+SHARD_GRANULARITIES = ("day", "week", "month")
+SHARD_FILE_PATTERN = re.compile(r"^(day|week|month)-(\d{4}-\d{2}-\d{2})\.faiss$")
+SEGMENT_FILE_PATTERN = re.compile(r"^delta-(\d+)\.faiss$")
+
+
+def read_index_mmap(index_path):
+    try:
+        return faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except Exception as e:
+        print(f"Memory-mapped load not supported for {index_path} ({str(e)}), loading into memory instead")
+        return faiss.read_index(index_path)
+
+
+def make_filtered_search_params(faiss_index, allowed_ids, top_k):
+    selector = faiss.IDSelectorBatch(np.asarray(allowed_ids, dtype=np.int64))
+    base_index = faiss.downcast_index(faiss_index.index) if isinstance(faiss_index, faiss.IndexIDMap) else faiss_index
+    selectivity = len(allowed_ids) / max(faiss_index.ntotal, 1)
+    if isinstance(base_index, faiss.IndexIVF):
+        # Fewer allowed vectors per list means more lists must be probed to fill top_k
+        nprobe = int(base_index.nprobe / max(selectivity, 1e-6) ** 0.5)
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=max(base_index.nprobe, min(nprobe, base_index.nlist)))
+    elif isinstance(base_index, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=max(base_index.hnsw.efSearch, top_k * 4))
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    return params, selector
+
+
+def exact_search(tracking_db_path, query_vector, top_k, allowed_ids):
+    rows, candidates = embedding_rows_to_vectors(get_latest_embeddings_for_articles(tracking_db_path, list(allowed_ids)))
+    distances = np.full((query_vector.shape[0], top_k), np.inf, dtype=np.float32)
+    article_ids = np.full((query_vector.shape[0], top_k), -1, dtype=np.int64)
+    if not rows or candidates.shape[1] != query_vector.shape[1]:
+        return distances, article_ids
+    candidate_ids = np.array([row["article_id"] for row in rows], dtype=np.int64)
+    all_distances = ((query_vector[:, None, :] - candidates[None, :, :]) ** 2).sum(axis=2)
+    k = min(top_k, len(candidate_ids))
+    order = np.argsort(all_distances, axis=1)[:, :k]
+    distances[:, :k] = np.take_along_axis(all_distances, order, axis=1)
+    article_ids[:, :k] = candidate_ids[order]
+    return distances, article_ids
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class FaissIndexHolder:
+    """
+    Long-lived, read-only holder for the article FAISS index.
+
+    The index is opened with memory-mapped I/O so the FastAPI and Celery processes
+    share the same page cache instead of each copying the file into memory. Every
+    lookup compares the on-disk file signature with the loaded snapshot and reloads
+    when the indexer has replaced the file; the snapshot is swapped in a single
+    assignment so concurrent readers never see a half-loaded index. Vectors are
+    keyed by crawled_articles.id, so search labels are article ids.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.reload_count = 0
+
+    def get(self):
+        """
+        Return the current index, reloading it if the file changed on disk.
+
+        Returns:
+            Tuple of (faiss_index, error)
+        """
+        signature = file_signature(self.index_path)
+        if signature is None:
+            # Release the mapping of a deleted file instead of serving it
+            self._snapshot = None
+            return None, f"FAISS index not found at {self.index_path}"
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot["signature"] == signature:
+            return snapshot["index"], None
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot["signature"] == signature:
+                return snapshot["index"], None
+            try:
+                faiss_index = read_index_mmap(self.index_path)
+            except Exception as e:
+                if snapshot is not None:
+                    print(f"Error reloading FAISS index, keeping previous snapshot: {str(e)}")
+                    return snapshot["index"], None
+                return None, f"Error loading FAISS index: {str(e)}"
+            self._snapshot = {"index": faiss_index, "signature": signature}
+            self.reload_count += 1
+            print(f"Loaded FAISS index with {faiss_index.ntotal} vectors from {self.index_path}")
+            return faiss_index, None
+
+    def search(self, query_vector, top_k, allowed_ids=None, tracking_db_path=None, from_date=None, to_date=None):
+        """
+        Search the resident index, optionally restricted to a set of article ids.
+        from_date/to_date are accepted for parity with ShardedFaissIndex and ignored.
+
+        Small allowed sets are scored exactly against their stored embeddings; larger
+        ones are pushed into the ANN search as an ID selector so the index returns a
+        full top_k of matching articles instead of being over-fetched and post-filtered.
+
+        Args:
+            query_vector: float32 array of shape (n, dimension)
+            top_k: Number of neighbours to return per query
+            allowed_ids: Optional iterable of article ids the results must come from
+            tracking_db_path: Database holding article_embeddings, for the exact path
+
+        Returns:
+            Tuple of (distances, article_ids, error). article_ids uses -1 for empty slots.
+        """
+        faiss_index, error = self.get()
+        if error:
+            return None, None, error
+        if allowed_ids is None:
+            distances, article_ids = faiss_index.search(query_vector, top_k)
+            return distances, article_ids, None
+        allowed_ids = list(allowed_ids)
+        if not allowed_ids:
+            return np.empty((query_vector.shape[0], 0), dtype=np.float32), np.empty((query_vector.shape[0], 0), dtype=np.int64), None
+        if len(allowed_ids) <= EXACT_SEARCH_MAX_IDS:
+            distances, article_ids = exact_search(tracking_db_path or get_tracking_db_path(), query_vector, top_k, allowed_ids)
+            return distances, article_ids, None
+        params, _selector = make_filtered_search_params(faiss_index, allowed_ids, top_k)
+        distances, article_ids = faiss_index.search(query_vector, top_k, params=params)
+        return distances, article_ids, None
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "total_vectors": snapshot["index"].ntotal if snapshot else 0,
+            "reload_count": self.reload_count,
+            "index_path": self.index_path,
+        }
+
+
+def get_shard_dir(index_path=None):
+    if index_path is None:
+        index_path = get_faiss_db_path()
+    return os.path.join(os.path.dirname(index_path), "shards")
+
+
+def shard_period(granularity, day):
+    if granularity == "day":
+        start = day
+        end = day + timedelta(days=1)
+    elif granularity == "week":
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=7)
+    elif granularity == "month":
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        raise ValueError(f"Unknown shard granularity '{granularity}', expected one of {SHARD_GRANULARITIES}")
+    return start, end
+
+
+def shard_file_name(granularity, start):
+    return f"{granularity}-{start.isoformat()}.faiss"
+
+
+def parse_date(value):
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def list_shards(shard_dir):
+    if not os.path.isdir(shard_dir):
+        return []
+    shards = []
+    for entry in os.scandir(shard_dir):
+        match = SHARD_FILE_PATTERN.match(entry.name)
+        if not match:
+            continue
+        granularity, start = match.group(1), date.fromisoformat(match.group(2))
+        _, end = shard_period(granularity, start)
+        shards.append({"path": entry.path, "granularity": granularity, "start": start, "end": end})
+    return sorted(shards, key=lambda shard: shard["start"])
+
+
+def merge_top_k(partial_results, top_k):
+    distances = np.hstack([d for d, _ in partial_results])
+    article_ids = np.hstack([ids for _, ids in partial_results])
+    distances = np.where(article_ids < 0, np.inf, distances)
+    order = np.argsort(distances, axis=1)
+    merged_distances = np.full((distances.shape[0], top_k), np.inf, dtype=np.float32)
+    merged_ids = np.full((distances.shape[0], top_k), -1, dtype=np.int64)
+    for row in range(distances.shape[0]):
+        # An article re-embedded since the last compaction can appear in several parts
+        seen = set()
+        for column in order[row]:
+            article_id = int(article_ids[row, column])
+            if article_id < 0 or article_id in seen:
+                continue
+            merged_distances[row, len(seen)] = distances[row, column]
+            merged_ids[row, len(seen)] = article_id
+            seen.add(article_id)
+            if len(seen) == top_k:
+                break
+    return merged_distances, merged_ids
+
+
+def search_index_files(index_paths, query_vector, top_k, allowed_ids=None, tracking_db_path=None):
+    evict_removed_holders()
+    partial_results = []
+    for index_path in index_paths:
+        distances, article_ids, error = get_faiss_index_holder(index_path).search(query_vector, top_k, allowed_ids, tracking_db_path)
+        if error:
+            print(f"Skipping {index_path}: {error}")
+            continue
+        partial_results.append((distances, article_ids))
+    if not partial_results:
+        return None, None
+    return merge_top_k(partial_results, top_k)
+
+
+class ShardedFaissIndex:
+    """
+    Article vectors split into time-partitioned shard files (day/week/month).
+
+    Each shard is served by its own memory-mapped FaissIndexHolder, so rewriting one
+    shard does not invalidate the others. Searches only touch shards whose period
+    overlaps the requested window and merge the per-shard top-k by distance.
+    """
+
+    def __init__(self, shard_dir):
+        self.shard_dir = shard_dir
+
+    def shards_for_window(self, from_date=None, to_date=None):
+        from_day = parse_date(from_date)
+        to_day = parse_date(to_date)
+        return [
+            shard
+            for shard in list_shards(self.shard_dir)
+            if (from_day is None or shard["end"] > from_day) and (to_day is None or shard["start"] <= to_day)
+        ]
+
+    def get(self):
+        shards = list_shards(self.shard_dir)
+        if not shards:
+            return None, f"No FAISS shards found in {self.shard_dir}"
+        return shards, None
+
+    def search(self, query_vector, top_k, allowed_ids=None, tracking_db_path=None, from_date=None, to_date=None):
+        if allowed_ids is not None:
+            allowed_ids = list(allowed_ids)
+            if len(allowed_ids) <= EXACT_SEARCH_MAX_IDS:
+                distances, article_ids = exact_search(tracking_db_path or get_tracking_db_path(), query_vector, top_k, allowed_ids)
+                return distances, article_ids, None
+        shard_paths = [shard["path"] for shard in self.shards_for_window(from_date, to_date)]
+        distances, article_ids = search_index_files(shard_paths, query_vector, top_k, allowed_ids, tracking_db_path)
+        if article_ids is None:
+            return None, None, f"No FAISS shards cover the requested window in {self.shard_dir}"
+        return distances, article_ids, None
+
+    def stats(self):
+        shards = list_shards(self.shard_dir)
+        return {"shard_dir": self.shard_dir, "shards": len(shards), "oldest": shards[0]["start"].isoformat() if shards else None}
+
+
+def get_segment_dir(index_path=None):
+    if index_path is None:
+        index_path = get_faiss_db_path()
+    return os.path.join(os.path.dirname(index_path), "segments")
+
+
+def new_segment_path(segment_dir):
+    return os.path.join(segment_dir, f"delta-{time.time_ns()}.faiss")
+
+
+def list_segments(segment_dir):
+    if not os.path.isdir(segment_dir):
+        return []
+    segments = []
+    for entry in os.scandir(segment_dir):
+        match = SEGMENT_FILE_PATTERN.match(entry.name)
+        if match:
+            segments.append((int(match.group(1)), entry.path))
+    return [path for _, path in sorted(segments)]
+
+
+class SegmentedFaissIndex:
+    """
+    Main article index plus the append-only delta segments written since the last compaction.
+
+    The indexer appends new vectors as small segment files instead of rewriting the
+    main index; searches cover the main index and every segment and merge the results
+    until compaction folds the segments back into the main index and deletes them.
+    """
+
+    def __init__(self, index_path, segment_dir):
+        self.index_path = index_path
+        self.segment_dir = segment_dir
+
+    def get(self):
+        return get_faiss_index_holder(self.index_path).get()
+
+    def search(self, query_vector, top_k, allowed_ids=None, tracking_db_path=None, from_date=None, to_date=None):
+        if allowed_ids is not None:
+            allowed_ids = list(allowed_ids)
+            if len(allowed_ids) <= EXACT_SEARCH_MAX_IDS:
+                distances, article_ids = exact_search(tracking_db_path or get_tracking_db_path(), query_vector, top_k, allowed_ids)
+                return distances, article_ids, None
+        index_paths = [self.index_path] + list_segments(self.segment_dir)
+        distances, article_ids = search_index_files(index_paths, query_vector, top_k, allowed_ids, tracking_db_path)
+        if article_ids is None:
+            return None, None, f"FAISS index not found at {self.index_path}"
+        return distances, article_ids, None
+
+    def stats(self):
+        stats = get_faiss_index_holder(self.index_path).stats()
+        stats["segments"] = len(list_segments(self.segment_dir))
+        return stats
+
+
+_holders = {}
+_holders_lock = threading.Lock()
+
+
+def get_faiss_index_holder(index_path=None):
+    if index_path is None:
+        index_path = get_faiss_db_path()
+    key = os.path.abspath(index_path)
+    with _holders_lock:
+        holder = _holders.get(key)
+        if holder is None:
+            holder = FaissIndexHolder(index_path)
+            _holders[key] = holder
+        return holder
+
+
+def evict_removed_holders():
+    """Drop holders whose index file is gone, such as delta segments folded in by compaction."""
+    with _holders_lock:
+        removed = [key for key in _holders if not os.path.exists(key)]
+        for key in removed:
+            del _holders[key]
+    return len(removed)
+
+
+def get_article_vector_index(index_path=None):
+    shard_dir = get_shard_dir(index_path)
+    if list_shards(shard_dir):
+        return ShardedFaissIndex(shard_dir)
+    if index_path is None:
+        index_path = get_faiss_db_path()
+    segment_dir = get_segment_dir(index_path)
+    if list_segments(segment_dir):
+        return SegmentedFaissIndex(index_path, segment_dir)
+    return get_faiss_index_holder(index_path)
@@ -1,6 +1,8 @@
-from datetime import datetime
-import sqlite3
-from .connection import db_connection, execute_query
+from datetime import datetime, timezone
+from .bulk import bulk_insert_ignore
+from .timestamps import to_epoch_or_now
+from .connection import execute_query
+from .writer import execute_write_many, run_write
 
 
 def get_active_feeds(sources_db_path, limit=None, offset=0):
@@ -52,48 +54,33 @@ def update_feed_tracking(tracking_db_path, feed_id, etag, modified, entry_hash):
 
 
 def store_feed_entries(tracking_db_path, feed_id, source_id, entries):
-    count = 0
-    with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        for entry in entries:
-            try:
-                cursor.execute(
-                    """
-                INSERT INTO feed_entries 
-                (feed_id, source_id, entry_id, title, link, published_date, content, summary)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        feed_id,
-                        source_id,
-                        entry.get("entry_id", ""),
-                        entry.get("title", ""),
-                        entry.get("link", ""),
-                        entry.get("published_date", datetime.now().isoformat()),
-                        entry.get("content", ""),
-                        entry.get("summary", ""),
-                    ),
-                )
-                count += 1
-            except sqlite3.IntegrityError:
-                pass
-        conn.commit()
-    return count
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        (
+            feed_id,
+            source_id,
+            entry.get("entry_id", ""),
+            entry.get("title", ""),
+            entry.get("link", ""),
+            entry.get("published_date", now),
+            entry.get("content", ""),
+            entry.get("summary", ""),
+            to_epoch_or_now(entry.get("published_date")),
+        )
+        for entry in entries
+    ]
+    return run_write(
+        tracking_db_path,
+        bulk_insert_ignore,
+        "feed_entries",
+        ["feed_id", "source_id", "entry_id", "title", "link", "published_date", "content", "summary", "published_ts"],
+        rows,
+    )
 
 
 def update_tracking_info(tracking_db_path, feeds):
-    with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        for feed in feeds:
-            cursor.execute(
-                """
-            INSERT OR IGNORE INTO feed_tracking 
-            (feed_id, source_id, feed_url, last_processed)
-            VALUES (?, ?, ?, NULL)
-            """,
-                (feed["id"], feed["source_id"], feed["feed_url"]),
-            )
-        conn.commit()
+    rows = [(feed["id"], feed["source_id"], feed["feed_url"]) for feed in feeds]
+    return run_write(tracking_db_path, bulk_insert_ignore, "feed_tracking", ["feed_id", "source_id", "feed_url"], rows)
 
 
 def get_uncrawled_entries(tracking_db_path, limit=20, max_attempts=3):
@@ -109,7 +96,7 @@ def get_uncrawled_entries(tracking_db_path, limit=20, max_attempts=3):
           AND NOT EXISTS (
               SELECT 1 FROM crawled_articles ca WHERE ca.url = e.link
           )
-    ORDER BY e.published_date DESC
+    ORDER BY e.published_ts DESC
     LIMIT ?
     """
     entries = execute_query(tracking_db_path, query, (max_attempts, limit), fetch=True)
@@ -131,17 +118,13 @@ def reset_stuck_entries(tracking_db_path):
 def mark_entries_as_processing(tracking_db_path, entry_ids):
     if not entry_ids:
         return 0
-    with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        placeholders = ",".join(["?"] * len(entry_ids))
-        query = f"""
-        UPDATE feed_entries 
-        SET crawl_status = 'processing' 
-        WHERE id IN ({placeholders})
-        """
-        cursor.execute(query, entry_ids)
-        conn.commit()
-        return cursor.rowcount
+    placeholders = ",".join(["?"] * len(entry_ids))
+    query = f"""
+    UPDATE feed_entries 
+    SET crawl_status = 'processing' 
+    WHERE id IN ({placeholders})
+    """
+    return run_write(tracking_db_path, execute_write_many, query, [entry_ids])
 
 
 def ensure_feed_tracking_exists(tracking_db_path, feed_id, source_id, feed_url):
@@ -167,13 +150,15 @@ def get_feed_sources_with_categories(sources_db_path):
 
 
 def get_feed_stats(tracking_db_path):
+    # Read from the trigger-maintained value_counts rollup (db/rollups.py)
     query = """
     SELECT 
-        COUNT(*) as total_entries,
-        SUM(CASE WHEN crawl_status = 'pending' THEN 1 ELSE 0 END) as pending_entries,
-        SUM(CASE WHEN crawl_status = 'processing' THEN 1 ELSE 0 END) as processing_entries,
-        SUM(CASE WHEN crawl_status = 'success' THEN 1 ELSE 0 END) as success_entries,
-        SUM(CASE WHEN crawl_status = 'failed' THEN 1 ELSE 0 END) as failed_entries
-    FROM feed_entries
+        COALESCE(SUM(row_count), 0) as total_entries,
+        COALESCE(SUM(CASE WHEN value = 'pending' THEN row_count END), 0) as pending_entries,
+        COALESCE(SUM(CASE WHEN value = 'processing' THEN row_count END), 0) as processing_entries,
+        COALESCE(SUM(CASE WHEN value = 'success' THEN row_count END), 0) as success_entries,
+        COALESCE(SUM(CASE WHEN value = 'failed' THEN row_count END), 0) as failed_entries
+    FROM value_counts
+    WHERE table_name = 'feed_entries' AND column_name = 'crawl_status'
     """
     return execute_query(tracking_db_path, query, fetch=True, fetch_one=True)
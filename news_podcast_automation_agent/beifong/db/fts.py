@@ -0,0 +1,78 @@
+import re
+
+FTS_TOKENIZE = "porter unicode61 remove_diacritics 2"
+
+# External-content FTS5 index over crawled_articles; bm25 weights rank title over summary over body
+ARTICLE_FTS = "articles_fts"
+ARTICLE_FTS_COLUMNS = ["title", "summary", "content"]
+ARTICLE_BM25_SQL = "bm25(articles_fts, 3.0, 2.0, 1.0)"
+ARTICLE_SNIPPET_SQL = "snippet(articles_fts, -1, '<b>', '</b>', '...', 24)"
+# Filter for queries that cannot join articles_fts directly, e.g. one MATCH per search term
+ARTICLE_MATCH_SQL = "ca.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)"
+
+# posts_fts rows are keyed on posts.id, an INTEGER PRIMARY KEY that VACUUM leaves alone
+POST_FTS = "posts_fts"
+POST_FTS_COLUMNS = ["post_text", "user_display_name", "user_handle"]
+POST_MATCH_SQL = "id IN (SELECT rowid FROM posts_fts WHERE posts_fts MATCH ?)"
+
+SEARCH_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def ensure_fts_index(conn, fts_table, source_table, columns, rowid_column="rowid"):
+    """
+    Create an external-content FTS5 index over `columns` of `source_table`, kept in sync by
+    triggers, and build it from the rows already present. Does nothing when it already exists.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)).fetchone()
+    if exists:
+        return False
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    conn.execute(
+        f"CREATE VIRTUAL TABLE {fts_table} USING fts5({column_list}, content='{source_table}', content_rowid='{rowid_column}', tokenize='{FTS_TOKENIZE}')"
+    )
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_insert AFTER INSERT ON {source_table}
+    BEGIN
+        INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.{rowid_column}, {new_values});
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_delete AFTER DELETE ON {source_table}
+    BEGIN
+        INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.{rowid_column}, {old_values});
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_update AFTER UPDATE OF {column_list} ON {source_table}
+    BEGIN
+        INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.{rowid_column}, {old_values});
+        INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.{rowid_column}, {new_values});
+    END
+    """)
+    conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+    return True
+
+
+def to_fts_phrase(term):
+    """Quote one search term as an FTS5 phrase; a trailing * keeps it a prefix search."""
+    words = re.findall(r"\w+", term)
+    if not words:
+        return None
+    phrase = '"' + " ".join(words) + '"'
+    return phrase + "*" if term.endswith("*") else phrase
+
+
+def build_match_query(terms, operator="AND"):
+    """
+    Build an FTS5 MATCH expression from user input without exposing FTS5 query syntax.
+
+    `terms` is either a search box string, where "quoted text" is a phrase and word* a
+    prefix, or a list of terms that each become one phrase. Returns None when nothing
+    searchable is left.
+    """
+    if isinstance(terms, str):
+        terms = [match.group(1) if match.group(1) is not None else match.group(2) for match in SEARCH_TOKEN.finditer(terms)]
+    phrases = [phrase for phrase in (to_fts_phrase(term) for term in terms) if phrase]
+    return f" {operator} ".join(phrases) if phrases else None
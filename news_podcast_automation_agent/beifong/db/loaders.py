@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+IN_CHUNK_SIZE = 500
+
+
+def fetch_in(conn, query, ids, params=(), chunk_size=IN_CHUNK_SIZE):
+    """
+    Run a query with an `{ids}` placeholder list once per chunk of ids and return all rows.
+    Ids are de-duplicated and chunked to stay under SQLite's bound parameter limit.
+    """
+    ids = list(dict.fromkeys(i for i in ids if i is not None))
+    rows = []
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i : i + chunk_size]
+        cursor = conn.execute(query.format(ids=",".join(["?"] * len(chunk))), (*params, *chunk))
+        rows.extend(cursor.fetchall())
+    return rows
+
+
+def group_by(rows, key, value):
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row[key]].append(row[value])
+    return dict(grouped)
+
+
+def load_article_categories(conn, article_ids):
+    rows = fetch_in(conn, "SELECT article_id, category_name FROM article_categories WHERE article_id IN ({ids}) ORDER BY rowid", article_ids)
+    return group_by(rows, "article_id", "category_name")
+
+
+def load_source_categories(conn, source_ids):
+    rows = fetch_in(
+        conn,
+        """
+        SELECT sc.source_id, c.name
+        FROM source_categories sc
+        JOIN categories c ON sc.category_id = c.id
+        WHERE sc.source_id IN ({ids}) AND c.name IS NOT NULL AND c.name != ''
+        ORDER BY c.name
+        """,
+        source_ids,
+    )
+    return group_by(rows, "source_id", "name")
+
+
+def load_source_last_crawled(conn, source_ids):
+    rows = fetch_in(
+        conn,
+        "SELECT source_id, MAX(last_processed) AS last_crawled FROM feed_tracking WHERE source_id IN ({ids}) GROUP BY source_id",
+        source_ids,
+    )
+    return {row["source_id"]: row["last_crawled"] for row in rows}
+
+
+def attach(items, key, field, values, default=None):
+    """Set item[field] from a loader result keyed by item[key], using a fresh default for misses."""
+    for item in items:
+        value = values.get(item.get(key))
+        item[field] = value if value is not None else (default() if callable(default) else default)
+    return items
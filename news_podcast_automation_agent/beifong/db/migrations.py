@@ -0,0 +1,554 @@
+import argparse
+import os
+import threading
+from db.config import get_db_path
+from db.connection import db_connection, file_identity
+from db.engagement import ensure_engagement_tracking
+from db.fts import ARTICLE_FTS, ARTICLE_FTS_COLUMNS, POST_FTS, POST_FTS_COLUMNS, ensure_fts_index
+from db.rollups import ensure_post_rollups, ensure_task_execution_rollup, ensure_value_counts
+from db.timestamps import ensure_epoch_column, ensure_epoch_columns
+from db.vector_store import ensure_vector_offset_column
+
+# Epoch second at which a task is next due; 0 for tasks that never ran. last_run is local time.
+TASK_NEXT_RUN_SQL = """
+CASE WHEN {row}last_run IS NULL THEN 0 ELSE CAST(strftime('%s', {row}last_run, 'utc') AS INTEGER) + {row}frequency *
+    CASE {row}frequency_unit WHEN 'minutes' THEN 60 WHEN 'hours' THEN 3600 WHEN 'days' THEN 86400 ELSE 1 END
+END
+"""
+
+_checked = set()
+_checked_lock = threading.Lock()
+
+
+def add_column(conn, table, column, definition):
+    """Add a column unless the table already has it. Returns True when the column was added."""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+    if column in columns:
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+def create_indexes(conn, indexes):
+    for index_sql in indexes:
+        conn.execute(index_sql)
+
+
+def sources_v1_baseline(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS sources (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        url TEXT,
+        is_active BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS source_categories (
+        source_id INTEGER,
+        category_id INTEGER,
+        PRIMARY KEY (source_id, category_id),
+        FOREIGN KEY (source_id) REFERENCES sources(id),
+        FOREIGN KEY (category_id) REFERENCES categories(id)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS source_feeds (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_id INTEGER,
+        feed_url TEXT UNIQUE,
+        feed_type TEXT,
+        is_active BOOLEAN DEFAULT 1,
+        last_crawled TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (source_id) REFERENCES sources(id)
+    )
+    """)
+    create_indexes(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_source_feeds_source_id ON source_feeds(source_id)",
+            "CREATE INDEX IF NOT EXISTS idx_sources_is_active ON sources(is_active)",
+            "CREATE INDEX IF NOT EXISTS idx_source_feeds_is_active ON source_feeds(is_active)",
+            "CREATE INDEX IF NOT EXISTS idx_source_categories_source_id ON source_categories(source_id)",
+            "CREATE INDEX IF NOT EXISTS idx_source_categories_category_id ON source_categories(category_id)",
+        ],
+    )
+
+
+def sources_v2_name_lookup(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sources_name ON sources(name)")
+
+
+def tracking_v1_baseline(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS feed_tracking (
+        feed_id INTEGER PRIMARY KEY,
+        source_id INTEGER,
+        feed_url TEXT,
+        last_processed TIMESTAMP,
+        last_etag TEXT,
+        last_modified TEXT,
+        entry_hash TEXT
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS feed_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feed_id INTEGER,
+        source_id INTEGER,
+        entry_id TEXT,
+        title TEXT,
+        link TEXT UNIQUE,
+        published_date TIMESTAMP,
+        content TEXT,
+        summary TEXT,
+        crawl_status TEXT DEFAULT 'pending',
+        crawl_attempts INTEGER DEFAULT 0,
+        processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(feed_id, entry_id)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS crawled_articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_id INTEGER,
+        source_id INTEGER,
+        feed_id INTEGER,
+        title TEXT,
+        url TEXT UNIQUE,
+        published_date TIMESTAMP,
+        raw_content TEXT,
+        content TEXT,
+        summary TEXT,
+        metadata TEXT,
+        ai_status TEXT DEFAULT 'pending',
+        ai_error TEXT DEFAULT NULL,
+        ai_attempts INTEGER DEFAULT 0,
+        crawled_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        processed BOOLEAN DEFAULT 0,
+        FOREIGN KEY (entry_id) REFERENCES feed_entries(id)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS article_categories (
+        article_id INTEGER,
+        category_name TEXT NOT NULL,
+        PRIMARY KEY (article_id, category_name),
+        FOREIGN KEY (article_id) REFERENCES crawled_articles(id)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS article_embeddings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        article_id INTEGER NOT NULL,
+        embedding BLOB NOT NULL,
+        embedding_model TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        in_faiss_index INTEGER DEFAULT 0,
+        FOREIGN KEY (article_id) REFERENCES crawled_articles(id)
+    )
+    """)
+    create_indexes(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_feed_entries_feed_id ON feed_entries(feed_id)",
+            "CREATE INDEX IF NOT EXISTS idx_feed_entries_link ON feed_entries(link)",
+            "CREATE INDEX IF NOT EXISTS idx_crawled_articles_url ON crawled_articles(url)",
+            "CREATE INDEX IF NOT EXISTS idx_crawled_articles_entry_id ON crawled_articles(entry_id)",
+            "CREATE INDEX IF NOT EXISTS idx_feed_entries_crawl_status ON feed_entries(crawl_status)",
+            "CREATE INDEX IF NOT EXISTS idx_crawled_articles_processed ON crawled_articles(processed)",
+            "CREATE INDEX IF NOT EXISTS idx_crawled_articles_ai_status ON crawled_articles(ai_status)",
+            "CREATE INDEX IF NOT EXISTS idx_article_categories_article_id ON article_categories(article_id)",
+            "CREATE INDEX IF NOT EXISTS idx_article_categories_category_name ON article_categories(category_name)",
+            "CREATE INDEX IF NOT EXISTS idx_article_embeddings_article_id ON article_embeddings(article_id)",
+            "CREATE INDEX IF NOT EXISTS idx_article_embeddings_in_faiss ON article_embeddings(in_faiss_index)",
+        ],
+    )
+
+
+def tracking_v2_embedding_bookkeeping(conn):
+    add_column(conn, "crawled_articles", "embedding_status", "TEXT DEFAULT NULL")
+    ensure_vector_offset_column(conn)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_crawled_articles_embedding_status ON crawled_articles(embedding_status)")
+
+
+def tracking_v3_epoch_timestamps(conn):
+    ensure_epoch_columns(conn, "tracking_db")
+    create_indexes(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_crawled_articles_published_ts ON crawled_articles(published_ts)",
+            "CREATE INDEX IF NOT EXISTS idx_crawled_articles_status_published_ts ON crawled_articles(processed, ai_status, published_ts, id)",
+            "CREATE INDEX IF NOT EXISTS idx_feed_entries_status_published_ts ON feed_entries(crawl_status, published_ts)",
+        ],
+    )
+
+
+def tracking_v4_feed_tracking_source(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_feed_tracking_source_id ON feed_tracking(source_id, last_processed)")
+
+
+def tracking_v5_article_search(conn):
+    ensure_fts_index(conn, ARTICLE_FTS, "crawled_articles", ARTICLE_FTS_COLUMNS, rowid_column="id")
+
+
+def tracking_v6_dashboard_counters(conn):
+    ensure_value_counts(conn, "tracking_db")
+
+
+def podcasts_v1_baseline(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS podcasts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        date TEXT,
+        content_json TEXT,
+        audio_generated BOOLEAN DEFAULT 0,
+        audio_path TEXT,
+        banner_img_path TEXT,
+        tts_engine TEXT DEFAULT 'elevenlabs',
+        language_code TEXT DEFAULT 'en',
+        sources_json TEXT,
+        banner_images TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    create_indexes(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_podcasts_date ON podcasts(date)",
+            "CREATE INDEX IF NOT EXISTS idx_podcasts_audio_generated ON podcasts(audio_generated)",
+            "CREATE INDEX IF NOT EXISTS idx_podcasts_tts_engine ON podcasts(tts_engine)",
+            "CREATE INDEX IF NOT EXISTS idx_podcasts_language_code ON podcasts(language_code)",
+        ],
+    )
+
+
+def podcasts_v2_listing_order(conn):
+    # Matches the listing's keyset sort expressions, so pages are read in index order
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_podcasts_listing ON podcasts(COALESCE(date, ''), COALESCE(created_at, ''), id)")
+
+
+def tasks_v1_baseline(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        task_type TEXT,
+        description TEXT,
+        command TEXT NOT NULL,
+        frequency INTEGER NOT NULL,
+        frequency_unit TEXT NOT NULL,
+        enabled BOOLEAN DEFAULT 1,
+        last_run TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS task_executions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        start_time TIMESTAMP NOT NULL,
+        end_time TIMESTAMP,
+        status TEXT NOT NULL,
+        error_message TEXT,
+        output TEXT,
+        FOREIGN KEY (task_id) REFERENCES tasks(id)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS podcast_configs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        prompt TEXT NOT NULL,
+        time_range_hours INTEGER DEFAULT 24,
+        limit_articles INTEGER DEFAULT 20,
+        is_active BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        tts_engine TEXT DEFAULT 'elevenlabs',
+        language_code TEXT DEFAULT 'en',
+        podcast_script_prompt TEXT,
+        image_prompt TEXT
+    )
+    """)
+    create_indexes(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_tasks_enabled ON tasks(enabled)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_frequency ON tasks(frequency, frequency_unit)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_last_run ON tasks(last_run)",
+            "CREATE INDEX IF NOT EXISTS idx_task_executions_task_id ON task_executions(task_id)",
+            "CREATE INDEX IF NOT EXISTS idx_task_executions_status ON task_executions(status)",
+            "CREATE INDEX IF NOT EXISTS idx_task_executions_start_time ON task_executions(start_time)",
+            "CREATE INDEX IF NOT EXISTS idx_podcast_configs_is_active ON podcast_configs(is_active)",
+            "CREATE INDEX IF NOT EXISTS idx_podcast_configs_name ON podcast_configs(name)",
+        ],
+    )
+
+
+def tasks_v2_next_run(conn):
+    if ensure_epoch_column(conn, "tasks", "next_run_ts"):
+        conn.execute(f"UPDATE tasks SET next_run_ts = {TASK_NEXT_RUN_SQL.format(row='')}")
+    for trigger_name, event in (("trg_tasks_next_run_insert", "INSERT"), ("trg_tasks_next_run_update", "UPDATE OF last_run, frequency, frequency_unit")):
+        conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {trigger_name} AFTER {event} ON tasks
+        BEGIN
+            UPDATE tasks SET next_run_ts = {TASK_NEXT_RUN_SQL.format(row='NEW.')} WHERE id = NEW.id;
+        END
+        """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_enabled_next_run ON tasks(enabled, next_run_ts)")
+
+
+def tasks_v3_execution_rollup(conn):
+    ensure_task_execution_rollup(conn)
+
+
+def internal_sessions_v1_baseline(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS session_state (
+        session_id TEXT PRIMARY KEY,
+        state JSON,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_session_state_session_id ON session_state(session_id)")
+
+
+def social_media_v1_baseline(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS posts (
+        post_id TEXT PRIMARY KEY,
+        platform TEXT,
+        user_display_name TEXT,
+        user_handle TEXT,
+        user_profile_pic_url TEXT,
+        post_timestamp TEXT,
+        post_display_time TEXT,
+        post_url TEXT,
+        post_text TEXT,
+        post_mentions TEXT,
+        engagement_reply_count INTEGER,
+        engagement_retweet_count INTEGER,
+        engagement_like_count INTEGER,
+        engagement_bookmark_count INTEGER,
+        engagement_view_count INTEGER,
+        media TEXT,  -- Stored as JSON
+        media_count INTEGER,
+        is_ad BOOLEAN,
+        sentiment TEXT,
+        categories TEXT,
+        tags TEXT,
+        analysis_reasoning TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    create_indexes(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_posts_platform ON posts(platform)",
+            "CREATE INDEX IF NOT EXISTS idx_posts_user_handle ON posts(user_handle)",
+            "CREATE INDEX IF NOT EXISTS idx_posts_post_timestamp ON posts(post_timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_posts_sentiment ON posts(sentiment)",
+        ],
+    )
+
+
+def social_media_v2_epoch_timestamps(conn):
+    ensure_epoch_columns(conn, "social_media_db")
+    create_indexes(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_posts_post_ts ON posts(post_ts, post_id)",
+            "CREATE INDEX IF NOT EXISTS idx_posts_platform_post_ts ON posts(platform, post_ts)",
+            "CREATE INDEX IF NOT EXISTS idx_posts_sentiment_post_ts ON posts(sentiment, post_ts)",
+        ],
+    )
+
+
+def social_media_v3_search_and_labels(conn):
+    # Keyed on the implicit rowid until v6 gives posts a stable integer key
+    ensure_fts_index(conn, POST_FTS, "posts", POST_FTS_COLUMNS)
+    for table, column, source in [("post_categories", "category", "categories"), ("post_tags", "tag", "tags")]:
+        conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            post_id TEXT NOT NULL,
+            {column} TEXT NOT NULL COLLATE NOCASE,
+            PRIMARY KEY (post_id, {column}),
+            FOREIGN KEY (post_id) REFERENCES posts(post_id)
+        )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column}, post_id)")
+        conn.execute(f"""
+        INSERT OR IGNORE INTO {table} (post_id, {column})
+        SELECT p.post_id, TRIM(label.value)
+        FROM posts p, json_each(CASE WHEN json_valid(p.{source}) THEN p.{source} ELSE '[]' END) label
+        WHERE label.type = 'text' AND TRIM(label.value) != ''
+        """)
+
+
+def social_media_v4_dashboard_rollups(conn):
+    ensure_post_rollups(conn)
+
+
+def social_media_v5_engagement_history(conn):
+    ensure_engagement_tracking(conn)
+
+
+def social_media_v6_stable_post_keys(conn):
+    """
+    Rebuild posts with an INTEGER PRIMARY KEY id and key posts_fts on it.
+
+    posts_fts used the implicit rowid of a table with a TEXT primary key, which VACUUM
+    may renumber. Existing rowids are kept as the new ids, post_id stays unique for the
+    ON CONFLICT upserts, and the indexes and triggers of posts are recreated as they were.
+    """
+    columns = [row for row in conn.execute("PRAGMA table_info(posts)").fetchall() if row[1] != "id"]
+    saved_sql = [
+        row[0]
+        for row in conn.execute("SELECT sql FROM sqlite_master WHERE tbl_name = 'posts' AND type IN ('index', 'trigger') AND sql IS NOT NULL").fetchall()
+        if f"trg_{POST_FTS}_" not in row[0]
+    ]
+    definitions = ["id INTEGER PRIMARY KEY"]
+    for _, name, column_type, not_null, default, _ in columns:
+        if name == "post_id":
+            definitions.append("post_id TEXT NOT NULL UNIQUE")
+            continue
+        definition = f"{name} {column_type}".strip()
+        if not_null:
+            definition += " NOT NULL"
+        if default is not None:
+            definition += f" DEFAULT {default}"
+        definitions.append(definition)
+    column_list = ", ".join(row[1] for row in columns)
+    conn.execute(f"DROP TABLE IF EXISTS {POST_FTS}")
+    conn.execute(f"CREATE TABLE posts_rebuilt ({', '.join(definitions)})")
+    conn.execute(f"INSERT INTO posts_rebuilt (id, {column_list}) SELECT rowid, {column_list} FROM posts ORDER BY rowid")
+    conn.execute("DROP TABLE posts")
+    conn.execute("ALTER TABLE posts_rebuilt RENAME TO posts")
+    for sql in saved_sql:
+        conn.execute(sql)
+    ensure_fts_index(conn, POST_FTS, "posts", POST_FTS_COLUMNS, rowid_column="id")
+
+
+# database -> ordered [(version, description, migration)]. Migrations are append-only: never edit
+# or renumber a released step, add a new one instead. Every step must also be safe on databases
+# created before versioning, which already have some of the later columns and indexes.
+MIGRATIONS = {
+    "sources_db": [
+        (1, "baseline schema", sources_v1_baseline),
+        (2, "source lookup by name", sources_v2_name_lookup),
+    ],
+    "tracking_db": [
+        (1, "baseline schema", tracking_v1_baseline),
+        (2, "embedding status and vector store offsets", tracking_v2_embedding_bookkeeping),
+        (3, "epoch publish timestamps", tracking_v3_epoch_timestamps),
+        (4, "feed tracking lookup by source", tracking_v4_feed_tracking_source),
+        (5, "full-text article search index", tracking_v5_article_search),
+        (6, "trigger-maintained status and category counters", tracking_v6_dashboard_counters),
+    ],
+    "podcasts_db": [
+        (1, "baseline schema", podcasts_v1_baseline),
+        (2, "listing sort index", podcasts_v2_listing_order),
+    ],
+    "tasks_db": [
+        (1, "baseline schema", tasks_v1_baseline),
+        (2, "trigger-maintained next run time", tasks_v2_next_run),
+        (3, "daily task execution rollup", tasks_v3_execution_rollup),
+    ],
+    "internal_sessions_db": [
+        (1, "baseline schema", internal_sessions_v1_baseline),
+    ],
+    "social_media_db": [
+        (1, "baseline schema", social_media_v1_baseline),
+        (2, "epoch post timestamps", social_media_v2_epoch_timestamps),
+        (3, "full-text post search and normalized categories and tags", social_media_v3_search_and_labels),
+        (4, "hourly and daily dashboard rollups", social_media_v4_dashboard_rollups),
+        (5, "engagement snapshots and trending velocity", social_media_v5_engagement_history),
+        (6, "stable integer post key for full-text search", social_media_v6_stable_post_keys),
+    ],
+}
+
+
+def latest_version(db_name):
+    return MIGRATIONS[db_name][-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, db_name):
+    """
+    Bring a database up to the latest schema version of `db_name`.
+
+    The applied version is kept in PRAGMA user_version. Each pending migration runs in
+    its own write transaction together with the version bump, so a failed step leaves
+    the database at the previous version, and processes starting at the same time
+    apply every step once.
+
+    Returns:
+        Schema version of the database after migrating
+    """
+    if conn.in_transaction:
+        conn.commit()
+    for version, description, migration in MIGRATIONS[db_name]:
+        if get_schema_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) < version:
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+                print(f"Migrated {db_name} to version {version}: {description}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    version = get_schema_version(conn)
+    if version > latest_version(db_name):
+        print(f"Warning: {db_name} is at schema version {version}, newer than this code ({latest_version(db_name)})")
+    return version
+
+
+def ensure_schema(db_name, db_path=None):
+    """Migrate a database once per process; later calls for the same file return immediately."""
+    db_path = db_path or get_db_path(db_name)
+    key = (db_name, os.path.abspath(db_path), file_identity(db_path))
+    if key in _checked:
+        return
+    with _checked_lock:
+        if key in _checked:
+            return
+        with db_connection(db_path) as conn:
+            migrate(conn, db_name)
+        _checked.add((db_name, os.path.abspath(db_path), file_identity(db_path)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply schema migrations to the application databases")
+    parser.add_argument("--db", choices=list(MIGRATIONS), nargs="+", default=list(MIGRATIONS), help="Databases to migrate")
+    parser.add_argument("--status", action="store_true", help="Only print current and latest schema versions")
+    args = parser.parse_args()
+    for db_name in args.db:
+        db_path = get_db_path(db_name)
+        if args.status and not os.path.exists(db_path):
+            print(f"{db_name}: not created")
+            continue
+        with db_connection(db_path) as conn:
+            if args.status:
+                print(f"{db_name}: version {get_schema_version(conn)} of {latest_version(db_name)}")
+            else:
+                print(f"{db_name}: version {migrate(conn, db_name)}")
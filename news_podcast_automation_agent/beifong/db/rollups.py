@@ -0,0 +1,302 @@
+import argparse
+import os
+import sys
+from db.config import get_db_path
+from db.connection import db_connection
+from db.timestamps import to_epoch
+
+# database -> [(table, column)] whose per-value row counts are kept in value_counts by triggers
+VALUE_COUNTS = {
+    "tracking_db": [
+        ("crawled_articles", "processed"),
+        ("crawled_articles", "ai_status"),
+        ("feed_entries", "crawl_status"),
+        ("article_categories", "category_name"),
+    ],
+}
+COUNT_VALUE_SQL = "COALESCE(CAST({row}{column} AS TEXT), '')"
+TASK_EXECUTION_DURATION_SQL = "CASE WHEN {row}end_time IS NOT NULL THEN (julianday({row}end_time) - julianday({row}start_time)) * 86400.0 END"
+# Executions without a parseable start_time are kept under day ''
+TASK_EXECUTION_ROLLUP = {"day": "COALESCE(date({row}start_time), '')", "status": "COALESCE({row}status, '')"}
+
+# Dashboard reads: a handful of rollup rows instead of aggregating the source tables
+CATEGORY_COUNTS_SQL = """
+SELECT value AS category_name, row_count AS article_count
+FROM value_counts
+WHERE table_name = 'article_categories' AND column_name = 'category_name' AND row_count > 0
+ORDER BY article_count DESC
+"""
+# Executions started on or after the day of the cutoff timestamp
+TASK_EXECUTION_STATS_SQL = """
+SELECT
+    COALESCE(SUM(executions), 0) as total_executions,
+    COALESCE(SUM(CASE WHEN status = 'success' THEN executions ELSE 0 END), 0) as successful_executions,
+    COALESCE(SUM(CASE WHEN status = 'failed' THEN executions ELSE 0 END), 0) as failed_executions,
+    COALESCE(SUM(CASE WHEN status = 'running' THEN executions ELSE 0 END), 0) as running_executions,
+    COALESCE(SUM(duration_seconds) / NULLIF(SUM(timed_executions), 0), 0) as avg_execution_time_seconds
+FROM task_execution_daily
+WHERE day >= date(?)
+"""
+
+# Social dashboard buckets, maintained by tools/social/db.py as posts and their analysis are written:
+# (table, bucket seconds, key column -> expression, joined label table). Empty keys are stored as ''.
+POST_ROLLUPS = [
+    ("post_sentiment_hourly", 3600, {"platform": "p.platform", "sentiment": "p.sentiment"}, ""),
+    (
+        "post_user_daily",
+        86400,
+        {"platform": "p.platform", "user_handle": "p.user_handle", "user_display_name": "p.user_display_name", "sentiment": "p.sentiment"},
+        "",
+    ),
+    ("post_category_daily", 86400, {"category": "label.category", "sentiment": "p.sentiment"}, "JOIN post_categories label ON label.post_id = p.post_id"),
+    ("post_tag_daily", 86400, {"tag": "label.tag", "sentiment": "p.sentiment"}, "JOIN post_tags label ON label.post_id = p.post_id"),
+]
+
+
+def ensure_value_counts(conn, db_name):
+    """Create value_counts and the triggers that keep it current, then count the existing rows."""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS value_counts (
+        table_name TEXT NOT NULL,
+        column_name TEXT NOT NULL,
+        value TEXT NOT NULL,
+        row_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (table_name, column_name, value)
+    )
+    """)
+    for table, column in VALUE_COUNTS[db_name]:
+        new_value = COUNT_VALUE_SQL.format(row="new.", column=column)
+        old_value = COUNT_VALUE_SQL.format(row="old.", column=column)
+        increment = f"""
+            INSERT INTO value_counts (table_name, column_name, value, row_count) VALUES ('{table}', '{column}', {new_value}, 1)
+            ON CONFLICT (table_name, column_name, value) DO UPDATE SET row_count = row_count + 1;
+        """
+        decrement = f"UPDATE value_counts SET row_count = row_count - 1 WHERE table_name = '{table}' AND column_name = '{column}' AND value = {old_value};"
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_count_insert AFTER INSERT ON {table} BEGIN {increment} END")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_count_delete AFTER DELETE ON {table} BEGIN {decrement} END")
+        conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_count_update AFTER UPDATE OF {column} ON {table}
+        WHEN {old_value} IS NOT {new_value}
+        BEGIN {decrement} {increment} END
+        """)
+        rebuild_value_counts(conn, table, column)
+
+
+def rebuild_value_counts(conn, table, column):
+    conn.execute("DELETE FROM value_counts WHERE table_name = ? AND column_name = ?", (table, column))
+    conn.execute(
+        f"""
+        INSERT INTO value_counts (table_name, column_name, value, row_count)
+        SELECT ?, ?, {COUNT_VALUE_SQL.format(row="", column=column)} AS value, COUNT(*) FROM {table} GROUP BY value
+        """,
+        (table, column),
+    )
+
+
+def ensure_task_execution_rollup(conn):
+    """Create the per-day, per-status task execution rollup, its triggers, and fill it from history."""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS task_execution_daily (
+        day TEXT NOT NULL,
+        status TEXT NOT NULL,
+        executions INTEGER NOT NULL DEFAULT 0,
+        timed_executions INTEGER NOT NULL DEFAULT 0,
+        duration_seconds REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, status)
+    )
+    """)
+
+    def keys(row):
+        return {name: expression.format(row=row) for name, expression in TASK_EXECUTION_ROLLUP.items()}
+
+    def add(row):
+        key = keys(row)
+        duration = TASK_EXECUTION_DURATION_SQL.format(row=row)
+        return f"""
+            INSERT INTO task_execution_daily (day, status, executions, timed_executions, duration_seconds)
+            VALUES ({key["day"]}, {key["status"]}, 1, ({duration}) IS NOT NULL, COALESCE({duration}, 0))
+            ON CONFLICT (day, status) DO UPDATE SET
+                executions = executions + 1,
+                timed_executions = timed_executions + excluded.timed_executions,
+                duration_seconds = duration_seconds + excluded.duration_seconds;
+        """
+
+    def remove(row):
+        key = keys(row)
+        duration = TASK_EXECUTION_DURATION_SQL.format(row=row)
+        return f"""
+            UPDATE task_execution_daily SET
+                executions = executions - 1,
+                timed_executions = timed_executions - (({duration}) IS NOT NULL),
+                duration_seconds = duration_seconds - COALESCE({duration}, 0)
+            WHERE day = {key["day"]} AND status = {key["status"]};
+        """
+
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_task_executions_rollup_insert AFTER INSERT ON task_executions BEGIN {add('new.')} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_task_executions_rollup_delete AFTER DELETE ON task_executions BEGIN {remove('old.')} END")
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_task_executions_rollup_update AFTER UPDATE OF start_time, end_time, status ON task_executions
+    BEGIN {remove('old.')} {add('new.')} END
+    """)
+    rebuild_task_execution_rollup(conn)
+
+
+def rebuild_task_execution_rollup(conn):
+    duration = TASK_EXECUTION_DURATION_SQL.format(row="")
+    conn.execute("DELETE FROM task_execution_daily")
+    conn.execute(f"""
+    INSERT INTO task_execution_daily (day, status, executions, timed_executions, duration_seconds)
+    SELECT {TASK_EXECUTION_ROLLUP["day"].format(row="")} AS day, {TASK_EXECUTION_ROLLUP["status"].format(row="")} AS status,
+           COUNT(*), COUNT({duration}), COALESCE(SUM({duration}), 0)
+    FROM task_executions
+    GROUP BY day, status
+    """)
+
+
+def ensure_post_rollups(conn):
+    for table, _, keys, _ in POST_ROLLUPS:
+        key_columns = ",\n        ".join(f"{column} TEXT NOT NULL{' COLLATE NOCASE' if column in ('category', 'tag') else ''}" for column in keys)
+        conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            bucket_ts INTEGER NOT NULL,
+            {key_columns},
+            post_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket_ts, {", ".join(keys)})
+        )
+        """)
+    rebuild_post_rollups(conn)
+
+
+def add_to_post_rollups(conn, post_ids, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) the current state of `post_ids` to every post rollup.
+
+    Writers remove a post's contribution before changing its sentiment, labels or author and
+    add it back afterwards, so the buckets follow every write without rescanning posts.
+    """
+    post_ids = list(post_ids)
+    for i in range(0, len(post_ids), 500):
+        chunk = post_ids[i : i + 500]
+        placeholders = ",".join(["?"] * len(chunk))
+        for table, bucket, keys, join in POST_ROLLUPS:
+            conn.execute(post_rollup_sql(table, bucket, keys, join, f"p.post_id IN ({placeholders})"), [sign, *chunk])
+
+
+def post_rollup_select(bucket, keys, join, where):
+    """Bucket posts matching `where` the way a rollup stores them; takes the count sign as its first parameter."""
+    values = ", ".join(f"COALESCE({expression}, '') AS {column}" for column, expression in keys.items())
+    return f"""
+    SELECT p.post_ts - p.post_ts % {bucket} AS bucket_ts, {values}, ? * COUNT(*) AS post_count
+    FROM posts p {join}
+    WHERE p.post_ts IS NOT NULL AND {where}
+    GROUP BY 1, {", ".join(str(position) for position in range(2, len(keys) + 2))}
+    """
+
+
+def post_rollup_sql(table, bucket, keys, join, where):
+    columns = ", ".join(keys)
+    return f"""
+    INSERT INTO {table} (bucket_ts, {columns}, post_count)
+    {post_rollup_select(bucket, keys, join, where)}
+    ON CONFLICT (bucket_ts, {columns}) DO UPDATE SET post_count = post_count + excluded.post_count
+    """
+
+
+def rebuild_post_rollups(conn):
+    for table, bucket, keys, join in POST_ROLLUPS:
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(post_rollup_sql(table, bucket, keys, join, "1 = 1"), (1,))
+
+
+def post_rollup_source(table, date_from=None, date_to=None):
+    """
+    Rows of a post rollup restricted to [date_from, date_to), for use after FROM; returns (sql, params).
+
+    Buckets that lie wholly inside the range are read from the rollup. Bounds that fall inside
+    a bucket would over-count by the rest of that bucket, so the partial edge buckets are counted
+    from posts.post_ts instead and the totals match the raw posts exactly. Without bounds this is
+    the rollup table itself. An unparseable bound matches nothing.
+    """
+    _, bucket, keys, join = next(rollup for rollup in POST_ROLLUPS if rollup[0] == table)
+    if not date_from and not date_to:
+        return table, []
+    start = to_epoch(date_from) if date_from else None
+    end = to_epoch(date_to) if date_to else None
+    if (date_from and start is None) or (date_to and end is None):
+        return f"(SELECT * FROM {table} WHERE 0 = 1)", []
+
+    # Whole buckets: [inner_start, inner_end), the edges on either side come from posts
+    inner_start = None if start is None else -(-start // bucket) * bucket
+    inner_end = None if end is None else end - end % bucket
+    columns = ", ".join(["bucket_ts", *keys, "post_count"])
+    raw_select = post_rollup_select(bucket, keys, join, "p.post_ts >= ? AND p.post_ts < ?")
+    if start is not None and end is not None and inner_start >= inner_end:
+        return f"({raw_select})", [1, start, end]
+
+    conditions, parts, params = [], [], []
+    for condition, value in (("bucket_ts >= ?", inner_start), ("bucket_ts < ?", inner_end)):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    parts.append(f"SELECT {columns} FROM {table} WHERE {' AND '.join(conditions)}")
+    for edge_start, edge_end in ((start, inner_start), (inner_end, end)):
+        if edge_start is not None and edge_start < edge_end:
+            parts.append(raw_select)
+            params.extend([1, edge_start, edge_end])
+    return f"({' UNION ALL '.join(parts)})", params
+
+
+# database -> [(rollup table, key columns, count column that is 0 for buckets emptied by deletes and updates)]
+ROLLUP_TABLES = {
+    "tracking_db": [("value_counts", ["table_name", "column_name", "value"], "row_count")],
+    "tasks_db": [("task_execution_daily", ["day", "status"], "executions")],
+    "social_media_db": [(table, ["bucket_ts", *keys], "post_count") for table, _, keys, _ in POST_ROLLUPS],
+}
+
+
+def read_rollup(conn, db_name):
+    rollup = {}
+    for table, key_columns, count_column in ROLLUP_TABLES[db_name]:
+        for row in conn.execute(f"SELECT * FROM {table} WHERE {count_column} != 0").fetchall():
+            rollup[(table, *row[: len(key_columns)])] = tuple(round(value, 3) if isinstance(value, float) else value for value in row)
+    return rollup
+
+
+def rebuild_rollups(conn, db_name):
+    """Recompute the rollups of `db_name` from their source tables; returns how many rollup rows had drifted."""
+    before = read_rollup(conn, db_name)
+    if db_name == "tasks_db":
+        rebuild_task_execution_rollup(conn)
+    if db_name == "social_media_db":
+        rebuild_post_rollups(conn)
+    for table, column in VALUE_COUNTS.get(db_name, []):
+        rebuild_value_counts(conn, table, column)
+    after = read_rollup(conn, db_name)
+    return sum(1 for key in before.keys() | after.keys() if before.get(key) != after.get(key))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the trigger-maintained rollup tables from their source tables")
+    parser.add_argument("--db", choices=list(ROLLUP_TABLES), nargs="+", default=list(ROLLUP_TABLES), help="Databases to rebuild")
+    parser.add_argument("--check", action="store_true", help="Only report drift between the rollups and the source tables")
+    args = parser.parse_args()
+    drift_found = False
+    for db_name in args.db:
+        db_path = get_db_path(db_name)
+        if not os.path.exists(db_path):
+            print(f"{db_name}: not created")
+            continue
+        with db_connection(db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                drifted = rebuild_rollups(conn, db_name)
+                if args.check:
+                    conn.rollback()
+                else:
+                    conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        drift_found = drift_found or bool(drifted)
+        print(f"{db_name}: {drifted} drifted rollup rows{'' if args.check else ', rebuilt'}")
+    sys.exit(1 if args.check and drift_found else 0)
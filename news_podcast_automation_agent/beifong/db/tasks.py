@@ -1,5 +1,7 @@
+import time
 from datetime import datetime, timedelta
-from .connection import execute_query, db_connection
+from .connection import execute_query
+from .rollups import TASK_EXECUTION_STATS_SQL
 
 
 def create_task(
@@ -126,13 +128,8 @@ def create_task_execution(tasks_db_path, task_id, status, error_message=None, ou
     VALUES (?, ?, ?, ?, ?)
     """
     params = (task_id, start_time, status, error_message, output)
-    execute_query(tasks_db_path, query, params)
     try:
-        with db_connection(tasks_db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.lastrowid  # Return the ID of the inserted row
+        return execute_query(tasks_db_path, query, params)  # Return the ID of the inserted row
     except Exception as e:
         print(f"Database error in create_task_execution: {e}")
         return None  #
@@ -211,19 +208,8 @@ def get_task_stats(tasks_db_path):
 
 def get_execution_stats(tasks_db_path, days=7):
     cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-    query = """
-    SELECT 
-        COUNT(*) as total_executions,
-        COALESCE(SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END), 0) as successful_executions,
-        COALESCE(SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END), 0) as failed_executions,
-        COALESCE(SUM(CASE WHEN status = 'running' THEN 1 ELSE 0 END), 0) as running_executions,
-        COALESCE(AVG(CASE WHEN end_time IS NOT NULL 
-            THEN (julianday(end_time) - julianday(start_time)) * 86400.0 
-            ELSE NULL END), 0) as avg_execution_time_seconds
-    FROM task_executions
-    WHERE start_time >= ?
-    """
-    return execute_query(tasks_db_path, query, (cutoff_date,), fetch=True, fetch_one=True)
+    # Summed from the per-day task_execution_daily rollup, so the window is whole days
+    return execute_query(tasks_db_path, TASK_EXECUTION_STATS_SQL, (cutoff_date,), fetch=True, fetch_one=True)
 
 
 def get_pending_tasks(tasks_db_path):
@@ -231,17 +217,9 @@ def get_pending_tasks(tasks_db_path):
     SELECT id, name, description, command, frequency, frequency_unit, enabled, last_run
     FROM tasks
     WHERE enabled = 1
-    AND (
-        last_run IS NULL 
-        OR 
-        CASE frequency_unit
-            WHEN 'minutes' THEN datetime(last_run, '+' || frequency || ' minutes') <= datetime('now', 'localtime')
-            WHEN 'hours' THEN datetime(last_run, '+' || frequency || ' hours') <= datetime('now', 'localtime')
-            WHEN 'days' THEN datetime(last_run, '+' || frequency || ' days') <= datetime('now', 'localtime')
-            ELSE datetime(last_run, '+' || frequency || ' seconds') <= datetime('now', 'localtime')
-        END
-    )
+    AND next_run_ts <= ?
     ORDER BY last_run
     """
-    tasks = execute_query(tasks_db_path, query, fetch=True)
+    # next_run_ts is maintained by triggers on tasks, so due tasks are an index range scan
+    tasks = execute_query(tasks_db_path, query, (int(time.time()),), fetch=True)
     return tasks
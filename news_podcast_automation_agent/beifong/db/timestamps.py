@@ -0,0 +1,147 @@
+import argparse
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from db.config import get_db_path
+from db.connection import db_connection
+
+# Integer epoch columns kept next to the free-form timestamp text each source emits:
+# database -> [(table, epoch column, source column, fallback column used when the source does not parse)]
+EPOCH_COLUMNS = {
+    "tracking_db": [
+        ("crawled_articles", "published_ts", "published_date", "crawled_date"),
+        ("feed_entries", "published_ts", "published_date", "processed_date"),
+    ],
+    "social_media_db": [("posts", "post_ts", "post_timestamp", "created_at")],
+}
+
+EXTRA_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d %b %Y", "%B %d, %Y", "%b %d, %Y", "%a, %d %b %Y %H:%M:%S"]
+
+
+def to_epoch(value):
+    """
+    Parse a timestamp in any of the formats feeds and scrapers emit (epoch numbers, ISO 8601,
+    RFC 2822 as used by RSS) to integer epoch seconds. Naive values are taken as UTC, the same
+    way SQLite's datetime() reads them. Returns None when the value cannot be parsed.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, (int, float)):
+        return int(value)
+    else:
+        text = str(value).strip()
+        if text.lstrip("-").isdigit():
+            return int(text)
+        parsed = None
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                parsed = parsedate_to_datetime(text)
+            except (TypeError, ValueError, IndexError):
+                for date_format in EXTRA_FORMATS:
+                    try:
+                        parsed = datetime.strptime(text, date_format)
+                        break
+                    except ValueError:
+                        continue
+        if parsed is None:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def to_epoch_or_now(value):
+    epoch = to_epoch(value)
+    return epoch if epoch is not None else int(time.time())
+
+
+def epoch_range_clauses(column, date_from=None, date_to=None):
+    """
+    Build index-friendly range conditions on an epoch column for API date filters.
+
+    Returns:
+        List of (condition, param) tuples; an unparseable bound yields a condition that matches nothing
+    """
+    clauses = []
+    for operator, value in ((">=", date_from), ("<=", date_to)):
+        if value:
+            epoch = to_epoch(value)
+            clauses.append((f"{column} {operator} ?", epoch) if epoch is not None else ("0 = 1", None))
+    return clauses
+
+
+def apply_epoch_range(query_parts, query_params, column, date_from=None, date_to=None, prefix="AND "):
+    for condition, param in epoch_range_clauses(column, date_from, date_to):
+        query_parts.append(f"{prefix}{condition}")
+        if param is not None:
+            query_params.append(param)
+
+
+def ensure_epoch_column(conn, table, column):
+    """Add an epoch column to an existing table. Returns True when the column was added."""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+    if not columns or column in columns:
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER")
+    return True
+
+
+def backfill_epoch_column(conn, table, column, source_column, fallback_column=None, chunk_size=5000):
+    """Fill the epoch column of rows written before it existed, without committing."""
+    filled = 0
+    last_rowid = 0
+    while True:
+        rows = conn.execute(
+            f"SELECT rowid, {source_column}, {fallback_column or 'NULL'} FROM {table} WHERE rowid > ? AND {column} IS NULL ORDER BY rowid LIMIT ?",
+            (last_rowid, chunk_size),
+        ).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        # rows with no parseable timestamp at all sort as the oldest instead of staying NULL
+        updates = [(to_epoch(value) or to_epoch(fallback) or 0, rowid) for rowid, value, fallback in rows]
+        conn.executemany(f"UPDATE {table} SET {column} = ? WHERE rowid = ?", updates)
+        filled += len(updates)
+    return filled
+
+
+def ensure_epoch_default_trigger(conn, table, column, source_column, fallback_column=None):
+    """
+    Fill the epoch column in SQL for rows inserted without it (writers outside the ingest
+    helpers); SQLite only understands ISO dates, so anything else falls back to the insert time.
+    """
+    fallback = f"strftime('%s', NEW.{fallback_column}), " if fallback_column else ""
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_default
+    AFTER INSERT ON {table} WHEN NEW.{column} IS NULL
+    BEGIN
+        UPDATE {table} SET {column} = CAST(COALESCE(strftime('%s', NEW.{source_column}), {fallback}strftime('%s', 'now')) AS INTEGER)
+        WHERE rowid = NEW.rowid;
+    END
+    """)
+
+
+def ensure_epoch_columns(conn, db_name):
+    """Add, backfill and default the epoch columns of one database, without committing."""
+    for table, column, source_column, fallback_column in EPOCH_COLUMNS.get(db_name, []):
+        if ensure_epoch_column(conn, table, column):
+            filled = backfill_epoch_column(conn, table, column, source_column, fallback_column)
+            print(f"Backfilled {table}.{column} for {filled} rows")
+        ensure_epoch_default_trigger(conn, table, column, source_column, fallback_column)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill normalized epoch timestamp columns")
+    parser.add_argument("--db", choices=list(EPOCH_COLUMNS), nargs="+", default=list(EPOCH_COLUMNS), help="Databases to backfill")
+    args = parser.parse_args()
+    for db_name in args.db:
+        with db_connection(get_db_path(db_name)) as conn:
+            for table, column, source_column, fallback_column in EPOCH_COLUMNS[db_name]:
+                ensure_epoch_column(conn, table, column)
+                filled = backfill_epoch_column(conn, table, column, source_column, fallback_column)
+                print(f"Backfilled {table}.{column} for {filled} rows")
+            conn.commit()
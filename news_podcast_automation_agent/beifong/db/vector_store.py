@@ -0,0 +1,253 @@
+import argparse
+import fcntl
+import json
+import os
+import threading
+import numpy as np
+from db.config import get_tracking_db_path, get_vector_store_path
+from db.connection import db_connection
+
+VECTOR_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+DEFAULT_VECTOR_DTYPE = os.environ.get("VECTOR_STORE_DTYPE", "float16")
+
+
+def record_dtype(dimension, dtype):
+    return np.dtype([("article_id", "<i8"), ("scale", "<f4"), ("vector", VECTOR_DTYPES[dtype], (dimension,))])
+
+
+class VectorStore:
+    """
+    Append-only, memory-mapped matrix of article embeddings addressed by article id.
+
+    Each fixed-size record holds the article id, a dequantization scale and the vector
+    stored as float32, float16 or per-row scaled int8. SQLite keeps only the record
+    offset (article_embeddings.vector_offset); re-embedding an article appends a new
+    record and the newest record for an article wins. Readers slice the memory map
+    directly, so bulk reads run at disk bandwidth instead of one row fetch per vector.
+    Appends hold an exclusive flock on the data file, so processes writing the same
+    store never truncate each other's records or get the same offsets back.
+    """
+
+    def __init__(self, path, dtype=DEFAULT_VECTOR_DTYPE):
+        self.path = path
+        self.meta_path = f"{path}.meta.json"
+        self.dimension = None
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        self._records = None
+        self._latest = {}
+        self._scanned = 0
+        self._load_meta()
+        if self.dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector store dtype '{self.dtype}', expected one of {list(VECTOR_DTYPES)}")
+
+    def _load_meta(self):
+        # Another process may lay the store out after this one was created, so look again until it has
+        if self.dimension is None and os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            self.dtype = meta["dtype"]
+            self.dimension = meta["dimension"]
+
+    def _ensure_layout(self, dimension):
+        self._load_meta()
+        if self.dimension is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.meta_path, "w") as f:
+                json.dump({"dimension": int(dimension), "dtype": self.dtype}, f)
+            self.dimension = int(dimension)
+        elif self.dimension != dimension:
+            raise ValueError(f"Vector dimension mismatch: store holds {self.dimension}, got {dimension}")
+
+    def _encode(self, article_ids, vectors):
+        records = np.zeros(len(article_ids), dtype=record_dtype(self.dimension, self.dtype))
+        records["article_id"] = article_ids
+        if self.dtype == "int8":
+            scale = np.abs(vectors).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            records["scale"] = scale
+            records["vector"] = np.clip(np.rint(vectors / scale[:, None]), -127, 127).astype(np.int8)
+        else:
+            records["scale"] = 1.0
+            records["vector"] = vectors.astype(VECTOR_DTYPES[self.dtype])
+        return records
+
+    def append(self, article_ids, vectors):
+        """Append vectors for the given articles and return their record offsets."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if len(article_ids) == 0:
+            return []
+        with self._lock:
+            self._ensure_layout(vectors.shape[1])
+            records = self._encode(np.asarray(article_ids, dtype=np.int64), vectors)
+            with open(self.path, "ab") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    # Sized under the lock; a torn record from an interrupted append is overwritten, not counted
+                    start = os.fstat(f.fileno()).st_size // records.itemsize
+                    f.truncate(start * records.itemsize)
+                    f.write(records.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return list(range(start, start + len(records)))
+
+    def records(self):
+        self._load_meta()
+        if self.dimension is None or not os.path.exists(self.path):
+            return None
+        dtype = record_dtype(self.dimension, self.dtype)
+        count = os.path.getsize(self.path) // dtype.itemsize
+        records = self._records
+        if records is None or records.shape[0] != count:
+            records = np.memmap(self.path, dtype=dtype, mode="r", shape=(count,)) if count else None
+            self._records = records
+        return records
+
+    def count(self):
+        records = self.records()
+        return 0 if records is None else records.shape[0]
+
+    def decode(self, records):
+        vectors = records["vector"].astype(np.float32)
+        if self.dtype == "int8":
+            vectors *= records["scale"][:, None]
+        return vectors
+
+    def read_records(self, offsets):
+        records = self.records()
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if records is None or (len(offsets) and offsets.max() >= records.shape[0]):
+            raise IndexError(f"Vector offset out of range for store {self.path}")
+        return records[offsets]
+
+    def read(self, offsets):
+        return self.decode(self.read_records(offsets))
+
+    def latest_offsets(self, article_ids):
+        records = self.records()
+        if records is None:
+            return {}
+        with self._lock:
+            if self._scanned < records.shape[0]:
+                new_ids = np.asarray(records["article_id"][self._scanned :])
+                self._latest.update(zip(new_ids.tolist(), range(self._scanned, records.shape[0])))
+                self._scanned = records.shape[0]
+            return {article_id: self._latest[article_id] for article_id in article_ids if article_id in self._latest}
+
+    def vectors_for_articles(self, article_ids):
+        offsets = self.latest_offsets(article_ids)
+        if not offsets:
+            return [], None
+        found_ids = list(offsets.keys())
+        return found_ids, self.read([offsets[article_id] for article_id in found_ids])
+
+    def stats(self):
+        return {"path": self.path, "dtype": self.dtype, "dimension": self.dimension, "vectors": self.count()}
+
+
+def embedding_rows_to_vectors(rows, store=None):
+    """
+    Resolve article_embeddings rows to a float32 matrix.
+
+    Rows either carry a vector_offset into the vector store or, for embeddings written
+    before the store existed, an inline float32 BLOB. A stored record is only used when
+    it belongs to the row's article_id. Rows that cannot be resolved or whose dimension
+    differs from the first resolved row are dropped.
+
+    Returns:
+        Tuple of (kept_rows, vectors) where vectors is None when no row was kept
+    """
+    if not rows:
+        return [], None
+    vectors = [None] * len(rows)
+    stored = [i for i, row in enumerate(rows) if row["vector_offset"] is not None]
+    if stored:
+        store = store or get_vector_store()
+        try:
+            records = store.read_records([rows[i]["vector_offset"] for i in stored])
+            stored_vectors = store.decode(records)
+            mismatched = 0
+            for position, i in enumerate(stored):
+                if records["article_id"][position] != rows[i]["article_id"]:
+                    mismatched += 1
+                    continue
+                vectors[i] = stored_vectors[position]
+            if mismatched:
+                print(f"Skipped {mismatched} vector offsets that point at another article's record in {store.path}")
+        except (IndexError, TypeError) as e:
+            print(f"Error reading vectors from store: {str(e)}")
+    for i, row in enumerate(rows):
+        if vectors[i] is None and row["embedding"]:
+            vectors[i] = np.frombuffer(row["embedding"], dtype=np.float32)
+    dimension = next((vector.shape[0] for vector in vectors if vector is not None), None)
+    kept = [i for i, vector in enumerate(vectors) if vector is not None and vector.shape[0] == dimension]
+    if not kept:
+        return [], None
+    return [rows[i] for i in kept], np.vstack([vectors[i] for i in kept]).astype(np.float32)
+
+
+def ensure_vector_offset_column(conn):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(article_embeddings)").fetchall()]
+    if columns and "vector_offset" not in columns:
+        conn.execute("ALTER TABLE article_embeddings ADD COLUMN vector_offset INTEGER")
+
+
+def migrate_blobs_to_store(tracking_db_path=None, store=None, chunk_size=5000):
+    """Move inline embedding BLOBs into the vector store and blank them in SQLite."""
+    if tracking_db_path is None:
+        tracking_db_path = get_tracking_db_path()
+    store = store or get_vector_store()
+    moved = 0
+    with db_connection(tracking_db_path) as conn:
+        ensure_vector_offset_column(conn)
+        while True:
+            rows = conn.execute(
+                "SELECT id, article_id, embedding, vector_offset FROM article_embeddings WHERE vector_offset IS NULL AND length(embedding) > 0 ORDER BY id LIMIT ?",
+                (chunk_size,),
+            ).fetchall()
+            if not rows:
+                break
+            rows, vectors = embedding_rows_to_vectors(rows, store)
+            if not rows:
+                break
+            offsets = store.append([row["article_id"] for row in rows], vectors)
+            conn.executemany(
+                "UPDATE article_embeddings SET vector_offset = ?, embedding = X'' WHERE id = ?",
+                [(offset, row["id"]) for offset, row in zip(offsets, rows)],
+            )
+            conn.commit()
+            moved += len(rows)
+            print(f"Moved {moved} embeddings into the vector store")
+    print("Run VACUUM on the tracking database to reclaim the freed space")
+    return moved
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store(path=None):
+    if path is None:
+        path = get_vector_store_path()
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = VectorStore(path)
+            _stores[key] = store
+        return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the memory-mapped article vector store")
+    parser.add_argument("--migrate", action="store_true", help="Move inline embedding BLOBs from the tracking database into the store")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the tracking database after migrating")
+    args = parser.parse_args()
+    if args.migrate:
+        migrate_blobs_to_store()
+        if args.vacuum:
+            with db_connection(get_tracking_db_path()) as conn:
+                conn.execute("VACUUM")
+    print(get_vector_store().stats())
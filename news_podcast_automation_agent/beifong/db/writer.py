@@ -0,0 +1,191 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from .connection import db_connection
+
+GROUP_COMMIT_WINDOW_MS = float(os.environ.get("DB_GROUP_COMMIT_WINDOW_MS", "2"))
+GROUP_COMMIT_MAX_BATCH = int(os.environ.get("DB_GROUP_COMMIT_MAX_BATCH", "256"))
+
+_STOP = object()
+
+
+class GroupCommitConnection:
+    """
+    Connection handed to queued write operations.
+
+    commit() is deferred to the group commit and rollback() only undoes the current
+    operation, so existing helpers that commit on their own can be queued unchanged.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._conn.execute("ROLLBACK TO group_write")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class WriteQueue:
+    """
+    Single writer thread for one SQLite database that group-commits queued writes.
+
+    Callers submit func(conn, *args) and get a Future. The writer drains everything
+    queued within a short window (or up to max_batch operations), runs each operation
+    inside its own SAVEPOINT in one BEGIN IMMEDIATE transaction and commits once, so N
+    concurrent writers pay for one lock acquisition and one fsync instead of N and never
+    see "database is locked" from each other. Futures resolve only after the commit; an
+    operation that raises is rolled back to its savepoint without affecting the others.
+    """
+
+    def __init__(self, db_path, window_ms=GROUP_COMMIT_WINDOW_MS, max_batch=GROUP_COMMIT_MAX_BATCH):
+        self.db_path = db_path
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats = {"operations": 0, "failed_operations": 0, "commits": 0, "failed_commits": 0, "largest_batch": 0}
+        self._thread = threading.Thread(target=self._run, name=f"db-writer-{os.path.basename(db_path)}", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args):
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # A queued operation writing again joins the open group transaction
+            with db_connection(self.db_path) as conn:
+                try:
+                    future.set_result(func(GroupCommitConnection(conn), *args))
+                except Exception as e:
+                    future.set_exception(e)
+            return future
+        self._queue.put((future, func, args))
+        return future
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._commit(batch)
+
+    def _commit(self, batch):
+        batch = [item for item in batch if item[0].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        outcomes = []
+        try:
+            with db_connection(self.db_path) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for future, func, args in batch:
+                    conn.execute("SAVEPOINT group_write")
+                    try:
+                        outcomes.append((future, func(GroupCommitConnection(conn), *args), None))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO group_write")
+                        outcomes.append((future, None, e))
+                    conn.execute("RELEASE group_write")
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Group commit of {len(batch)} writes to {self.db_path} failed: {str(e)}")
+            self._count(len(batch), len(batch), committed=False)
+            for future, _, _ in batch:
+                future.set_exception(e)
+            return
+        failed = sum(1 for _, _, error in outcomes if error is not None)
+        self._count(len(batch), failed, committed=True)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _count(self, operations, failed, committed):
+        with self._stats_lock:
+            self._stats["operations"] += operations
+            self._stats["failed_operations"] += failed
+            self._stats["commits" if committed else "failed_commits"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], operations)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize()
+        stats["average_batch"] = round(stats["operations"] / stats["commits"], 2) if stats["commits"] else 0.0
+        return stats
+
+    def close(self, timeout=None):
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path):
+    key = (os.path.abspath(db_path), os.getpid())
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            # Writer threads do not survive fork, so each process gets its own
+            writer = _writers[key] = WriteQueue(db_path)
+        return writer
+
+
+def submit_write(db_path, func, *args):
+    return get_writer(db_path).submit(func, *args)
+
+
+def run_write(db_path, func, *args):
+    """Run func(conn, *args) through the database's writer and wait for it to be committed."""
+    return submit_write(db_path, func, *args).result()
+
+
+def execute_write(conn, query, params=()):
+    return conn.execute(query, params).lastrowid
+
+
+def execute_write_many(conn, query, params_list):
+    return conn.executemany(query, params_list).rowcount
+
+
+def get_writer_stats():
+    with _writers_lock:
+        writers = [writer for (_, pid), writer in _writers.items() if pid == os.getpid()]
+    return {writer.db_path: writer.stats() for writer in writers}
+
+
+def shutdown_writers(timeout=None):
+    with _writers_lock:
+        writers = [writer for (_, pid), writer in _writers.items() if pid == os.getpid()]
+        for key in [key for key in _writers if key[1] == os.getpid()]:
+            del _writers[key]
+    for writer in writers:
+        writer.close(timeout)
+
+
+atexit.register(shutdown_writers)
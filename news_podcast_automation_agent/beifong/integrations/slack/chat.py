@@ -1,6 +1,5 @@
 import os
 import re
-import sqlite3
 import asyncio
 import aiohttp
 import json
@@ -11,6 +10,8 @@ from dotenv import load_dotenv
 from typing import Dict, List
 from datetime import datetime
 from db.config import get_slack_sessions_db_path
+from db.connection import db_connection
+from db.writer import execute_write, run_write
 
 load_dotenv()
 
@@ -28,10 +29,8 @@ def send_error_message(thread_key: str, error_message: str):
     asyncio.create_task(send_slack_message(thread_key, f"❌ {error_message}"))
 
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
+def create_tables(conn):
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS thread_sessions (
             thread_key TEXT PRIMARY KEY,
             session_id TEXT NOT NULL,
@@ -41,61 +40,53 @@ def init_db():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS session_state (
             session_id TEXT PRIMARY KEY,
             state_data TEXT,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
-    conn.commit()
-    conn.close()
+
+
+def init_db():
+    run_write(DB_PATH, create_tables)
 
 
 def save_session_mapping(thread_key: str, session_id: str, channel_id: str, user_id: str = None):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
+    run_write(
+        DB_PATH,
+        execute_write,
         "INSERT OR REPLACE INTO thread_sessions (thread_key, session_id, channel_id, user_id, updated_at) VALUES (?, ?, ?, ?, ?)",
         (thread_key, session_id, channel_id, user_id, datetime.now().isoformat()),
     )
-    conn.commit()
-    conn.close()
 
 
 def get_session_info(thread_key: str):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT session_id, channel_id, user_id FROM thread_sessions WHERE thread_key = ?",
-        (thread_key,),
-    )
-    result = cursor.fetchone()
-    conn.close()
-    return result if result else None
+    with db_connection(DB_PATH) as conn:
+        result = conn.execute(
+            "SELECT session_id, channel_id, user_id FROM thread_sessions WHERE thread_key = ?",
+            (thread_key,),
+        ).fetchone()
+    return tuple(result) if result else None
 
 
 def save_session_state(session_id: str, state_data):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
     if isinstance(state_data, str):
         json_data = state_data
     else:
         json_data = json.dumps(state_data)
-    cursor.execute(
+    run_write(
+        DB_PATH,
+        execute_write,
         "INSERT OR REPLACE INTO session_state (session_id, state_data, updated_at) VALUES (?, ?, ?)",
         (session_id, json_data, datetime.now().isoformat()),
     )
-    conn.commit()
-    conn.close()
 
 
 def get_session_state(session_id: str):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT state_data FROM session_state WHERE session_id = ?", (session_id,))
-    result = cursor.fetchone()
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        result = conn.execute("SELECT state_data FROM session_state WHERE session_id = ?", (session_id,)).fetchone()
     if result:
         try:
             return json.loads(result[0])
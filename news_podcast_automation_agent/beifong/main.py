@@ -8,6 +8,9 @@ import aiofiles
 from contextlib import asynccontextmanager
 from routers import article_router, podcast_router, source_router, task_router, podcast_config_router, async_podcast_agent_router, social_media_router
 from services.db_init import init_databases
+from services.db_service import shutdown_db_services
+from db.connection import get_pool_stats
+from db.writer import get_writer_stats
 from dotenv import load_dotenv
 
 
@@ -33,6 +36,7 @@ async def lifespan(app: FastAPI):
     print("Application startup complete!")
     yield
     print("Shutting down application...")
+    shutdown_db_services()
     print("Shutdown complete")
 
 
@@ -56,6 +60,11 @@ app.include_router(async_podcast_agent_router.router, prefix="/api/podcast-agent
 app.include_router(social_media_router.router, prefix="/api/social-media", tags=["social-media"])
 
 
+@app.get("/api/system/db-pool")
+async def db_pool_stats():
+    return {**get_pool_stats(), "writers": get_writer_stats()}
+
+
 @app.get("/stream-audio/{filename}")
 async def stream_audio(filename: str, request: Request):
     audio_path = os.path.join("podcasts/audio", filename)
@@ -10,6 +10,7 @@ class ArticleBase(BaseModel):
     content: Optional[str] = None
     categories: Optional[List[str]] = []
     source_name: Optional[str] = None
+    snippet: Optional[str] = None
 
 
 class Article(ArticleBase):
@@ -26,4 +27,5 @@ class PaginatedArticles(BaseModel):
     per_page: int
     total_pages: int
     has_next: bool
-    has_prev: bool
\ No newline at end of file
+    has_prev: bool
+    next_cursor: Optional[str] = None
\ No newline at end of file
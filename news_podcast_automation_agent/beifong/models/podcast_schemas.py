@@ -79,3 +79,4 @@ class PaginatedPodcasts(BaseModel):
     total_pages: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
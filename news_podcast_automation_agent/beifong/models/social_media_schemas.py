@@ -45,6 +45,7 @@ class PaginatedPosts(BaseModel):
     total_pages: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 class PostFilterParams(BaseModel):
     platform: Optional[str] = None
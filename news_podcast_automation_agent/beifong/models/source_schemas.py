@@ -60,6 +60,7 @@ class PaginatedSources(BaseModel):
     total_pages: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 
 class Category(BaseModel):
@@ -1,46 +1,24 @@
 import time
 import argparse
 import random
-import numpy as np
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import tiktoken
 from openai import OpenAI
 from db.config import get_tracking_db_path
-from db.connection import db_connection, execute_query
+from db.connection import execute_query
+from db.writer import execute_write_many, run_write
+from db.migrations import ensure_schema
+from db.vector_store import get_vector_store
 from utils.load_api_keys import load_api_key
 
 EMBEDDING_MODEL = "text-embedding-3-small"
-
-def create_embedding_table(tracking_db_path):
-    with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='article_embeddings'
-        """)
-        table_exists = cursor.fetchone() is not None
-        if not table_exists:
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS article_embeddings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                article_id INTEGER NOT NULL,
-                embedding BLOB NOT NULL,
-                embedding_model TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                in_faiss_index INTEGER DEFAULT 0,
-                FOREIGN KEY (article_id) REFERENCES crawled_articles(id)
-            )
-            """)
-            cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_article_embeddings_article_id 
-            ON article_embeddings(article_id)
-            """)
-            cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_article_embeddings_in_faiss 
-            ON article_embeddings(in_faiss_index)
-            """)
-            conn.commit()
-            print("Article embeddings table created successfully.")
-        else:
-            print("Article embeddings table already exists.")
+MAX_INPUT_TOKENS = 8191
+MAX_INPUTS_PER_REQUEST = 2048
+DEFAULT_BATCH_TOKEN_BUDGET = 100000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 500
 
 
 def get_articles_without_embeddings(tracking_db_path, limit=20):
@@ -53,7 +31,7 @@ def get_articles_without_embeddings(tracking_db_path, limit=20):
         SELECT 1 FROM article_embeddings ae 
         WHERE ae.article_id = ca.id
     )
-    ORDER BY ca.published_date DESC
+    ORDER BY ca.published_ts DESC
     LIMIT ?
     """
     return execute_query(tracking_db_path, query, (limit,), fetch=True)
@@ -62,25 +40,14 @@ def get_articles_without_embeddings(tracking_db_path, limit=20):
 def mark_articles_as_processing(tracking_db_path, article_ids):
     if not article_ids:
         return 0
+    placeholders = ",".join(["?"] * len(article_ids))
+    query = f"""
+    UPDATE crawled_articles 
+    SET embedding_status = 'processing' 
+    WHERE id IN ({placeholders})
+    """
     try:
-        with db_connection(tracking_db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA table_info(crawled_articles)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if "embedding_status" in columns:
-                placeholders = ",".join(["?"] * len(article_ids))
-                query = f"""
-                UPDATE crawled_articles 
-                SET embedding_status = 'processing' 
-                WHERE id IN ({placeholders})
-                """
-                cursor.execute(query, article_ids)
-                conn.commit()
-                return cursor.rowcount
-            else:
-                print("Note: embedding_status column doesn't exist in crawled_articles table.")
-                print("Skipping article marking step (this is non-critical).")
-                return len(article_ids)
+        return run_write(tracking_db_path, execute_write_many, query, [article_ids])
     except Exception as e:
         print(f"Error marking articles as processing: {str(e)}")
         print("Continuing without marking articles (this is non-critical).")
@@ -105,16 +72,16 @@ def prepare_article_text(article):
 
 
 def store_embedding(tracking_db_path, article_id, embedding, model):
-    from datetime import datetime
     import sqlite3
-    embedding_blob = np.array(embedding, dtype=np.float32).tobytes()
     query = """
     INSERT INTO article_embeddings 
-    (article_id, embedding, embedding_model, created_at, in_faiss_index)
-    VALUES (?, ?, ?, ?, 0)
+    (article_id, embedding, embedding_model, created_at, in_faiss_index, vector_offset)
+    VALUES (?, X'', ?, ?, 0, ?)
     """
-    params = (article_id, embedding_blob, model, datetime.now().isoformat())
     try:
+        # The vector itself lives in the memory-mapped vector store; SQLite keeps its offset
+        vector_offset = get_vector_store().append([article_id], [embedding])[0]
+        params = (article_id, model, datetime.now().isoformat(), vector_offset)
         execute_query(tracking_db_path, query, params)
         return True
     except sqlite3.IntegrityError:
@@ -125,12 +92,142 @@ def store_embedding(tracking_db_path, article_id, embedding, model):
         return False
 
 
+def get_token_encoder(model=EMBEDDING_MODEL):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"Could not load tokenizer ({str(e)}), estimating token counts from text length")
+        return None
+
+
+def truncate_to_token_limit(encoder, text, max_tokens=MAX_INPUT_TOKENS):
+    if encoder is None:
+        # English averages ~4 characters per token; assuming 3 keeps the estimate conservative
+        max_chars = max_tokens * 3
+        return text[:max_chars], len(text[:max_chars]) // 3 + 1
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text, len(tokens)
+    return encoder.decode(tokens[:max_tokens]), max_tokens
+
+
+def split_into_token_batches(articles, encoder, max_batch_tokens=DEFAULT_BATCH_TOKEN_BUDGET, max_batch_size=MAX_INPUTS_PER_REQUEST):
+    batches = []
+    current_batch = []
+    current_tokens = 0
+    for article in articles:
+        text, token_count = truncate_to_token_limit(encoder, prepare_article_text(article))
+        if current_batch and (current_tokens + token_count > max_batch_tokens or len(current_batch) >= max_batch_size):
+            batches.append(current_batch)
+            current_batch = []
+            current_tokens = 0
+        current_batch.append((article["id"], text))
+        current_tokens += token_count
+    if current_batch:
+        batches.append(current_batch)
+    return batches
+
+
+class RateLimiter:
+    """Spaces out calls so that at most `requests_per_minute` start in any minute, across threads."""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def generate_embeddings_batch(client, texts, rate_limiter, model=EMBEDDING_MODEL, max_retries=3):
+    for attempt in range(max_retries + 1):
+        rate_limiter.wait()
+        try:
+            response = client.embeddings.create(input=texts, model=model)
+            ordered = sorted(response.data, key=lambda item: item.index)
+            return [item.embedding for item in ordered], model
+        except Exception as e:
+            if attempt == max_retries:
+                print(f"Error generating batch embeddings: {str(e)}")
+                return None, None
+            backoff = (2**attempt) + random.uniform(0, 1)
+            print(f"Batch embedding request failed ({str(e)}), retrying in {backoff:.1f}s...")
+            time.sleep(backoff)
+
+
+def store_embeddings_batch(tracking_db_path, article_ids, embeddings, model):
+    created_at = datetime.now().isoformat()
+    query = """
+    INSERT INTO article_embeddings 
+    (article_id, embedding, embedding_model, created_at, in_faiss_index, vector_offset)
+    VALUES (?, X'', ?, ?, 0, ?)
+    """
+    try:
+        vector_offsets = get_vector_store().append(article_ids, embeddings)
+        rows = [(article_id, model, created_at, vector_offset) for article_id, vector_offset in zip(article_ids, vector_offsets)]
+        # Concurrent embedding workers share one group commit instead of contending for the write lock
+        run_write(tracking_db_path, execute_write_many, query, rows)
+        return len(rows)
+    except Exception as e:
+        print(f"Error storing embedding batch: {str(e)}")
+        return 0
+
+
+def process_articles_for_embedding_batched(
+    tracking_db_path=None,
+    openai_api_key=None,
+    limit=1000,
+    max_batch_tokens=DEFAULT_BATCH_TOKEN_BUDGET,
+    max_batch_size=MAX_INPUTS_PER_REQUEST,
+    concurrency=DEFAULT_CONCURRENCY,
+    requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+):
+    if tracking_db_path is None:
+        tracking_db_path = get_tracking_db_path()
+    if openai_api_key is None:
+        raise ValueError("OpenAI API key is required")
+    ensure_schema("tracking_db", tracking_db_path)
+    client = OpenAI(api_key=openai_api_key)
+    articles = get_articles_without_embeddings(tracking_db_path, limit=limit)
+    if not articles:
+        print("No articles found that need embeddings")
+        return {"total_articles": 0, "success_count": 0, "failed_count": 0}
+    mark_articles_as_processing(tracking_db_path, [article["id"] for article in articles])
+    batches = split_into_token_batches(articles, get_token_encoder(), max_batch_tokens, max_batch_size)
+    print(f"Embedding {len(articles)} articles in {len(batches)} requests (concurrency={concurrency}, rpm={requests_per_minute})")
+    rate_limiter = RateLimiter(requests_per_minute)
+    stats = {"total_articles": len(articles), "success_count": 0, "failed_count": 0}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(generate_embeddings_batch, client, [text for _, text in batch], rate_limiter): batch for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            article_ids = [article_id for article_id, _ in batch]
+            embeddings, model = future.result()
+            if not embeddings:
+                stats["failed_count"] += len(batch)
+                continue
+            stored = store_embeddings_batch(tracking_db_path, article_ids, embeddings, model)
+            stats["success_count"] += stored
+            stats["failed_count"] += len(batch) - stored
+            print(f"Stored {stored}/{len(batch)} embeddings ({stats['success_count']}/{len(articles)} done)")
+    return stats
+
+
 def process_articles_for_embedding(tracking_db_path=None, openai_api_key=None, batch_size=20, delay_range=(1, 3)):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
     if openai_api_key is None:
         raise ValueError("OpenAI API key is required")
-    create_embedding_table(tracking_db_path)
+    ensure_schema("tracking_db", tracking_db_path)
     client = OpenAI(api_key=openai_api_key)
     articles = get_articles_without_embeddings(tracking_db_path, limit=batch_size)
     if not articles:
@@ -181,6 +278,36 @@ def parse_arguments():
         default=20,
         help="Number of articles to process in each batch",
     )
+    parser.add_argument(
+        "--mode",
+        choices=["serial", "batched"],
+        default="serial",
+        help="serial: one request per article; batched: many articles per request, sent concurrently",
+    )
+    parser.add_argument(
+        "--total_batches",
+        type=int,
+        default=3,
+        help="Total number of batches to process",
+    )
+    parser.add_argument(
+        "--max_batch_tokens",
+        type=int,
+        default=DEFAULT_BATCH_TOKEN_BUDGET,
+        help="Token budget per embeddings request (batched mode)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of embeddings requests in flight (batched mode)",
+    )
+    parser.add_argument(
+        "--requests_per_minute",
+        type=int,
+        default=DEFAULT_REQUESTS_PER_MINUTE,
+        help="Rate limit for embeddings requests (batched mode)",
+    )
     return parser.parse_args()
 
 
@@ -190,6 +317,10 @@ def process_in_batches(
     batch_size=20,
     total_batches=1,
     delay_between_batches=10,
+    mode="serial",
+    max_batch_tokens=DEFAULT_BATCH_TOKEN_BUDGET,
+    concurrency=DEFAULT_CONCURRENCY,
+    requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
 ):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
@@ -198,11 +329,21 @@ def process_in_batches(
     total_stats = {"total_articles": 0, "success_count": 0, "failed_count": 0}
     for i in range(total_batches):
         print(f"\nProcessing batch {i + 1}/{total_batches}")
-        batch_stats = process_articles_for_embedding(
-            tracking_db_path=tracking_db_path,
-            openai_api_key=openai_api_key,
-            batch_size=batch_size,
-        )
+        if mode == "batched":
+            batch_stats = process_articles_for_embedding_batched(
+                tracking_db_path=tracking_db_path,
+                openai_api_key=openai_api_key,
+                limit=batch_size,
+                max_batch_tokens=max_batch_tokens,
+                concurrency=concurrency,
+                requests_per_minute=requests_per_minute,
+            )
+        else:
+            batch_stats = process_articles_for_embedding(
+                tracking_db_path=tracking_db_path,
+                openai_api_key=openai_api_key,
+                batch_size=batch_size,
+            )
         total_stats["total_articles"] += batch_stats["total_articles"]
         total_stats["success_count"] += batch_stats["success_count"]
         total_stats["failed_count"] += batch_stats["failed_count"]
@@ -224,6 +365,11 @@ if __name__ == "__main__":
     stats = process_in_batches(
         openai_api_key=api_key,
         batch_size=args.batch_size,
-        total_batches=3,
+        total_batches=args.total_batches,
+        delay_between_batches=0 if args.mode == "batched" else 10,
+        mode=args.mode,
+        max_batch_tokens=args.max_batch_tokens,
+        concurrency=args.concurrency,
+        requests_per_minute=args.requests_per_minute,
     )
     print_stats(stats)
@@ -1,13 +1,140 @@
 import os
+import json
 import time
 import argparse
+import threading
+from datetime import datetime, date, timedelta
 import numpy as np
 import faiss
 from db.config import get_tracking_db_path, get_faiss_db_path
 from db.connection import db_connection, execute_query
+from db.migrations import ensure_schema
+from db.vector_store import embedding_rows_to_vectors
+from db.writer import execute_write_many, run_write
+from db.faiss_index import get_faiss_index_holder, get_segment_dir, get_shard_dir, list_segments, list_shards, new_segment_path, parse_date, shard_file_name, shard_period
 
 
-def initialize_faiss_index(dimension=1536, index_path=None, index_type="hnsw", n_list=100):
+MIN_VECTORS_PER_LIST = 39
+MAX_TRAINING_VECTORS = 100000
+PQ_CODE_BITS = 8
+DEFAULT_INDEX_TYPE = "hnsw"
+DEFAULT_RETRAIN_GROWTH = 2.0
+DEFAULT_COMPACT_AFTER_DAYS = 30
+DEFAULT_SEGMENT_SIZE = 5000
+DEFAULT_COMPACT_SEGMENTS = 8
+SHARD_DATE_SQL = "COALESCE(date(ca.published_date), date(ca.crawled_date), date(ae.created_at))"
+# Serializes rebuilds, compactions and removals of one index file, so a background retrain
+# and a compaction never overwrite each other's result
+_index_write_locks = {}
+_retrain_threads = {}
+_index_state_lock = threading.Lock()
+
+
+def index_write_lock(index_path):
+    with _index_state_lock:
+        return _index_write_locks.setdefault(os.path.abspath(index_path), threading.RLock())
+
+
+def choose_ivf_params(n_vectors):
+    n_list = int(4 * np.sqrt(max(n_vectors, 1)))
+    n_list = max(1, min(n_list, n_vectors // MIN_VECTORS_PER_LIST, 65536))
+    nprobe = max(1, min(n_list, int(np.sqrt(n_list))))
+    return n_list, nprobe
+
+
+def choose_pq_m(dimension, target_m=64):
+    for m in range(min(target_m, dimension), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+def sample_training_vectors(tracking_db_path, dimension, sample_size):
+    query = """
+    SELECT article_id, embedding, vector_offset FROM article_embeddings
+    ORDER BY RANDOM()
+    LIMIT ?
+    """
+    rows = execute_query(tracking_db_path, query, (sample_size,), fetch=True)
+    rows, vectors = embedding_rows_to_vectors(rows)
+    if vectors is None or vectors.shape[1] != dimension:
+        return None
+    return vectors
+
+
+def get_embedding_dimension(tracking_db_path):
+    row = execute_query(tracking_db_path, "SELECT article_id, embedding, vector_offset FROM article_embeddings ORDER BY id DESC LIMIT 1", fetch_one=True)
+    _, vectors = embedding_rows_to_vectors([row] if row else [])
+    return None if vectors is None else vectors.shape[1]
+
+
+def count_embeddings(tracking_db_path):
+    result = execute_query(tracking_db_path, "SELECT COUNT(*) AS total FROM article_embeddings", fetch_one=True)
+    return result["total"] if result else 0
+
+
+def get_index_metadata_path(index_path):
+    return f"{index_path}.meta.json"
+
+
+def load_index_metadata(index_path):
+    metadata_path = get_index_metadata_path(index_path)
+    if not os.path.exists(metadata_path):
+        return None
+    try:
+        with open(metadata_path) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading index metadata: {str(e)}")
+        return None
+
+
+def save_index_metadata(index_path, metadata):
+    metadata_path = get_index_metadata_path(index_path)
+    temp_path = f"{metadata_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(temp_path, metadata_path)
+
+
+def create_faiss_index(dimension, index_type, training_vectors=None, n_list=None):
+    if index_type not in ("flat", "ivfflat", "ivfpq", "hnsw"):
+        print(f"Unknown index type '{index_type}', falling back to IVF Flat")
+        index_type = "ivfflat"
+    if index_type == "flat":
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(dimension)), {"index_type": "flat"}
+    if index_type == "hnsw":
+        m = 32
+        ef_construction = 100
+        index = faiss.IndexHNSWFlat(dimension, m)
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = 64
+        return faiss.IndexIDMap2(index), {"index_type": "hnsw"}
+    n_train = 0 if training_vectors is None else training_vectors.shape[0]
+    if index_type == "ivfpq" and n_train < 2**PQ_CODE_BITS * MIN_VECTORS_PER_LIST:
+        print(f"Only {n_train} training vectors available, too few for IVF-PQ; using IVF Flat until the corpus grows")
+        index_type = "ivfflat"
+    if n_train < MIN_VECTORS_PER_LIST:
+        print(f"Only {n_train} training vectors available, too few for IVF; using a flat index until the corpus grows")
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(dimension)), {"index_type": "flat"}
+    auto_n_list, nprobe = choose_ivf_params(n_train)
+    n_list = min(n_list, n_train // MIN_VECTORS_PER_LIST) if n_list else auto_n_list
+    n_list = max(1, n_list)
+    nprobe = min(nprobe, n_list)
+    quantizer = faiss.IndexFlatL2(dimension)
+    if index_type == "ivfpq":
+        m = choose_pq_m(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, n_list, m, PQ_CODE_BITS)
+        print(f"Training IVF-PQ index (n_list={n_list}, m={m}) on {n_train} corpus vectors...")
+    else:
+        index = faiss.IndexIVFFlat(quantizer, dimension, n_list)
+        print(f"Training IVF index (n_list={n_list}) on {n_train} corpus vectors...")
+    index.train(training_vectors)
+    index.nprobe = nprobe
+    return index, {"index_type": index_type, "n_list": n_list, "nprobe": nprobe}
+
+
+def initialize_faiss_index(dimension=1536, index_path=None, index_type=DEFAULT_INDEX_TYPE, n_list=None, tracking_db_path=None):
     if index_path and os.path.exists(index_path):
         print(f"Loading existing FAISS index from {index_path}")
         try:
@@ -18,46 +145,132 @@ def initialize_faiss_index(dimension=1536, index_path=None, index_type="hnsw", n
             print(f"Error loading FAISS index: {str(e)}")
             print("Creating a new index instead")
     print(f"Creating new FAISS index with dimension {dimension}, type: {index_type}")
-    if index_type == "flat":
-        return faiss.IndexFlatL2(dimension)
+    training_vectors = None
+    if index_type not in ("flat", "hnsw") and tracking_db_path:
+        corpus_size = count_embeddings(tracking_db_path)
+        sample_size = min(corpus_size, MAX_TRAINING_VECTORS)
+        training_vectors = sample_training_vectors(tracking_db_path, dimension, sample_size) if sample_size else None
+    index, _ = create_faiss_index(dimension, index_type, training_vectors, n_list)
+    return index
 
-    elif index_type == "ivfflat":
-        quantizer = faiss.IndexFlatL2(dimension)
-        index = faiss.IndexIVFFlat(quantizer, dimension, n_list)
-        print("Training IVF index with random vectors...")
-        train_size = max(10000, n_list * 10)
-        train_vectors = np.random.random((train_size, dimension)).astype(np.float32)
-        index.train(train_vectors)
-        index.nprobe = min(10, n_list // 10)
-        return index
-    elif index_type == "ivfpq":
-        quantizer = faiss.IndexFlatL2(dimension)
-        m = 16
-        bits = 8
-        index = faiss.IndexIVFPQ(quantizer, dimension, n_list, m, bits)
-        print("Training IVF-PQ index with random vectors...")
-        train_size = max(10000, n_list * 10)
-        train_vectors = np.random.random((train_size, dimension)).astype(np.float32)
-        index.train(train_vectors)
-        index.nprobe = min(10, n_list // 10)
-        return index
-    elif index_type == "hnsw":
-        m = 32
-        ef_construction = 100
-        index = faiss.IndexHNSWFlat(dimension, m)
-        index.hnsw.efConstruction = ef_construction
-        index.hnsw.efSearch = 64
-        return index
-    else:
-        print(f"Unknown index type '{index_type}', falling back to IVF Flat")
-        quantizer = faiss.IndexFlatL2(dimension)
-        index = faiss.IndexIVFFlat(quantizer, dimension, n_list)
-        print("Training IVF index with random vectors...")
-        train_size = max(10000, n_list * 10)
-        train_vectors = np.random.random((train_size, dimension)).astype(np.float32)
-        index.train(train_vectors)
-        index.nprobe = min(10, n_list // 10)
-        return index
+
+def needs_retraining(index_path, tracking_db_path, index_type, growth_threshold=DEFAULT_RETRAIN_GROWTH):
+    if not os.path.exists(index_path):
+        return False
+    metadata = load_index_metadata(index_path)
+    if not metadata or not metadata.get("id_keyed"):
+        # Indexes from before article-id keying store positions and need a rebuild
+        return True
+    if index_type in ("flat", "hnsw"):
+        return False
+    corpus_size = count_embeddings(tracking_db_path)
+    if metadata.get("requested_index_type") != index_type:
+        return True
+    trained_size = metadata.get("corpus_size", 0)
+    grown = corpus_size >= max(trained_size, 1) * growth_threshold
+    if metadata.get("index_type") != index_type:
+        # Still on the fallback type: retrain on the usual growth, or as soon as the corpus can train the requested type
+        return grown or trained_size < min_training_vectors(index_type) <= corpus_size
+    return grown
+
+
+def min_training_vectors(index_type):
+    if index_type == "ivfpq":
+        return 2**PQ_CODE_BITS * MIN_VECTORS_PER_LIST
+    return MIN_VECTORS_PER_LIST
+
+
+def start_background_rebuild(tracking_db_path, index_path, index_type=DEFAULT_INDEX_TYPE, n_list=None):
+    """
+    Retrain the index on a background thread and let it swap the new file in when done.
+
+    Searches keep using the current index meanwhile. Only one retrain runs per index;
+    returns the running thread, or None when one was already in progress.
+    """
+    key = os.path.abspath(index_path)
+    with _index_state_lock:
+        running = _retrain_threads.get(key)
+        if running is not None and running.is_alive():
+            return None
+        thread = threading.Thread(target=rebuild_faiss_index, args=(tracking_db_path, index_path, index_type, n_list), daemon=False)
+        _retrain_threads[key] = thread
+        thread.start()
+        return thread
+
+
+def iter_all_embeddings(tracking_db_path, chunk_size=5000):
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT id, article_id, embedding, vector_offset FROM article_embeddings
+        WHERE id IN (SELECT MAX(id) FROM article_embeddings GROUP BY article_id)
+        ORDER BY id
+        """)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+
+def rebuild_faiss_index(tracking_db_path=None, index_path=None, index_type=DEFAULT_INDEX_TYPE, n_list=None):
+    """
+    Build a fresh index trained on real corpus vectors and swap it in atomically.
+
+    The live index keeps serving searches while the new one is trained and filled;
+    save_faiss_index replaces the file with os.replace, which the resident index
+    holders pick up on their next lookup.
+    """
+    if tracking_db_path is None:
+        tracking_db_path = get_tracking_db_path()
+    if index_path is None:
+        index_path = get_faiss_db_path()
+    with index_write_lock(index_path):
+        stale_segments = list_segments(get_segment_dir(index_path))
+        corpus_size = count_embeddings(tracking_db_path)
+        if corpus_size == 0:
+            print("No embeddings found in the database, skipping rebuild")
+            return {"processed": 0, "added": 0, "errors": 0, "total_vectors": 0, "status": "no_embeddings"}
+        dimension = get_embedding_dimension(tracking_db_path)
+        start_time = time.time()
+        training_vectors = None
+        if index_type not in ("flat", "hnsw"):
+            training_vectors = sample_training_vectors(tracking_db_path, dimension, min(corpus_size, MAX_TRAINING_VECTORS))
+        faiss_index, metadata = create_faiss_index(dimension, index_type, training_vectors, n_list)
+        embedding_ids = []
+        errors = 0
+        for rows in iter_all_embeddings(tracking_db_path):
+            kept_rows, vectors = embedding_rows_to_vectors(rows)
+            if vectors is None or vectors.shape[1] != dimension:
+                errors += len(rows)
+                continue
+            errors += len(rows) - len(kept_rows)
+            faiss_index.add_with_ids(vectors, np.array([row["article_id"] for row in kept_rows], dtype=np.int64))
+            embedding_ids.extend(row["id"] for row in kept_rows)
+        metadata.update(
+            {
+                "requested_index_type": index_type,
+                "trained_on": 0 if training_vectors is None else int(training_vectors.shape[0]),
+                "corpus_size": corpus_size,
+                "trained_at": datetime.now().isoformat(),
+                "id_keyed": True,
+            }
+        )
+        if not save_faiss_index(faiss_index, index_path):
+            return {"processed": corpus_size, "added": 0, "errors": corpus_size, "total_vectors": 0, "status": "save_failed"}
+        save_index_metadata(index_path, metadata)
+        # The rebuild read every stored embedding, so earlier delta segments are now redundant
+        delete_segments(stale_segments)
+        mark_rebuilt_embeddings_as_indexed(tracking_db_path, embedding_ids)
+        print(f"Rebuilt {metadata['index_type']} index with {faiss_index.ntotal} vectors in {time.time() - start_time:.1f}s")
+        return {
+            "processed": corpus_size,
+            "added": faiss_index.ntotal,
+            "errors": errors,
+            "total_vectors": faiss_index.ntotal,
+            "index_type": metadata["index_type"],
+            "status": "rebuilt",
+        }
 
 
 def save_faiss_index(index, index_path):
@@ -74,123 +287,490 @@ def save_faiss_index(index, index_path):
         return False
 
 
-def save_id_mapping(id_map, mapping_path):
-    try:
-        mapping_dir = os.path.dirname(mapping_path)
-        os.makedirs(mapping_dir, exist_ok=True)
-        np.save(mapping_path, np.array(id_map))
-        print(f"ID mapping saved to {mapping_path}")
-        return True
-    except Exception as e:
-        print(f"Error saving ID mapping: {str(e)}")
-        try:
-            print("Trying alternative save method...")
-            simple_path = os.path.join(mapping_dir, "article_id_map.npy")
-            np.save(simple_path, np.array(id_map))
-            print(f"ID mapping saved to {simple_path} (alternative path)")
-            return True
-        except Exception as e:
-            print(f"Alternative save method also failed: {str(e)}")
-            return False
-
-
-def load_id_mapping(mapping_path):
-    if os.path.exists(mapping_path):
-        try:
-            return np.load(mapping_path).tolist()
-        except Exception as e:
-            print(f"Error loading ID mapping: {str(e)}")
-    return []
-
-
-def get_embeddings_not_in_index(tracking_db_path, limit=100):
+def get_embeddings_not_in_index(tracking_db_path, limit=100, after_id=0):
     query = """
-    SELECT ae.id, ae.article_id, ae.embedding, ae.embedding_model
+    SELECT ae.id, ae.article_id, ae.embedding, ae.vector_offset, ae.embedding_model
     FROM article_embeddings ae
-    WHERE ae.in_faiss_index = 0
+    WHERE ae.in_faiss_index = 0 AND ae.id > ?
+    ORDER BY ae.id
     LIMIT ?
     """
-    return execute_query(tracking_db_path, query, (limit,), fetch=True)
+    return execute_query(tracking_db_path, query, (after_id, limit), fetch=True)
 
 
 def mark_embeddings_as_indexed(tracking_db_path, embedding_ids):
     if not embedding_ids:
         return 0
-    with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        placeholders = ",".join(["?"] * len(embedding_ids))
-        query = f"""
-        UPDATE article_embeddings 
-        SET in_faiss_index = 1 
-        WHERE id IN ({placeholders})
+    placeholders = ",".join(["?"] * len(embedding_ids))
+    query = f"""
+    UPDATE article_embeddings 
+    SET in_faiss_index = 1 
+    WHERE id IN ({placeholders})
+    """
+    return run_write(tracking_db_path, execute_write_many, query, [embedding_ids])
+
+
+def mark_rebuilt_embeddings_as_indexed(tracking_db_path, embedding_ids, chunk_size=500):
+    for i in range(0, len(embedding_ids), chunk_size):
+        mark_embeddings_as_indexed(tracking_db_path, embedding_ids[i : i + chunk_size])
+    # Older embeddings of re-embedded articles were replaced by their latest row
+    execute_query(
+        tracking_db_path,
         """
-        cursor.execute(query, embedding_ids)
-        conn.commit()
-        return cursor.rowcount
+        UPDATE article_embeddings SET in_faiss_index = 1
+        WHERE in_faiss_index = 0
+          AND id < (SELECT MAX(ae2.id) FROM article_embeddings ae2 WHERE ae2.article_id = article_embeddings.article_id)
+        """,
+    )
+
+
+def remove_ids_from_index(faiss_index, article_ids):
+    if not len(article_ids):
+        return 0
+    try:
+        return faiss_index.remove_ids(np.array(article_ids, dtype=np.int64))
+    except RuntimeError as e:
+        print(f"Index does not support removal ({str(e).splitlines()[0]}), a rebuild is required to drop stale vectors")
+        return None
 
 
-def add_embeddings_to_index(embeddings_data, faiss_index, id_map):
+def supports_removal(faiss_index):
+    base_index = faiss.downcast_index(faiss_index.index) if hasattr(faiss_index, "id_map") else faiss_index
+    return not isinstance(base_index, faiss.IndexHNSW)
+
+
+def index_contains_any(faiss_index, article_ids):
+    if not hasattr(faiss_index, "id_map"):
+        # Without an id map there is no cheap way to tell, so assume the ids may be present
+        return True
+    return bool(np.isin(faiss.vector_to_array(faiss_index.id_map), article_ids).any())
+
+
+def upsert_vectors(faiss_index, article_ids, vectors):
+    """
+    Add `vectors` under `article_ids`, replacing the vectors already stored for them.
+
+    Returns False without adding anything when the index cannot remove vectors (HNSW)
+    and some of the ids are already present; adding them would leave the outdated
+    vectors searchable next to the new ones, so the caller has to rebuild instead.
+    """
+    replaced = remove_ids_from_index(faiss_index, article_ids)
+    if replaced is None and index_contains_any(faiss_index, article_ids):
+        return False
+    if replaced:
+        print(f"Replacing {replaced} existing vectors for re-embedded articles")
+    faiss_index.add_with_ids(vectors, article_ids)
+    return True
+
+
+def rebuild_with_stored_type(tracking_db_path, index_path):
+    metadata = load_index_metadata(index_path) or {}
+    return rebuild_faiss_index(tracking_db_path, index_path, index_type=metadata.get("requested_index_type", DEFAULT_INDEX_TYPE))
+
+
+def add_embeddings_to_index(embeddings_data, faiss_index):
     if not embeddings_data:
         return 0, []
-    embeddings = []
-    article_ids = []
+    latest_by_article = {}
     embedding_ids = []
-    for data in embeddings_data:
-        try:
-            embedding_blob = data["embedding"]
-            embedding = np.frombuffer(embedding_blob, dtype=np.float32)
-
-            if embedding.shape[0] != faiss_index.d:
-                print(f"Embedding dimension mismatch: expected {faiss_index.d}, got {embedding.shape[0]}")
-                continue
-            embeddings.append(embedding)
-            article_ids.append(data["article_id"])
-            embedding_ids.append(data["id"])
-        except Exception as e:
-            print(f"Error processing embedding {data['id']}: {str(e)}")
-    if not embeddings:
+    rows, vectors = embedding_rows_to_vectors(embeddings_data)
+    if vectors is not None and vectors.shape[1] != faiss_index.d:
+        print(f"Embedding dimension mismatch: expected {faiss_index.d}, got {vectors.shape[1]}")
+        rows = []
+    for data, embedding in zip(rows, vectors if rows else []):
+        latest_by_article[data["article_id"]] = embedding
+        embedding_ids.append(data["id"])
+    if not latest_by_article:
         return 0, []
     try:
-        embeddings_array = np.vstack(embeddings).astype(np.float32)
-        faiss_index.add(embeddings_array)
-        for article_id in article_ids:
-            id_map.append(article_id)
-        print(f"Added {len(embeddings)} embeddings to FAISS index")
-        return len(embeddings), embedding_ids
+        article_ids = np.array(list(latest_by_article.keys()), dtype=np.int64)
+        embeddings_array = np.vstack(list(latest_by_article.values())).astype(np.float32)
+        if not upsert_vectors(faiss_index, article_ids, embeddings_array):
+            print("Index cannot replace the vectors of re-embedded articles, leaving them for a rebuild")
+            return 0, []
+        print(f"Added {len(article_ids)} embeddings to FAISS index")
+        return len(article_ids), embedding_ids
     except Exception as e:
         print(f"Error adding embeddings to FAISS index: {str(e)}")
         return 0, []
 
 
+def remove_articles_from_index(article_ids, tracking_db_path=None, index_path=None, delete_embeddings=True):
+    if tracking_db_path is None:
+        tracking_db_path = get_tracking_db_path()
+    if index_path is None:
+        index_path = get_faiss_db_path()
+    if not article_ids:
+        return {"removed": 0, "status": "nothing_to_remove"}
+    if delete_embeddings:
+        placeholders = ",".join(["?"] * len(article_ids))
+        run_write(tracking_db_path, execute_write_many, f"DELETE FROM article_embeddings WHERE article_id IN ({placeholders})", [list(article_ids)])
+    shard_removed = remove_ids_from_shards(get_shard_dir(index_path), article_ids, tracking_db_path)
+    if not os.path.exists(index_path):
+        if shard_removed:
+            return {"removed": shard_removed, "status": "success"}
+        return {"removed": 0, "status": "index_missing"}
+    with index_write_lock(index_path):
+        compact_segments(index_path, tracking_db_path=tracking_db_path)
+        faiss_index = faiss.read_index(index_path)
+        removed = remove_ids_from_index(faiss_index, article_ids)
+        if removed is None:
+            stats = rebuild_with_stored_type(tracking_db_path, index_path)
+            return {"removed": len(article_ids) + shard_removed, "status": stats["status"]}
+        if removed:
+            save_faiss_index(faiss_index, index_path)
+        print(f"Removed {removed} vectors from FAISS index")
+        return {"removed": removed + shard_removed, "status": "success"}
+
+
+def remove_ids_from_shards(shard_dir, article_ids, tracking_db_path, keep_path=None):
+    """
+    Drop the vectors of `article_ids` from every time shard except keep_path.
+
+    Shards are checked through their cached memory-mapped holders and only rewritten
+    when they hold one of the ids. HNSW shards cannot remove vectors, so their period
+    is rebuilt from the latest remaining embeddings instead.
+
+    Returns:
+        Number of vectors removed across the shards
+    """
+    article_ids = np.asarray(list(article_ids), dtype=np.int64)
+    removed_total = 0
+    for shard in list_shards(shard_dir):
+        if shard["path"] == keep_path:
+            continue
+        cached_index, error = get_faiss_index_holder(shard["path"]).get()
+        if error or not index_contains_any(cached_index, article_ids):
+            continue
+        shard_index = faiss.read_index(shard["path"])
+        if not supports_removal(shard_index):
+            held = int(np.isin(faiss.vector_to_array(shard_index.id_map), article_ids).sum())
+            total, _ = build_shard_from_db(tracking_db_path, shard["path"], shard["start"], shard["end"], "hnsw")
+            if not total and os.path.exists(shard["path"]):
+                # Nothing left in the period to rebuild from
+                os.remove(shard["path"])
+            removed_total += held
+            continue
+        removed = remove_ids_from_index(shard_index, article_ids)
+        if removed:
+            save_faiss_index(shard_index, shard["path"])
+            removed_total += removed
+    if removed_total:
+        print(f"Removed {removed_total} vectors from FAISS shards")
+    return removed_total
+
+
+def read_segment_vectors(segment_path):
+    segment = faiss.read_index(segment_path)
+    article_ids = faiss.vector_to_array(segment.id_map).astype(np.int64)
+    vectors = segment.index.reconstruct_n(0, segment.ntotal)
+    return article_ids, vectors
+
+
+def delete_segments(segment_paths):
+    for segment_path in segment_paths:
+        try:
+            os.remove(segment_path)
+        except FileNotFoundError:
+            pass
+
+
+def compact_segments(index_path=None, segment_paths=None, tracking_db_path=None):
+    """
+    Merge delta segments into the main index, swap it in, then delete the merged segments.
+
+    Searches keep covering the old main index plus the segments until os.replace
+    swaps in the merged file; a segment seen in both places in the meantime only
+    yields duplicate hits, which the merged search drops. When a segment re-embeds
+    articles that an HNSW main index already holds, the index is rebuilt from the
+    stored embeddings instead, since HNSW cannot drop the outdated vectors.
+    """
+    if index_path is None:
+        index_path = get_faiss_db_path()
+    if segment_paths is None:
+        segment_paths = list_segments(get_segment_dir(index_path))
+    if not segment_paths:
+        return {"merged_segments": 0, "merged_vectors": 0, "status": "nothing_to_compact"}
+    with index_write_lock(index_path):
+        # A rebuild that held the lock meanwhile may already have folded in and deleted some of these
+        segment_paths = [segment_path for segment_path in segment_paths if os.path.exists(segment_path)]
+        if not segment_paths:
+            return {"merged_segments": 0, "merged_vectors": 0, "status": "nothing_to_compact"}
+        if not os.path.exists(index_path):
+            return {"merged_segments": 0, "merged_vectors": 0, "status": "index_missing"}
+        start_time = time.time()
+        faiss_index = faiss.read_index(index_path)
+        merged_vectors = 0
+        for segment_path in segment_paths:
+            try:
+                article_ids, vectors = read_segment_vectors(segment_path)
+            except Exception as e:
+                print(f"Error reading segment {segment_path}, leaving it for the next compaction: {str(e)}")
+                return {"merged_segments": 0, "merged_vectors": 0, "status": "segment_unreadable"}
+            if not len(article_ids):
+                continue
+            if not upsert_vectors(faiss_index, article_ids, vectors):
+                print(f"Segment {os.path.basename(segment_path)} replaces vectors the main index cannot remove, rebuilding it instead")
+                stats = rebuild_with_stored_type(tracking_db_path or get_tracking_db_path(), index_path)
+                merged = len(segment_paths) if stats["status"] == "rebuilt" else 0
+                return {"merged_segments": merged, "merged_vectors": stats["added"], "total_vectors": stats["total_vectors"], "status": stats["status"]}
+            merged_vectors += len(article_ids)
+        if not save_faiss_index(faiss_index, index_path):
+            return {"merged_segments": 0, "merged_vectors": 0, "status": "save_failed"}
+        delete_segments(segment_paths)
+        print(f"Compacted {len(segment_paths)} segments ({merged_vectors} vectors) into the main index in {time.time() - start_time:.1f}s")
+        return {"merged_segments": len(segment_paths), "merged_vectors": merged_vectors, "total_vectors": faiss_index.ntotal, "status": "compacted"}
+
+
+class IndexingSession:
+    """
+    Accumulates new embeddings in memory and appends them to the index as delta segments.
+
+    Instead of loading and rewriting the whole main index for every batch, the session
+    adds batches to an in-memory flat delta and writes it out as a small segment file
+    once it holds `segment_size` vectors (and on close). Embeddings are marked indexed
+    only after their segment is on disk. When `compact_at` segments have piled up, a
+    background thread merges them into the main index while the session keeps adding.
+    """
+
+    def __init__(self, tracking_db_path, index_path, dimension, segment_size=DEFAULT_SEGMENT_SIZE, compact_at=DEFAULT_COMPACT_SEGMENTS):
+        self.tracking_db_path = tracking_db_path
+        self.index_path = index_path
+        self.segment_dir = get_segment_dir(index_path)
+        self.dimension = dimension
+        self.segment_size = segment_size
+        self.compact_at = compact_at
+        self.delta = None
+        self.pending_embedding_ids = []
+        self.last_embedding_id = 0
+        self.segments_written = 0
+        self.compaction_thread = None
+
+    def next_batch(self, batch_size):
+        embeddings_data = get_embeddings_not_in_index(self.tracking_db_path, limit=batch_size, after_id=self.last_embedding_id)
+        if embeddings_data:
+            self.last_embedding_id = embeddings_data[-1]["id"]
+        return embeddings_data
+
+    def add(self, embeddings_data):
+        if self.delta is None:
+            self.delta = faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension))
+        added_count, embedding_ids = add_embeddings_to_index(embeddings_data, self.delta)
+        self.pending_embedding_ids.extend(embedding_ids)
+        if self.delta.ntotal >= self.segment_size:
+            self.flush()
+        return added_count, embedding_ids
+
+    def flush(self):
+        delta, embedding_ids = self.delta, self.pending_embedding_ids
+        self.delta, self.pending_embedding_ids = None, []
+        if delta is None or delta.ntotal == 0:
+            return 0
+        os.makedirs(self.segment_dir, exist_ok=True)
+        if not save_faiss_index(delta, new_segment_path(self.segment_dir)):
+            # Left unmarked, these embeddings are picked up again by the next run
+            return 0
+        for i in range(0, len(embedding_ids), 500):
+            mark_embeddings_as_indexed(self.tracking_db_path, embedding_ids[i : i + 500])
+        self.segments_written += 1
+        self.maybe_compact()
+        return delta.ntotal
+
+    def maybe_compact(self):
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+        segment_paths = list_segments(self.segment_dir)
+        if len(segment_paths) < self.compact_at:
+            return
+        self.compaction_thread = threading.Thread(target=compact_segments, args=(self.index_path, segment_paths, self.tracking_db_path), daemon=False)
+        self.compaction_thread.start()
+
+    def close(self):
+        self.flush()
+        if self.compaction_thread is not None:
+            self.compaction_thread.join()
+
+
+def get_embeddings_not_in_index_with_dates(tracking_db_path, limit=100):
+    query = f"""
+    SELECT ae.id, ae.article_id, ae.embedding, ae.vector_offset, {SHARD_DATE_SQL} AS shard_date
+    FROM article_embeddings ae
+    LEFT JOIN crawled_articles ca ON ca.id = ae.article_id
+    WHERE ae.in_faiss_index = 0
+    ORDER BY ae.id
+    LIMIT ?
+    """
+    return execute_query(tracking_db_path, query, (limit,), fetch=True)
+
+
+def get_latest_embeddings_in_period(tracking_db_path, start, end):
+    query = f"""
+    SELECT ae.id, ae.article_id, ae.embedding, ae.vector_offset
+    FROM article_embeddings ae
+    LEFT JOIN crawled_articles ca ON ca.id = ae.article_id
+    WHERE ae.id IN (SELECT MAX(id) FROM article_embeddings GROUP BY article_id)
+      AND {SHARD_DATE_SQL} >= ? AND {SHARD_DATE_SQL} < ?
+    """
+    return execute_query(tracking_db_path, query, (start.isoformat(), end.isoformat()), fetch=True)
+
+
+def build_shard_from_db(tracking_db_path, shard_path, start, end, index_type):
+    rows, vectors = embedding_rows_to_vectors(get_latest_embeddings_in_period(tracking_db_path, start, end))
+    if not rows:
+        return 0, []
+    dimension = vectors.shape[1]
+    training_vectors = None
+    if index_type not in ("flat", "hnsw"):
+        sample = np.random.choice(len(vectors), min(len(vectors), MAX_TRAINING_VECTORS), replace=False)
+        training_vectors = vectors[sample]
+    shard_index, _ = create_faiss_index(dimension, index_type, training_vectors)
+    shard_index.add_with_ids(vectors, np.array([row["article_id"] for row in rows], dtype=np.int64))
+    if not save_faiss_index(shard_index, shard_path):
+        return 0, []
+    return shard_index.ntotal, [row["id"] for row in rows]
+
+
+def process_embeddings_for_sharded_indexing(tracking_db_path=None, index_path=None, batch_size=100, granularity="week"):
+    if tracking_db_path is None:
+        tracking_db_path = get_tracking_db_path()
+    shard_dir = get_shard_dir(index_path)
+    os.makedirs(shard_dir, exist_ok=True)
+    embeddings_data = get_embeddings_not_in_index_with_dates(tracking_db_path, limit=batch_size)
+    if not embeddings_data:
+        print("No new embeddings to add to the shards")
+        return {"processed": 0, "added": 0, "errors": 0, "status": "no_new_embeddings"}
+    rows_by_shard = {}
+    for row in embeddings_data:
+        start, _ = shard_period(granularity, parse_date(row["shard_date"]) or date.today())
+        rows_by_shard.setdefault(start, []).append(row)
+    added_count = 0
+    indexed_embedding_ids = []
+    dimension = get_embedding_dimension(tracking_db_path)
+    for start, rows in sorted(rows_by_shard.items()):
+        shard_path = os.path.join(shard_dir, shard_file_name(granularity, start))
+        # A re-embedded article may now date to another period; its old vector must not stay searchable there
+        remove_ids_from_shards(shard_dir, {row["article_id"] for row in rows}, tracking_db_path, keep_path=shard_path)
+        if os.path.exists(shard_path):
+            shard_index = faiss.read_index(shard_path)
+        else:
+            # Open shards stay exact; they are re-trained with the requested type when compacted
+            shard_index = faiss.IndexIDMap2(faiss.IndexFlatL2(dimension))
+        count, embedding_ids = add_embeddings_to_index(rows, shard_index)
+        if count and save_faiss_index(shard_index, shard_path):
+            added_count += count
+            indexed_embedding_ids.extend(embedding_ids)
+        elif not count and os.path.exists(shard_path) and not supports_removal(shard_index):
+            # An HNSW shard (rebuild_shards with index_type "hnsw") cannot replace vectors in place, so rebuild its period
+            count, embedding_ids = build_shard_from_db(tracking_db_path, shard_path, *shard_period(granularity, start), "hnsw")
+            added_count += count
+            indexed_embedding_ids.extend(embedding_ids)
+    mark_rebuilt_embeddings_as_indexed(tracking_db_path, indexed_embedding_ids)
+    print(f"Added {added_count} embeddings across {len(rows_by_shard)} shards")
+    return {
+        "processed": len(embeddings_data),
+        "added": added_count,
+        "errors": len(embeddings_data) - len(indexed_embedding_ids),
+        "shards_touched": len(rows_by_shard),
+        "status": "success",
+    }
+
+
+def compact_and_expire_shards(
+    tracking_db_path=None,
+    index_path=None,
+    index_type=DEFAULT_INDEX_TYPE,
+    compact_after_days=DEFAULT_COMPACT_AFTER_DAYS,
+    retention_days=None,
+):
+    """
+    Drop shards past the retention window and fold old day/week shards into month shards.
+
+    Month shards are rebuilt from article_embeddings for the whole calendar month with
+    the requested index type; a day/week shard is deleted once every month it overlaps
+    has been compacted, so week shards spanning a month boundary are never lost.
+    """
+    if tracking_db_path is None:
+        tracking_db_path = get_tracking_db_path()
+    shard_dir = get_shard_dir(index_path)
+    today = date.today()
+    shards = list_shards(shard_dir)
+    dropped = 0
+    if retention_days:
+        retention_cutoff = today - timedelta(days=retention_days)
+        for shard in shards:
+            if shard["end"] <= retention_cutoff:
+                os.remove(shard["path"])
+                dropped += 1
+        shards = [shard for shard in shards if shard["end"] > retention_cutoff]
+    compact_cutoff = today - timedelta(days=compact_after_days)
+    months_to_build = set()
+    for shard in shards:
+        if shard["granularity"] == "month":
+            continue
+        for day in (shard["start"], shard["end"] - timedelta(days=1)):
+            month_start, month_end = shard_period("month", day)
+            if month_end <= compact_cutoff:
+                months_to_build.add(month_start)
+    compacted_months = {shard["start"] for shard in shards if shard["granularity"] == "month"}
+    for month_start in sorted(months_to_build):
+        _, month_end = shard_period("month", month_start)
+        month_path = os.path.join(shard_dir, shard_file_name("month", month_start))
+        total, _ = build_shard_from_db(tracking_db_path, month_path, month_start, month_end, index_type)
+        print(f"Compacted {month_start:%Y-%m} into a {index_type} shard with {total} vectors")
+        compacted_months.add(month_start)
+    removed = 0
+    for shard in shards:
+        if shard["granularity"] == "month":
+            continue
+        covering_months = {shard_period("month", day)[0] for day in (shard["start"], shard["end"] - timedelta(days=1))}
+        if covering_months <= compacted_months:
+            os.remove(shard["path"])
+            removed += 1
+    return {"dropped": dropped, "months_compacted": len(months_to_build), "shards_merged": removed}
+
+
+def rebuild_shards(tracking_db_path=None, index_path=None, granularity="week", index_type="flat"):
+    if tracking_db_path is None:
+        tracking_db_path = get_tracking_db_path()
+    shard_dir = get_shard_dir(index_path)
+    os.makedirs(shard_dir, exist_ok=True)
+    query = f"""
+    SELECT DISTINCT {SHARD_DATE_SQL} AS shard_date
+    FROM article_embeddings ae
+    LEFT JOIN crawled_articles ca ON ca.id = ae.article_id
+    """
+    periods = {shard_period(granularity, parse_date(row["shard_date"]) or date.today()) for row in execute_query(tracking_db_path, query, fetch=True)}
+    total_vectors = 0
+    embedding_ids = []
+    for start, end in sorted(periods):
+        count, ids = build_shard_from_db(tracking_db_path, os.path.join(shard_dir, shard_file_name(granularity, start)), start, end, index_type)
+        total_vectors += count
+        embedding_ids.extend(ids)
+    mark_rebuilt_embeddings_as_indexed(tracking_db_path, embedding_ids)
+    print(f"Rebuilt {len(periods)} {granularity} shards with {total_vectors} vectors")
+    return {"processed": total_vectors, "added": total_vectors, "errors": 0, "shards": len(periods), "status": "rebuilt"}
+
+
 def process_embeddings_for_indexing(
     tracking_db_path=None,
     index_path=None,
-    mapping_path=None,
     batch_size=100,
-    index_type="ivfflat",
-    n_list=100,
+    index_type=DEFAULT_INDEX_TYPE,
+    n_list=None,
+    retrain_growth=DEFAULT_RETRAIN_GROWTH,
+    total_batches=1,
+    segment_size=DEFAULT_SEGMENT_SIZE,
+    compact_at=DEFAULT_COMPACT_SEGMENTS,
 ):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
+    if index_path is None:
+        index_path = get_faiss_db_path()
     index_dir = os.path.dirname(index_path)
     os.makedirs(index_dir, exist_ok=True)
-    id_map = load_id_mapping(mapping_path)
-    with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='article_embeddings'
-        """)
-        table_exists = cursor.fetchone() is not None
-
-        if not table_exists:
-            print("article_embeddings table does not exist. Please run embedding_processor first.")
-            return {"processed": 0, "added": 0, "errors": 0, "total_vectors": 0, "status": "table_missing"}
-    sample_query = """
-    SELECT embedding FROM article_embeddings LIMIT 1
-    """
-    sample = execute_query(tracking_db_path, sample_query, fetch=True, fetch_one=True)
-    if not sample:
+    ensure_schema("tracking_db", tracking_db_path)
+    embedding_dimension = get_embedding_dimension(tracking_db_path)
+    if embedding_dimension is None:
         print("No embeddings found in the database")
         default_dimension = 1536
         print(f"Using default dimension: {default_dimension}")
@@ -205,52 +785,69 @@ def process_embeddings_for_indexing(
             "total_vectors": faiss_index.ntotal if hasattr(faiss_index, "ntotal") else 0,
             "status": "no_embeddings",
         }
-    embedding_dimension = len(np.frombuffer(sample["embedding"], dtype=np.float32))
     print(f"Detected embedding dimension: {embedding_dimension}")
-    faiss_index = initialize_faiss_index(dimension=embedding_dimension, index_path=index_path, index_type=index_type, n_list=n_list)
-    embeddings_data = get_embeddings_not_in_index(tracking_db_path, limit=batch_size)
-    if not embeddings_data:
-        print("No new embeddings to add to the index")
-        return {"processed": 0, "added": 0, "errors": 0, "total_vectors": faiss_index.ntotal, "status": "no_new_embeddings"}
-    added_count, embedding_ids = add_embeddings_to_index(embeddings_data, faiss_index, id_map)
-    if added_count > 0:
-        save_faiss_index(faiss_index, index_path)
-        save_id_mapping(id_map, mapping_path)
-        marked_count = mark_embeddings_as_indexed(tracking_db_path, embedding_ids)
-        print(f"Marked {marked_count} embeddings as indexed in the database")
-    stats = {
-        "processed": len(embeddings_data),
-        "added": added_count,
-        "errors": len(embeddings_data) - added_count,
-        "total_vectors": faiss_index.ntotal,
-        "index_type": index_type,
-        "status": "success",
-    }
+    if not os.path.exists(index_path):
+        print("Index missing, building it from corpus vectors")
+        return rebuild_faiss_index(tracking_db_path, index_path, index_type=index_type, n_list=n_list)
+    retrain_thread = None
+    if needs_retraining(index_path, tracking_db_path, index_type, retrain_growth):
+        print("Index outdated or trained on a much smaller corpus, retraining it in the background")
+        retrain_thread = start_background_rebuild(tracking_db_path, index_path, index_type, n_list)
+    session = IndexingSession(tracking_db_path, index_path, embedding_dimension, segment_size=segment_size, compact_at=compact_at)
+    stats = {"processed": 0, "added": 0, "errors": 0, "index_type": index_type}
+    for i in range(total_batches):
+        embeddings_data = session.next_batch(batch_size)
+        if not embeddings_data:
+            print("No new embeddings to add to the index")
+            break
+        print(f"\nProcessing batch {i + 1}/{total_batches}")
+        added_count, embedding_ids = session.add(embeddings_data)
+        stats["processed"] += len(embeddings_data)
+        stats["added"] += added_count
+        stats["errors"] += len(embeddings_data) - len(embedding_ids)
+    session.close()
+    stats["segments_written"] = session.segments_written
+    stats["retraining"] = retrain_thread is not None
+    stats["status"] = "success" if stats["processed"] else "no_new_embeddings"
     return stats
 
 
 def process_in_batches(
     tracking_db_path=None,
     index_path=None,
-    mapping_path=None,
     batch_size=100,
     total_batches=5,
     delay_between_batches=2,
-    index_type="ivfflat",
-    n_list=100,
+    index_type=DEFAULT_INDEX_TYPE,
+    n_list=None,
+    retrain_growth=DEFAULT_RETRAIN_GROWTH,
+    sharding="none",
+    segment_size=DEFAULT_SEGMENT_SIZE,
+    compact_at=DEFAULT_COMPACT_SEGMENTS,
 ):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
+    if sharding == "none":
+        # One session covers every batch, appending delta segments instead of rewriting the index per batch
+        return process_embeddings_for_indexing(
+            tracking_db_path=tracking_db_path,
+            index_path=index_path,
+            batch_size=batch_size,
+            index_type=index_type,
+            n_list=n_list,
+            retrain_growth=retrain_growth,
+            total_batches=total_batches,
+            segment_size=segment_size,
+            compact_at=compact_at,
+        )
     total_stats = {"processed": 0, "added": 0, "errors": 0, "index_type": index_type}
     for i in range(total_batches):
         print(f"\nProcessing batch {i + 1}/{total_batches}")
-        batch_stats = process_embeddings_for_indexing(
+        batch_stats = process_embeddings_for_sharded_indexing(
             tracking_db_path=tracking_db_path,
             index_path=index_path,
-            mapping_path=mapping_path,
             batch_size=batch_size,
-            index_type=index_type,
-            n_list=n_list,
+            granularity=sharding,
         )
         total_stats["processed"] += batch_stats["processed"]
         total_stats["added"] += batch_stats["added"]
@@ -273,6 +870,8 @@ def print_stats(stats):
     print(f"Errors: {stats['errors']}")
     if "total_vectors" in stats:
         print(f"Total vectors in index: {stats['total_vectors']}")
+    if "segments_written" in stats:
+        print(f"Delta segments written: {stats['segments_written']}")
     if "index_type" in stats:
         print(f"Index type: {stats['index_type']}")
         if stats["index_type"] == "flat":
@@ -298,22 +897,69 @@ def parse_arguments():
         default="databases/faiss/article_index.faiss",
         help="Path to save the FAISS index",
     )
-    parser.add_argument(
-        "--mapping_path",
-        default="databases/faiss/article_id_map.npy",
-        help="Path to save the ID mapping file",
-    )
     parser.add_argument(
         "--index_type",
         choices=["flat", "ivfflat", "ivfpq", "hnsw"],
-        default="hnsw",
+        default=DEFAULT_INDEX_TYPE,
         help="Type of FAISS index to create",
     )
     parser.add_argument(
         "--n_list",
         type=int,
-        default=100,
-        help="Number of clusters for IVF-based indexes",
+        default=None,
+        help="Number of clusters for IVF-based indexes (default: chosen from corpus size)",
+    )
+    parser.add_argument(
+        "--retrain_growth",
+        type=float,
+        default=DEFAULT_RETRAIN_GROWTH,
+        help="Retrain IVF indexes once the corpus has grown by this factor since the last training",
+    )
+    parser.add_argument(
+        "--remove_article_ids",
+        type=int,
+        nargs="+",
+        help="Remove these articles from the index and delete their stored embeddings",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild the index from all stored embeddings before processing new ones",
+    )
+    parser.add_argument(
+        "--sharding",
+        choices=["none", "day", "week"],
+        default="none",
+        help="Split the index into time-partitioned shards of this size",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Merge delta segments into the main index; with --sharding, fold old day/week shards into month shards and apply --retention_days",
+    )
+    parser.add_argument(
+        "--segment_size",
+        type=int,
+        default=DEFAULT_SEGMENT_SIZE,
+        help="Number of new vectors collected in memory before they are written out as a delta segment",
+    )
+    parser.add_argument(
+        "--compact_segments",
+        type=int,
+        default=DEFAULT_COMPACT_SEGMENTS,
+        help="Start a background compaction once this many delta segments exist",
+    )
+    parser.add_argument(
+        "--compact_after_days",
+        type=int,
+        default=DEFAULT_COMPACT_AFTER_DAYS,
+        help="Only compact months that ended at least this many days ago",
+    )
+    parser.add_argument(
+        "--retention_days",
+        type=int,
+        default=None,
+        help="Delete shards whose period ended more than this many days ago",
     )
     parser.add_argument(
         "--total_batches",
@@ -326,14 +972,30 @@ def parse_arguments():
 
 if __name__ == "__main__":
     args = parse_arguments()
-    index_path, mapping_path = get_faiss_db_path()
-    index_path = args.index_path or index_path
-    mapping_path = args.mapping_path or mapping_path
+    index_path = args.index_path or get_faiss_db_path()
+    if args.remove_article_ids:
+        remove_articles_from_index(args.remove_article_ids, index_path=index_path)
+    if args.rebuild and args.sharding != "none":
+        rebuild_shards(index_path=index_path, granularity=args.sharding)
+    elif args.rebuild:
+        rebuild_faiss_index(index_path=index_path, index_type=args.index_type, n_list=args.n_list)
     stats = process_in_batches(
         batch_size=args.batch_size,
         index_path=index_path,
-        mapping_path=mapping_path,
         total_batches=args.total_batches,
         index_type=args.index_type,
         n_list=args.n_list,
+        retrain_growth=args.retrain_growth,
+        sharding=args.sharding,
+        segment_size=args.segment_size,
+        compact_at=args.compact_segments,
     )
+    if args.compact and args.sharding == "none":
+        compact_segments(index_path)
+    elif args.compact:
+        compact_and_expire_shards(
+            index_path=index_path,
+            index_type=args.index_type,
+            compact_after_days=args.compact_after_days,
+            retention_days=args.retention_days,
+        )
@@ -43,6 +43,7 @@ def generate_podcast_from_prompt_v2(
     language_code: str = "en",
     podcast_script_prompt: Optional[str] = None,
     image_prompt: Optional[str] = None,
+    time_range_hours: Optional[int] = None,
     debug: bool = False,
 ) -> Dict[str, Any]:
     if tracking_db_path is None:
@@ -54,7 +55,7 @@ def generate_podcast_from_prompt_v2(
     os.makedirs(images_dir, exist_ok=True)
     print(f"Starting enhanced podcast generation for prompt: {prompt}")
     try:
-        search_results = search_agent_run(prompt)
+        search_results = search_agent_run(prompt, time_range_hours=time_range_hours)
         if not search_results:
             print(f"WARNING: No search results found for prompt: {prompt}")
             return {"error": "No search results found"}
@@ -232,6 +233,7 @@ def generate_podcast_from_config_v2(
         language_code=language_code,
         podcast_script_prompt=podcast_script_prompt,
         image_prompt=image_prompt,
+        time_range_hours=time_range_hours,
         debug=debug,
     )
 
@@ -1,6 +1,6 @@
 from db.config import get_tracking_db_path
 from db.feeds import get_uncrawled_entries
-from db.articles import store_crawled_article, update_entry_status
+from db.articles import store_crawl_results
 from utils.crawl_url import get_web_data
 
 
@@ -14,34 +14,34 @@ def crawl_pending_entries(tracking_db_path=None, batch_size=20, delay_range=(1,
         "failed_count": 0,
         "skipped_count": 0,
     }
+    crawled = []
+    entry_statuses = {}
     for entry in entries:
         entry_id = entry["id"]
         url = entry["link"]
         if not url or url.strip() == "":
-            update_entry_status(tracking_db_path, entry_id, "skipped")
-            stats["skipped_count"] += 1
+            entry_statuses[entry_id] = "skipped"
             continue
         print(f"Crawling URL: {url}")
         try:
             web_data = get_web_data(url)
             if not web_data or not web_data["raw_html"]:
                 print(f"No content retrieved for {url}")
-                update_entry_status(tracking_db_path, entry_id, "failed")
-                stats["failed_count"] += 1
+                entry_statuses[entry_id] = "failed"
                 continue
-            success = store_crawled_article(tracking_db_path, entry, web_data["raw_html"], web_data["metadata"])
-            if success:
-                update_entry_status(tracking_db_path, entry_id, "success")
-                stats["success_count"] += 1
-                print(f"Successfully crawled: {url}")
-            else:
-                update_entry_status(tracking_db_path, entry_id, "failed")
-                stats["failed_count"] += 1
-                print(f"Failed to store: {url} (likely duplicate)")
+            crawled.append((entry, web_data["raw_html"], web_data["metadata"]))
         except Exception as e:
             print(f"Error crawling {url}: {str(e)}")
-            update_entry_status(tracking_db_path, entry_id, "failed")
-            stats["failed_count"] += 1
+            entry_statuses[entry_id] = "failed"
+    # Articles and entry statuses for the whole batch are written in one transaction
+    statuses = store_crawl_results(tracking_db_path, crawled, entry_statuses) if entries else {}
+    for entry, _, _ in crawled:
+        if statuses.get(entry["id"]) == "success":
+            print(f"Successfully crawled: {entry['link']}")
+        else:
+            print(f"Failed to store: {entry['link']} (likely duplicate)")
+    for status in statuses.values():
+        stats[f"{status}_count"] += 1
     return stats
 
 
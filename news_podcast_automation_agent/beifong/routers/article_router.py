@@ -14,7 +14,8 @@ async def read_articles(
     category: Optional[str] = Query(None, description="Filter by category"),
     date_from: Optional[str] = Query(None, description="Filter by start date (format: YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Filter by end date (format: YYYY-MM-DD)"),
-    search: Optional[str] = Query(None, description="Search in title and summary"),
+    search: Optional[str] = Query(None, description='Full-text search in title, summary and content; "quoted phrase" and prefix* supported'),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page, for keyset pagination"),
 ):
     """
     Get all articles with pagination and filtering.
@@ -25,10 +26,11 @@ async def read_articles(
     - **category**: Filter by category
     - **date_from**: Filter by start date (format: YYYY-MM-DD)
     - **date_to**: Filter by end date (format: YYYY-MM-DD)
-    - **search**: Search in title and summary
+    - **search**: Full-text search in title, summary and content, all words required; "quoted phrase" and prefix* are supported
+    - **cursor**: next_cursor of the previous page; when set, pages are read by keyset instead of offset
     """
     return await article_service.get_articles(
-        page=page, per_page=per_page, source=source, category=category, date_from=date_from, date_to=date_to, search=search
+        page=page, per_page=per_page, source=source, category=category, date_from=date_from, date_to=date_to, search=search, cursor=cursor
     )
 
 
@@ -8,7 +8,12 @@ router = APIRouter()
 
 @router.get("/", response_model=PaginatedSources)
 async def read_sources(
-    page: int = 1, per_page: int = 10, category: Optional[str] = None, search: Optional[str] = None, include_inactive: bool = False
+    page: int = 1,
+    per_page: int = 10,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    include_inactive: bool = False,
+    cursor: Optional[str] = None,
 ):
     """
     Get sources with pagination and filtering.
@@ -18,8 +23,11 @@ async def read_sources(
     - **category**: Filter by source category
     - **search**: Search in name and description
     - **include_inactive**: Include inactive sources
+    - **cursor**: next_cursor of the previous page; when set, pages are read by keyset instead of offset
     """
-    return await source_service.get_sources(page=page, per_page=per_page, category=category, search=search, include_inactive=include_inactive)
+    return await source_service.get_sources(
+        page=page, per_page=per_page, category=category, search=search, include_inactive=include_inactive, cursor=cursor
+    )
 
 
 @router.get("/categories", response_model=List[Category])
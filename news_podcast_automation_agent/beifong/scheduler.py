@@ -9,7 +9,7 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from db.config import get_tasks_db_path
-from db.connection import db_connection
+from db.writer import run_write
 from db.tasks import (
     get_pending_tasks,
     update_task_last_run,
@@ -21,77 +21,81 @@ MAX_WORKERS = 5
 DEFAULT_TASK_TIMEOUT = 3600
 
 
+def mark_stuck_executions_failed(conn):
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT id FROM task_executions 
+        WHERE status = 'running'
+        LIMIT 100
+        """
+    )
+    running_executions = [dict(row) for row in cursor.fetchall()]
+    error_message = "Task was interrupted by system shutdown or crash"
+    for execution in running_executions:
+        cursor.execute(
+            """
+            UPDATE task_executions
+            SET end_time = ?, status = ?, error_message = ?
+            WHERE id = ?
+            """,
+            (datetime.now().isoformat(), "failed", error_message, execution["id"]),
+        )
+    return [execution["id"] for execution in running_executions]
+
+
 def cleanup_stuck_tasks():
     tasks_db_path = get_tasks_db_path()
     try:
-        with db_connection(tasks_db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT id FROM task_executions 
-                WHERE status = 'running'
-                LIMIT 100
-                """
-            )
-            running_executions = [dict(row) for row in cursor.fetchall()]
-            if running_executions:
-                print(f"WARNING: Found {len(running_executions)} tasks stuck in 'running' state. Marking as failed.")
-                for execution in running_executions:
-                    execution_id = execution["id"]
-                    error_message = "Task was interrupted by system shutdown or crash"
-                    cursor.execute(
-                        """
-                        UPDATE task_executions
-                        SET end_time = ?, status = ?, error_message = ?
-                        WHERE id = ?
-                        """,
-                        (datetime.now().isoformat(), "failed", error_message, execution_id),
-                    )
-                    print(f"INFO: Marked execution {execution_id} as failed")
-                conn.commit()
-            else:
-                print("INFO: No stuck tasks found")
+        execution_ids = run_write(tasks_db_path, mark_stuck_executions_failed)
+        if execution_ids:
+            print(f"WARNING: Found {len(execution_ids)} tasks stuck in 'running' state. Marking as failed.")
+            for execution_id in execution_ids:
+                print(f"INFO: Marked execution {execution_id} as failed")
+        else:
+            print("INFO: No stuck tasks found")
     except Exception as e:
         print(f"ERROR: Error cleaning up stuck tasks: {str(e)}")
         print(f"ERROR: {traceback.format_exc()}")
 
 
+def claim_task_execution(conn, task_id):
+    # Runs inside the writer's BEGIN IMMEDIATE transaction, so the check and insert are atomic
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT 1 FROM task_executions 
+        WHERE task_id = ? AND status = 'running'
+        LIMIT 1
+        """,
+        (task_id,),
+    )
+    if cursor.fetchone() is not None:
+        return None
+    cursor.execute(
+        """
+        INSERT INTO task_executions 
+        (task_id, start_time, status)
+        VALUES (?, ?, ?)
+        """,
+        (task_id, datetime.now().isoformat(), "running"),
+    )
+    return cursor.lastrowid
+
+
 def execute_task(task_id, command):
     tasks_db_path = get_tasks_db_path()
-    with db_connection(tasks_db_path) as conn:
-        conn.execute("BEGIN EXCLUSIVE TRANSACTION")
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT 1 FROM task_executions 
-                WHERE task_id = ? AND status = 'running'
-                LIMIT 1
-                """,
-                (task_id,),
-            )
-            is_running = cursor.fetchone() is not None
-            if is_running:
-                print(f"WARNING: Task {task_id} is already running, skipping this execution")
-                conn.commit()
-                return
-            cursor.execute(
-                """
-                INSERT INTO task_executions 
-                (task_id, start_time, status)
-                VALUES (?, ?, ?)
-                """,
-                (task_id, datetime.now().isoformat(), "running"),
-            )
-            execution_id = cursor.lastrowid
-            conn.commit()
-            if not execution_id:
-                print(f"ERROR: Failed to create execution record for task {task_id}")
-                return
-        except Exception as e:
-            conn.rollback()
-            print(f"ERROR: Transaction error for task {task_id}: {str(e)}")
-            return
+    try:
+        execution_id = run_write(tasks_db_path, claim_task_execution, task_id)
+    except Exception as e:
+        print(f"ERROR: Transaction error for task {task_id}: {str(e)}")
+        return
+    if execution_id is None:
+        print(f"WARNING: Task {task_id} is already running, skipping this execution")
+        return
+    if not execution_id:
+        print(f"ERROR: Failed to create execution record for task {task_id}")
+        return
     print(f"INFO: Starting task {task_id}: {command}")
     try:
         process = subprocess.Popen(
@@ -2,9 +2,23 @@ from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
 import json
 from services.db_service import tracking_db, sources_db
+from services.pagination import Keyset, count_cache, decode_cursor, encode_cursor
+from db.fts import ARTICLE_BM25_SQL, ARTICLE_SNIPPET_SQL, build_match_query
+from db.loaders import attach, load_article_categories
+from db.rollups import CATEGORY_COUNTS_SQL
+from db.timestamps import apply_epoch_range
 from models.article_schemas import Article, PaginatedArticles
 
 
+ARTICLE_KEYSET = Keyset(["ca.published_ts", "ca.id"])
+ARTICLE_RANK_ORDER_SQL = f"ORDER BY {ARTICLE_BM25_SQL}, ca.published_ts DESC, ca.id DESC"
+# Source names come from the sources database, attached read-only to tracking_db connections
+ARTICLE_SOURCE_JOIN = """
+LEFT JOIN sources.source_feeds sf ON sf.id = ca.feed_id
+LEFT JOIN sources.sources s ON s.id = sf.source_id
+"""
+
+
 class ArticleService:
     """Service for managing article operations with the new database structure."""
 
@@ -17,27 +31,30 @@ class ArticleService:
         date_to: Optional[str] = None,
         search: Optional[str] = None,
         category: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> PaginatedArticles:
-        """Get articles with pagination and filtering."""
+        """
+        Get articles with pagination and filtering; a cursor switches from page offsets to keyset pagination.
+
+        Searches are ranked by BM25 instead of recency. bm25() cannot be compared in a WHERE
+        clause, so their cursor carries the offset of the next page rather than sort keys.
+        """
         try:
             offset = (page - 1) * per_page
             query_parts = [
-                "SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary, ca.feed_id",
                 "FROM crawled_articles ca",
                 "WHERE ca.processed = 1 AND ca.ai_status = 'success'",
             ]
             query_params = []
             if source:
-                source_id_query = "SELECT id FROM sources WHERE name = ?"
-                source_id_result = await sources_db.execute_query(source_id_query, (source,), fetch=True, fetch_one=True)
-                if source_id_result and source_id_result.get("id"):
-                    feed_ids_query = "SELECT id FROM source_feeds WHERE source_id = ?"
-                    feed_ids_result = await sources_db.execute_query(feed_ids_query, (source_id_result["id"],), fetch=True)
-                    if feed_ids_result:
-                        feed_ids = [item["id"] for item in feed_ids_result]
-                        placeholders = ",".join(["?" for _ in feed_ids])
-                        query_parts.append(f"AND ca.feed_id IN ({placeholders})")
-                        query_params.extend(feed_ids)
+                query_parts.append("""
+                    AND ca.feed_id IN (
+                        SELECT fsf.id FROM sources.source_feeds fsf
+                        JOIN sources.sources fs ON fs.id = fsf.source_id
+                        WHERE fs.name = ?
+                    )
+                """)
+                query_params.append(source)
             if category:
                 query_parts.append("""
                     AND EXISTS (
@@ -46,47 +63,38 @@ class ArticleService:
                     )
                 """)
                 query_params.append(category.lower())
-            if date_from:
-                query_parts.append("AND datetime(ca.published_date) >= datetime(?)")
-                query_params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(ca.published_date) <= datetime(?)")
-                query_params.append(date_to)
-            if search:
-                query_parts.append("AND (ca.title LIKE ? OR ca.summary LIKE ?)")
-                search_param = f"%{search}%"
-                query_params.extend([search_param, search_param])
-            count_query = " ".join(query_parts).replace(
-                "SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary, ca.feed_id",
-                "SELECT COUNT(*)",
-            )
-            total_articles = await tracking_db.execute_query(count_query, tuple(query_params), fetch=True, fetch_one=True)
-            total_count = total_articles.get("COUNT(*)", 0) if total_articles else 0
-            query_parts.append("ORDER BY datetime(ca.published_date) DESC, ca.id DESC")
+            apply_epoch_range(query_parts, query_params, "ca.published_ts", date_from, date_to)
+            match_query = build_match_query(search) if search else None
+            if match_query:
+                query_parts[0] = "FROM crawled_articles ca JOIN articles_fts ON articles_fts.rowid = ca.id"
+                query_parts.append("AND articles_fts MATCH ?")
+                query_params.append(match_query)
+            total_count = await count_cache.count(tracking_db, " ".join(query_parts), query_params, id_column="ca.id")
+            if cursor and match_query:
+                offset = decode_cursor(cursor, 1)[0]
+                if not isinstance(offset, int) or offset < 0:
+                    raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+            elif cursor:
+                keyset_condition, keyset_params = ARTICLE_KEYSET.after_sql(cursor)
+                query_parts.append(f"AND {keyset_condition}")
+                query_params.extend(keyset_params)
+                offset = 0
+            query_parts.append(ARTICLE_RANK_ORDER_SQL if match_query else ARTICLE_KEYSET.order_sql())
             query_parts.append("LIMIT ? OFFSET ?")
-            query_params.extend([per_page, offset])
-            articles_query = " ".join(query_parts)
-            articles = await tracking_db.execute_query(articles_query, tuple(query_params), fetch=True)
-            feed_ids = [article["feed_id"] for article in articles if article.get("feed_id")]
-            source_names = {}
-            if feed_ids:
-                feed_ids_str = ",".join("?" for _ in feed_ids)
-                source_query = f"""
-                SELECT sf.id as feed_id, s.name as source_name
-                FROM source_feeds sf
-                JOIN sources s ON sf.source_id = s.id
-                WHERE sf.id IN ({feed_ids_str})
-                """
-                sources_result = await sources_db.execute_query(source_query, tuple(feed_ids), fetch=True)
-                source_names = {item["feed_id"]: item["source_name"] for item in sources_result}
-            for article in articles:
-                feed_id = article.get("feed_id")
-                article["source_name"] = source_names.get(feed_id, "Unknown Source")
-                article.pop("feed_id", None)
-                article["categories"] = await self.get_article_categories(article["id"])
+            query_params.extend([per_page + 1, offset])
+            select = f"""
+            SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary,
+                   COALESCE(s.name, 'Unknown Source') AS source_name,
+                   {ARTICLE_SNIPPET_SQL if match_query else "NULL"} AS snippet, {ARTICLE_KEYSET.select_sql()}
+            """
+            articles_query = " ".join([select, query_parts[0], ARTICLE_SOURCE_JOIN, *query_parts[1:]])
+            articles, next_cursor = ARTICLE_KEYSET.paginate(await tracking_db.execute_query(articles_query, tuple(query_params), fetch=True), per_page)
+            if match_query and next_cursor:
+                next_cursor = encode_cursor([offset + per_page])
+            await self.attach_related(articles)
             total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
-            has_next = page < total_pages
-            has_prev = page > 1
+            has_next = next_cursor is not None
+            has_prev = page > 1 or bool(cursor)
             return PaginatedArticles(
                 items=articles,
                 total=total_count,
@@ -95,6 +103,7 @@ class ArticleService:
                 total_pages=total_pages,
                 has_next=has_next,
                 has_prev=has_prev,
+                next_cursor=next_cursor,
             )
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -104,30 +113,16 @@ class ArticleService:
     async def get_article(self, article_id: int) -> Article:
         """Get a specific article by ID."""
         try:
-            article_query = """
-            SELECT id, title, url, published_date, content, summary, feed_id,
-                   metadata, ai_status
-            FROM crawled_articles
-            WHERE id = ? AND processed = 1
+            article_query = f"""
+            SELECT ca.id, ca.title, ca.url, ca.published_date, ca.content, ca.summary,
+                   ca.metadata, ca.ai_status, COALESCE(s.name, 'Unknown Source') AS source_name
+            FROM crawled_articles ca
+            {ARTICLE_SOURCE_JOIN}
+            WHERE ca.id = ? AND ca.processed = 1
             """
             article = await tracking_db.execute_query(article_query, (article_id,), fetch=True, fetch_one=True)
             if not article:
                 raise HTTPException(status_code=404, detail="Article not found")
-            if article.get("feed_id"):
-                source_query = """
-                SELECT s.name as source_name
-                FROM source_feeds sf
-                JOIN sources s ON sf.source_id = s.id
-                WHERE sf.id = ?
-                """
-                source_result = await sources_db.execute_query(source_query, (article["feed_id"],), fetch=True, fetch_one=True)
-                if source_result:
-                    article["source_name"] = source_result["source_name"]
-                else:
-                    article["source_name"] = "Unknown Source"
-            else:
-                article["source_name"] = "Unknown Source"
-            article.pop("feed_id", None)
             if article.get("metadata"):
                 try:
                     article["metadata"] = json.loads(article["metadata"])
@@ -142,13 +137,13 @@ class ArticleService:
 
     async def get_article_categories(self, article_id: int) -> List[str]:
         """Get categories for a specific article."""
-        query = """
-        SELECT category_name
-        FROM article_categories
-        WHERE article_id = ?
-        """
-        categories = await tracking_db.execute_query(query, (article_id,), fetch=True)
-        return [category.get("category_name", "") for category in categories]
+        categories = await tracking_db.run_read(load_article_categories, [article_id])
+        return categories.get(article_id, [])
+
+    async def attach_related(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach categories to a page of articles with one query."""
+        categories = await tracking_db.run_read(load_article_categories, [article["id"] for article in articles]) if articles else {}
+        return attach(articles, "id", "categories", categories, default=list)
 
     async def get_sources(self) -> List[str]:
         """Get all available active sources."""
@@ -161,14 +156,8 @@ class ArticleService:
         return [row.get("name", "") for row in result if row.get("name")]
 
     async def get_categories(self) -> List[Dict[str, Any]]:
-        """Get all categories with article counts."""
-        query = """
-        SELECT category_name, COUNT(DISTINCT article_id) as article_count
-        FROM article_categories
-        GROUP BY category_name
-        ORDER BY article_count DESC
-        """
-        return await tracking_db.execute_query(query, fetch=True)
+        """Get all categories with article counts, read from the trigger-maintained counters."""
+        return await tracking_db.execute_query(CATEGORY_COUNTS_SQL, fetch=True)
 
 
 article_service = ArticleService()
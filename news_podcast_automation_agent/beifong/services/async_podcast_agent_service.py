@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import uuid
 from fastapi import status
 from fastapi.responses import JSONResponse
@@ -7,6 +8,7 @@ import aiosqlite
 import glob
 from redis.asyncio import ConnectionPool, Redis
 from db.config import get_agent_session_db_path
+from db.writer import execute_write, submit_write
 from db.agent_config_v2 import PODCAST_DIR, PODCAST_AUIDO_DIR, PODCAST_IMG_DIR, PODCAST_RECORDINGS_DIR, AVAILABLE_LANGS
 from services.celery_tasks import agent_chat
 from dotenv import load_dotenv
@@ -189,7 +191,7 @@ class PodcastAgentService:
                     "is_processing": False,
                 }
 
-            session = SessionService.get_session(session_id)
+            session = await asyncio.to_thread(SessionService.get_session, session_id)
             session_state = session.get("state", {})
             return {
                 "session_id": session_id,
@@ -240,7 +242,7 @@ class PodcastAgentService:
                     sessions = []
                     for row in rows:
                         try:
-                            session = SessionService.get_session(row["session_id"])
+                            session = await asyncio.to_thread(SessionService.get_session, row["session_id"])
                             session_state = session.get("state", {})
                             title = session_state.get("title", "Untitled Podcast")
                             stage = session_state.get("stage", "welcome")
@@ -271,15 +273,14 @@ class PodcastAgentService:
                 if not row:
                     return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": f"Session with ID {session_id} not found"})
                 try:
-                    session = SessionService.get_session(session_id)
+                    session = await asyncio.to_thread(SessionService.get_session, session_id)
                     session_state = session.get("state", {})
                     stage = session_state.get("stage")
                     is_completed = stage == "complete" or session_state.get("podcast_generated", False)
                     banner_url = session_state.get("banner_url")
                     audio_url = session_state.get("audio_url")
                     web_search_recording = session_state.get("web_search_recording")
-                    await conn.execute("DELETE FROM podcast_sessions WHERE session_id = ?", (session_id,))
-                    await conn.commit()
+                    await asyncio.wrap_future(submit_write(db_path, execute_write, "DELETE FROM podcast_sessions WHERE session_id = ?", (session_id,)))
                     if is_completed:
                         print(f"Session {session_id} is in 'complete' stage, keeping assets but removing session record")
                     else:
@@ -325,7 +326,7 @@ class PodcastAgentService:
         session_state = {}
         if row["session_data"]:
             try:
-                session = SessionService.get_session(session_id)
+                session = await asyncio.to_thread(SessionService.get_session, session_id)
                 session_state = session.get("state", {})
             except Exception as e:
                 print(f"Error parsing session_data: {e}")
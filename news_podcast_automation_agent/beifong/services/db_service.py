@@ -1,75 +1,118 @@
 import os
-from typing import Dict, List, Any, Tuple, Union
+import asyncio
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Tuple, Union, Callable, Optional, Sequence
 from fastapi import HTTPException
 from contextlib import contextmanager
-import sqlite3
-from db.config import get_db_path
+from db.config import get_attach_paths, get_db_path
+from db.connection import db_connection as pooled_connection
+from db.writer import execute_write, execute_write_many, shutdown_writers, submit_write
+
+DEFAULT_READ_WORKERS = int(os.environ.get("DB_READ_WORKERS", "8"))
 
 
 @contextmanager
-def db_connection(db_path: str):
+def db_connection(db_path: str, attach: Optional[Dict[str, str]] = None):
     """Context manager for database connections."""
     if not os.path.exists(db_path):
         raise HTTPException(status_code=404, detail=f"Database {db_path} not found. Initialize the database first.")
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
+    with pooled_connection(db_path, attach) as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 class DatabaseService:
-    """Service for managing database connections and operations."""
+    """
+    Non-blocking access to one SQLite database for the FastAPI services.
+
+    Queries never run on the event loop: reads go to a bounded pool of reader threads
+    and writes to the database's group-commit writer from db.writer, which is shared
+    with the processors and tools running in this process, so concurrent writes are
+    batched into one transaction instead of contending for SQLite's write lock. Each
+    thread keeps its own persistent, PRAGMA-tuned connection from db.connection.
+    """
 
-    def __init__(self, db_name: str):
+    def __init__(self, db_name: str, read_workers: int = DEFAULT_READ_WORKERS, attach: Sequence[str] = ()):
         """
         Initialize the database service.
 
         Args:
             db_name: Name of the database (sources_db, tracking_db, etc.)
+            read_workers: Number of concurrent reader threads for this database
+            attach: Aliases from db.config.ATTACH_ALIASES of databases that reads can join
+                read-only, e.g. "sources" to select from sources.sources
         """
+        self.db_name = db_name
         self.db_path = get_db_path(db_name)
+        self.attach = get_attach_paths(*attach)
+        self._reader = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix=f"{db_name}-read")
+        self.write_generation = 0
 
-    async def execute_query(
-        self, query: str, params: Tuple = (), fetch: bool = False, fetch_one: bool = False
-    ) -> Union[List[Dict[str, Any]], Dict[str, Any], int]:
-        """Execute a query with error handling for FastAPI."""
+    async def _wait(self, future) -> Any:
         try:
-            with db_connection(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-
-                if fetch_one:
-                    result = cursor.fetchone()
-                    return dict(result) if result else None
-                elif fetch:
-                    return [dict(row) for row in cursor.fetchall()]
-                else:
-                    conn.commit()
-                    return cursor.lastrowid
+            return await future
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    async def _submit(self, func: Callable, *args) -> Any:
+        return await self._wait(asyncio.get_running_loop().run_in_executor(self._reader, partial(func, *args)))
+
+    async def _submit_write(self, func: Callable, *args) -> Any:
+        if not os.path.exists(self.db_path):
+            raise HTTPException(status_code=404, detail=f"Database {self.db_path} not found. Initialize the database first.")
+        try:
+            return await self._wait(asyncio.wrap_future(submit_write(self.db_path, func, *args)))
+        finally:
+            self.write_generation += 1
+
+    def _execute(self, query: str, params: Tuple, fetch_one: bool) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        with db_connection(self.db_path, self.attach) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+
+            if fetch_one:
+                result = cursor.fetchone()
+                return dict(result) if result else None
+            return [dict(row) for row in cursor.fetchall()]
+
+    def _with_connection(self, func: Callable, *args) -> Any:
+        with db_connection(self.db_path, self.attach) as conn:
+            return func(conn, *args)
+
+    async def execute_query(
+        self, query: str, params: Tuple = (), fetch: bool = False, fetch_one: bool = False
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any], int]:
+        """Execute a query with error handling for FastAPI."""
+        if fetch or fetch_one:
+            return await self._submit(self._execute, query, params, fetch_one)
+        return await self._submit_write(execute_write, query, params)
+
     async def execute_write_many(self, query: str, params_list: List[Tuple]) -> int:
         """Execute multiple write operations in a single transaction."""
-        try:
-            with db_connection(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.executemany(query, params_list)
-                conn.commit()
-                return cursor.rowcount
-        except Exception as e:
-            if isinstance(e, HTTPException):
-                raise e
-            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        return await self._submit_write(execute_write_many, query, params_list)
+
+    async def run_read(self, func: Callable, *args) -> Any:
+        """Run func(conn, *args) on a reader thread, for multi-statement reads."""
+        return await self._submit(self._with_connection, func, *args)
 
+    async def run_write(self, func: Callable, *args) -> Any:
+        """Queue func(conn, *args) on the group-commit writer; the result is returned once committed."""
+        return await self._submit_write(func, *args)
+
+    def shutdown(self):
+        self._reader.shutdown(wait=False)
 
 
 sources_db = DatabaseService(db_name="sources_db")
-tracking_db = DatabaseService(db_name="tracking_db")
+tracking_db = DatabaseService(db_name="tracking_db", attach=("sources",))
 podcasts_db = DatabaseService(db_name="podcasts_db")
 tasks_db = DatabaseService(db_name="tasks_db")
 social_media_db = DatabaseService(db_name="social_media_db")
+
+
+def shutdown_db_services():
+    for service in (sources_db, tracking_db, podcasts_db, tasks_db, social_media_db):
+        service.shutdown()
+    shutdown_writers()
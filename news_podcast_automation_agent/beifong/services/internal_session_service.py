@@ -4,20 +4,8 @@ import json
 from datetime import datetime
 from db.config import get_db_path
 from db.agent_config_v2 import INITIAL_SESSION_STATE
-import sqlite3
-from contextlib import contextmanager
-
-
-@contextmanager
-def get_db_connection(db_name: str):
-    """Get a fresh database connection each time."""
-    db_path = get_db_path(db_name)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
+from db.connection import db_connection
+from db.writer import execute_write, run_write
 
 
 class SessionService:
@@ -26,7 +14,7 @@ class SessionService:
     @staticmethod
     def get_session(session_id: str) -> Dict[str, Any]:
         try:
-            with get_db_connection("internal_sessions_db") as conn:
+            with db_connection(get_db_path("internal_sessions_db")) as conn:
                 cursor = conn.cursor()
                 query = """
                 SELECT session_id, state, created_at
@@ -52,17 +40,14 @@ class SessionService:
     @staticmethod
     def _initialize_session(session_id: str) -> Dict[str, Any]:
         try:
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                state_json = json.dumps(INITIAL_SESSION_STATE)
-                insert_query = """
-                INSERT INTO session_state (session_id, state, created_at)
-                VALUES (?, ?, ?)
-                """
-                current_time = datetime.now().isoformat()
-                cursor.execute(insert_query, (session_id, state_json, current_time))
-                conn.commit()
-                return {"session_id": session_id, "state": INITIAL_SESSION_STATE, "created_at": current_time}
+            state_json = json.dumps(INITIAL_SESSION_STATE)
+            insert_query = """
+            INSERT INTO session_state (session_id, state, created_at)
+            VALUES (?, ?, ?)
+            """
+            current_time = datetime.now().isoformat()
+            run_write(get_db_path("internal_sessions_db"), execute_write, insert_query, (session_id, state_json, current_time))
+            return {"session_id": session_id, "state": INITIAL_SESSION_STATE, "created_at": current_time}
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error initializing session: {str(e)}")
 
@@ -70,40 +55,42 @@ class SessionService:
     def save_session(session_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
         try:
             state_json = json.dumps(state)
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                conn.execute("BEGIN IMMEDIATE")
-                existing_query = "SELECT session_id FROM session_state WHERE session_id = ?"
-                cursor.execute(existing_query, (session_id,))
-                existing_session = cursor.fetchone()
-                if existing_session:
-                    update_query = "UPDATE session_state SET state = ? WHERE session_id = ?"
-                    cursor.execute(update_query, (state_json, session_id))
-                else:
-                    insert_query = "INSERT INTO session_state (session_id, state, created_at) VALUES (?, ?, ?)"
-                    current_time = datetime.now().isoformat()
-                    cursor.execute(insert_query, (session_id, state_json, current_time))
-                conn.commit()
+            run_write(get_db_path("internal_sessions_db"), SessionService._write_session, session_id, state_json)
             return SessionService.get_session(session_id)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
             raise HTTPException(status_code=500, detail=f"Error saving session: {str(e)}")
 
+    @staticmethod
+    def _write_session(conn, session_id: str, state_json: str):
+        # Queued on the writer, which already holds the write lock for the check and upsert
+        cursor = conn.cursor()
+        existing_query = "SELECT session_id FROM session_state WHERE session_id = ?"
+        cursor.execute(existing_query, (session_id,))
+        existing_session = cursor.fetchone()
+        if existing_session:
+            update_query = "UPDATE session_state SET state = ? WHERE session_id = ?"
+            cursor.execute(update_query, (state_json, session_id))
+        else:
+            insert_query = "INSERT INTO session_state (session_id, state, created_at) VALUES (?, ?, ?)"
+            current_time = datetime.now().isoformat()
+            cursor.execute(insert_query, (session_id, state_json, current_time))
+
+    @staticmethod
+    def _delete_session(conn, session_id: str) -> int:
+        cursor = conn.cursor()
+        delete_query = "DELETE FROM session_state WHERE session_id = ?"
+        cursor.execute(delete_query, (session_id,))
+        return cursor.rowcount
+
     @staticmethod
     def delete_session(session_id: str) -> Dict[str, str]:
         try:
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                existing_query = "SELECT session_id FROM session_state WHERE session_id = ?"
-                cursor.execute(existing_query, (session_id,))
-                existing_session = cursor.fetchone()
-                if not existing_session:
-                    raise HTTPException(status_code=404, detail="Session not found")
-                delete_query = "DELETE FROM session_state WHERE session_id = ?"
-                cursor.execute(delete_query, (session_id,))
-                conn.commit()
-                return {"message": f"Session with ID {session_id} successfully deleted"}
+            deleted = run_write(get_db_path("internal_sessions_db"), SessionService._delete_session, session_id)
+            if not deleted:
+                raise HTTPException(status_code=404, detail="Session not found")
+            return {"message": f"Session with ID {session_id} successfully deleted"}
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -112,7 +99,7 @@ class SessionService:
     @staticmethod
     def list_sessions(page: int = 1, per_page: int = 10, search: Optional[str] = None) -> Dict[str, Any]:
         try:
-            with get_db_connection("internal_sessions_db") as conn:
+            with db_connection(get_db_path("internal_sessions_db")) as conn:
                 cursor = conn.cursor()
                 offset = (page - 1) * per_page
                 query_parts = [
@@ -0,0 +1,116 @@
+import base64
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+
+COUNT_CACHE_TTL_SECONDS = float(os.environ.get("COUNT_CACHE_TTL_SECONDS", "30"))
+COUNT_FULL_REFRESH_SECONDS = float(os.environ.get("COUNT_FULL_REFRESH_SECONDS", "600"))
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values), separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode((cursor + "=" * (-len(cursor) % 4)).encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+
+class Keyset:
+    """
+    Sort keys of a listing, used for both offset and keyset (cursor) pagination.
+
+    The last column must make the order unique (usually the primary key). Rows are
+    selected with their key values as _sort_N columns; the next page starts strictly
+    after the last row's keys through a row-value comparison, so page N costs the same
+    as page one instead of scanning and discarding N * per_page rows.
+    """
+
+    def __init__(self, columns: List[str], descending: bool = True):
+        self.columns = columns
+        self.descending = descending
+
+    def select_sql(self) -> str:
+        return ", ".join(f"{column} AS _sort_{i}" for i, column in enumerate(self.columns))
+
+    def order_sql(self) -> str:
+        direction = "DESC" if self.descending else "ASC"
+        return "ORDER BY " + ", ".join(f"{column} {direction}" for column in self.columns)
+
+    def after_sql(self, cursor: str) -> Tuple[str, List[Any]]:
+        values = decode_cursor(cursor, len(self.columns))
+        operator = "<" if self.descending else ">"
+        return f"({', '.join(self.columns)}) {operator} ({', '.join(['?'] * len(values))})", values
+
+    def paginate(self, rows: List[Dict[str, Any]], per_page: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Trim the per_page + 1 fetched rows to a page and return it with the cursor of the next page."""
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        keys = [[row.pop(f"_sort_{i}", None) for i in range(len(self.columns))] for row in rows]
+        return rows, encode_cursor(keys[-1]) if has_next else None
+
+
+class CountCache:
+    """
+    Cached totals for listing endpoints, so page requests do not run COUNT(*) each time.
+
+    A total is reused for ttl seconds. After that, when the listing has a monotonically
+    increasing id column, only rows inserted since the last count are counted and added;
+    a full recount happens every full_refresh seconds or as soon as the API itself has
+    written to the database. Rows that start matching a filter through an update (e.g.
+    an article finishing processing) are therefore picked up by the next full recount,
+    which makes totals approximate between recounts.
+    """
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL_SECONDS, full_refresh: float = COUNT_FULL_REFRESH_SECONDS):
+        self.ttl = ttl
+        self.full_refresh = full_refresh
+        self._entries: Dict[Tuple, Dict[str, Any]] = {}
+
+    async def count(self, db, from_where: str, params: Sequence[Any] = (), id_column: Optional[str] = None) -> int:
+        """
+        Count the rows of `from_where` ("FROM ... WHERE ...") on the given DatabaseService.
+
+        Args:
+            db: DatabaseService to run the count on
+            from_where: FROM and WHERE clauses of the listing query, with a WHERE clause present
+            params: Parameters of the WHERE clause
+            id_column: Increasing id column that allows incremental refreshes
+        """
+        key = (db.db_name, from_where, tuple(params))
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry["generation"] == db.write_generation:
+            if now - entry["checked_at"] < self.ttl:
+                return entry["count"]
+            if id_column and entry["max_id"] is not None and now - entry["counted_at"] < self.full_refresh:
+                query = f"SELECT COUNT(*) AS count, MAX({id_column}) AS max_id {from_where} AND {id_column} > ?"
+                delta = await db.execute_query(query, (*params, entry["max_id"]), fetch=True, fetch_one=True)
+                entry["count"] += delta["count"]
+                entry["max_id"] = delta["max_id"] if delta["max_id"] is not None else entry["max_id"]
+                entry["checked_at"] = now
+                return entry["count"]
+        generation = db.write_generation
+        select = f"COUNT(*) AS count, MAX({id_column}) AS max_id" if id_column else "COUNT(*) AS count, NULL AS max_id"
+        result = await db.execute_query(f"SELECT {select} {from_where}", tuple(params), fetch=True, fetch_one=True)
+        if key not in self._entries and len(self._entries) >= COUNT_CACHE_MAX_ENTRIES:
+            del self._entries[min(self._entries, key=lambda k: self._entries[k]["checked_at"])]
+        self._entries[key] = {
+            "count": result["count"],
+            "max_id": result["max_id"],
+            "generation": generation,
+            "counted_at": now,
+            "checked_at": now,
+        }
+        return result["count"]
+
+
+count_cache = CountCache()
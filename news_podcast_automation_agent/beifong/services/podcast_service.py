@@ -4,10 +4,12 @@ from typing import List, Dict, Optional, Any
 from datetime import datetime
 from fastapi import HTTPException, UploadFile
 from services.db_service import podcasts_db
+from services.pagination import Keyset, count_cache
 import math
 
 AUDIO_DIR = "podcasts/audio"
 IMAGE_DIR = "podcasts/images"
+PODCAST_KEYSET = Keyset(["COALESCE(date, '')", "COALESCE(created_at, '')", "id"])
 
 
 class PodcastService:
@@ -28,18 +30,19 @@ class PodcastService:
         language_code: str = None,
         tts_engine: str = None,
         has_audio: bool = None,
+        cursor: str = None,
     ) -> Dict[str, Any]:
         """
         Get a paginated list of podcasts with optional filtering.
+        A cursor from a previous page switches from page offsets to keyset pagination.
         """
         try:
             offset = (page - 1) * per_page
-            count_query = "SELECT COUNT(*) as count FROM podcasts"
-            query = """
+            query = f"""
             SELECT id, title, date, audio_generated, audio_path, banner_img_path,
-                   language_code, tts_engine, created_at
-            FROM podcasts
+                   language_code, tts_engine, created_at, {PODCAST_KEYSET.select_sql()}
             """
+            from_where = "FROM podcasts WHERE 1=1"
             where_conditions = []
             params = []
             if search:
@@ -61,17 +64,20 @@ class PodcastService:
             if has_audio is not None:
                 where_conditions.append("audio_generated = ?")
                 params.append(1 if has_audio else 0)
-            if where_conditions:
-                where_clause = " WHERE " + " AND ".join(where_conditions)
-                query += where_clause
-                count_query += where_clause
-            query += " ORDER BY date DESC, created_at DESC"
-            query += " LIMIT ? OFFSET ?"
-            params.extend([per_page, offset])
-            total_result = await podcasts_db.execute_query(count_query, tuple(params[:-2] if params else ()), fetch=True, fetch_one=True)
-            total_items = total_result.get("count", 0) if total_result else 0
+            for condition in where_conditions:
+                from_where += f" AND {condition}"
+            total_items = await count_cache.count(podcasts_db, from_where, params, id_column="id")
             total_pages = math.ceil(total_items / per_page) if total_items > 0 else 0
-            podcasts = await podcasts_db.execute_query(query, tuple(params), fetch=True)
+            query += from_where
+            if cursor:
+                keyset_condition, keyset_params = PODCAST_KEYSET.after_sql(cursor)
+                query += f" AND {keyset_condition}"
+                params.extend(keyset_params)
+                offset = 0
+            query += f" {PODCAST_KEYSET.order_sql()}"
+            query += " LIMIT ? OFFSET ?"
+            params.extend([per_page + 1, offset])
+            podcasts, next_cursor = PODCAST_KEYSET.paginate(await podcasts_db.execute_query(query, tuple(params), fetch=True), per_page)
             for podcast in podcasts:
                 podcast["audio_generated"] = bool(podcast.get("audio_generated", 0))
                 if podcast.get("banner_img_path"):
@@ -80,8 +86,8 @@ class PodcastService:
                     podcast["banner_img"] = None
                 podcast.pop("banner_img_path", None)
                 podcast["identifier"] = str(podcast.get("id", ""))
-            has_next = page < total_pages
-            has_prev = page > 1
+            has_next = next_cursor is not None
+            has_prev = page > 1 or bool(cursor)
             return {
                 "items": podcasts,
                 "total": total_items,
@@ -90,8 +96,11 @@ class PodcastService:
                 "total_pages": total_pages,
                 "has_next": has_next,
                 "has_prev": has_prev,
+                "next_cursor": next_cursor,
             }
         except Exception as e:
+            if isinstance(e, HTTPException):
+                raise e
             raise HTTPException(status_code=500, detail=f"Error loading podcasts: {str(e)}")
 
     async def get_podcast(self, podcast_id: int) -> Optional[Dict[str, Any]]:
@@ -99,7 +108,7 @@ class PodcastService:
         try:
             query = """
             SELECT id, title, date, audio_generated, audio_path, banner_img_path,
-                language_code, tts_engine, created_at, banner_images
+                language_code, tts_engine, created_at, banner_images, sources_json
             FROM podcasts
             WHERE id = ?
             """
@@ -113,12 +122,11 @@ class PodcastService:
                 podcast["banner_img"] = None
             podcast.pop("banner_img_path", None)
             podcast["identifier"] = str(podcast.get("id", ""))
-            sources_query = "SELECT sources_json FROM podcasts WHERE id = ?"
-            sources_result = await podcasts_db.execute_query(sources_query, (podcast_id,), fetch=True, fetch_one=True)
+            sources_json = podcast.pop("sources_json", None)
             sources = []
-            if sources_result and sources_result.get("sources_json"):
+            if sources_json:
                 try:
-                    parsed_sources = json.loads(sources_result["sources_json"])
+                    parsed_sources = json.loads(sources_json)
                     if isinstance(parsed_sources, list):
                         sources = parsed_sources
                     else:
@@ -2,10 +2,17 @@ import json
 from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
 from services.db_service import social_media_db
+from services.pagination import Keyset, count_cache
+from db.fts import POST_MATCH_SQL, build_match_query
+from db.rollups import post_rollup_source
+from db.timestamps import apply_epoch_range
 from models.social_media_schemas import PaginatedPosts, Post
 from datetime import datetime, timedelta
 
 
+POST_KEYSET = Keyset(["post_ts", "post_id"])
+
+
 class SocialMediaService:
     """Service for managing social media posts."""
 
@@ -20,12 +27,14 @@ class SocialMediaService:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> PaginatedPosts:
-        """Get social media posts with pagination and filtering."""
+        """Get social media posts with pagination and filtering; a cursor switches from page offsets to keyset pagination."""
         try:
             offset = (page - 1) * per_page
             query_parts = [
-                "SELECT * FROM posts",
+                f"SELECT *, {POST_KEYSET.select_sql()}",
+                "FROM posts",
                 "WHERE 1=1",
             ]
             query_params = []
@@ -39,26 +48,24 @@ class SocialMediaService:
                 query_parts.append("AND sentiment = ?")
                 query_params.append(sentiment)
             if category:
-                query_parts.append("AND categories LIKE ?")
-                query_params.append(f'%"{category}"%')
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                query_params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                query_params.append(date_to)
-            if search:
-                query_parts.append("AND (post_text LIKE ? OR user_display_name LIKE ? OR user_handle LIKE ?)")
-                search_param = f"%{search}%"
-                query_params.extend([search_param, search_param, search_param])
-            count_query = " ".join(query_parts).replace("SELECT *", "SELECT COUNT(*)")
-            total_posts = await social_media_db.execute_query(count_query, tuple(query_params), fetch=True, fetch_one=True)
-            total_count = total_posts.get("COUNT(*)", 0) if total_posts else 0
-            query_parts.append("ORDER BY datetime(post_timestamp) DESC, post_id DESC")
+                query_parts.append("AND post_id IN (SELECT post_id FROM post_categories WHERE category = ?)")
+                query_params.append(category)
+            apply_epoch_range(query_parts, query_params, "post_ts", date_from, date_to)
+            match_query = build_match_query(search) if search else None
+            if match_query:
+                query_parts.append(f"AND {POST_MATCH_SQL}")
+                query_params.append(match_query)
+            total_count = await count_cache.count(social_media_db, " ".join(query_parts[1:]), query_params, id_column="id")
+            if cursor:
+                keyset_condition, keyset_params = POST_KEYSET.after_sql(cursor)
+                query_parts.append(f"AND {keyset_condition}")
+                query_params.extend(keyset_params)
+                offset = 0
+            query_parts.append(POST_KEYSET.order_sql())
             query_parts.append("LIMIT ? OFFSET ?")
-            query_params.extend([per_page, offset])
+            query_params.extend([per_page + 1, offset])
             posts_query = " ".join(query_parts)
-            posts_data = await social_media_db.execute_query(posts_query, tuple(query_params), fetch=True)
+            posts_data, next_cursor = POST_KEYSET.paginate(await social_media_db.execute_query(posts_query, tuple(query_params), fetch=True), per_page)
             posts = []
             for post in posts_data:
                 post_dict = dict(post)
@@ -86,8 +93,8 @@ class SocialMediaService:
                 }
                 posts.append(post_dict)
             total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
-            has_next = page < total_pages
-            has_prev = page > 1
+            has_next = next_cursor is not None
+            has_prev = page > 1 or bool(cursor)
             return PaginatedPosts(
                 items=posts,
                 total=total_count,
@@ -96,6 +103,7 @@ class SocialMediaService:
                 total_pages=total_pages,
                 has_next=has_next,
                 has_prev=has_prev,
+                next_cursor=next_cursor,
             )
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -147,22 +155,16 @@ class SocialMediaService:
     async def get_sentiments(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get sentiment distribution with post counts."""
         try:
+            source, params = post_rollup_source("post_sentiment_hourly", date_from, date_to)
             query_parts = [
-                """
+                f"""
                 SELECT 
-                    sentiment, COUNT(*) as post_count 
-                FROM posts 
-                WHERE sentiment IS NOT NULL
+                    sentiment, SUM(post_count) as post_count 
+                FROM {source} 
+                WHERE sentiment != ''
                 """
             ]
-            params = []
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                params.append(date_to)
-            query_parts.append("GROUP BY sentiment ORDER BY post_count DESC")
+            query_parts.append("GROUP BY sentiment HAVING SUM(post_count) > 0 ORDER BY post_count DESC")
             query = " ".join(query_parts)
             return await social_media_db.execute_query(query, tuple(params), fetch=True)
         except Exception as e:
@@ -178,18 +180,16 @@ class SocialMediaService:
         date_to: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get top users by post count."""
-        query_parts = ["SELECT user_handle, user_display_name, COUNT(*) as post_count", "FROM posts", "WHERE user_handle IS NOT NULL"]
-        params = []
+        source, params = post_rollup_source("post_user_daily", date_from, date_to)
+        query_parts = [
+            "SELECT user_handle, MAX(NULLIF(user_display_name, '')) as user_display_name, SUM(post_count) as post_count",
+            f"FROM {source}",
+            "WHERE user_handle != ''",
+        ]
         if platform:
             query_parts.append("AND platform = ?")
             params.append(platform)
-        if date_from:
-            query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-            params.append(date_from)
-        if date_to:
-            query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-            params.append(date_to)
-        query_parts.extend(["GROUP BY user_handle", "ORDER BY post_count DESC", "LIMIT ?"])
+        query_parts.extend(["GROUP BY user_handle", "HAVING SUM(post_count) > 0", "ORDER BY post_count DESC", "LIMIT ?"])
         params.append(limit)
         query = " ".join(query_parts)
         return await social_media_db.execute_query(query, tuple(params), fetch=True)
@@ -197,29 +197,11 @@ class SocialMediaService:
     async def get_categories(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all categories with post counts."""
         try:
-            query_parts = ["SELECT categories FROM posts WHERE categories IS NOT NULL"]
-            params = []
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                params.append(date_to) 
+            source, params = post_rollup_source("post_category_daily", date_from, date_to)
+            query_parts = [f"SELECT category, SUM(post_count) AS post_count FROM {source}"]
+            query_parts.append("GROUP BY category HAVING SUM(post_count) > 0 ORDER BY post_count DESC")
             query = " ".join(query_parts)
-            result = await social_media_db.execute_query(query, tuple(params), fetch=True)
-            category_counts = {}
-            for row in result:
-                if row.get("categories"):
-                    try:
-                        categories = json.loads(row["categories"])
-                        for category in categories:
-                            if category in category_counts:
-                                category_counts[category] += 1
-                            else:
-                                category_counts[category] = 1
-                    except json.JSONDecodeError:
-                        pass
-            return [{"category": category, "post_count": count} for category, count in sorted(category_counts.items(), key=lambda x: x[1], reverse=True)]
+            return await social_media_db.execute_query(query, tuple(params), fetch=True)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -234,31 +216,25 @@ class SocialMediaService:
     ) -> List[Dict[str, Any]]:
         """Get users with their sentiment breakdown."""
         try:
+            source, params = post_rollup_source("post_user_daily", date_from, date_to)
             query_parts = [
-                """
+                f"""
                 SELECT 
                     user_handle, 
-                    user_display_name,
-                    COUNT(*) as total_posts,
-                    SUM(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END) as positive_count,
-                    SUM(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END) as negative_count,
-                    SUM(CASE WHEN sentiment = 'neutral' THEN 1 ELSE 0 END) as neutral_count,
-                    SUM(CASE WHEN sentiment = 'critical' THEN 1 ELSE 0 END) as critical_count
-                FROM posts
-                WHERE user_handle IS NOT NULL
+                    NULLIF(user_display_name, '') as user_display_name,
+                    SUM(post_count) as total_posts,
+                    SUM(CASE WHEN sentiment = 'positive' THEN post_count ELSE 0 END) as positive_count,
+                    SUM(CASE WHEN sentiment = 'negative' THEN post_count ELSE 0 END) as negative_count,
+                    SUM(CASE WHEN sentiment = 'neutral' THEN post_count ELSE 0 END) as neutral_count,
+                    SUM(CASE WHEN sentiment = 'critical' THEN post_count ELSE 0 END) as critical_count
+                FROM {source}
+                WHERE user_handle != ''
                 """
             ]
-            params = []
             if platform:
                 query_parts.append("AND platform = ?")
                 params.append(platform)
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                params.append(date_to)
-            query_parts.extend(["GROUP BY user_handle, user_display_name", "ORDER BY total_posts DESC", "LIMIT ?"])
+            query_parts.extend(["GROUP BY user_handle, user_display_name", "HAVING SUM(post_count) > 0", "ORDER BY total_posts DESC", "LIMIT ?"])
             params.append(limit)
             query = " ".join(query_parts)
             result = await social_media_db.execute_query(query, tuple(params), fetch=True)
@@ -277,30 +253,17 @@ class SocialMediaService:
     async def get_category_sentiment(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get sentiment distribution by category."""
         try:
-            date_filter = ""
-            params = []
-            if date_from or date_to:
-                date_filter = "WHERE "
-                if date_from:
-                    date_filter += "datetime(p.post_timestamp) >= datetime(?)"
-                    params.append(date_from)
-                    if date_to:
-                        date_filter += " AND "
-                if date_to:
-                    date_filter += "datetime(p.post_timestamp) <= datetime(?)"
-                    params.append(date_to)
+            source, params = post_rollup_source("post_category_daily", date_from, date_to)
             query = f"""
             WITH category_data AS (
                 SELECT 
-                    json_each.value as category,
+                    category,
                     sentiment,
-                    COUNT(*) as count
+                    SUM(post_count) as count
                 FROM 
-                    posts p,
-                    json_each(p.categories)
-                {date_filter}
+                    {source}
                 GROUP BY 
-                    json_each.value, sentiment
+                    category, sentiment
             )
             SELECT 
                 category,
@@ -313,6 +276,8 @@ class SocialMediaService:
                 category_data
             GROUP BY 
                 category
+            HAVING 
+                total_count > 0
             ORDER BY 
                 total_count DESC
             """
@@ -337,30 +302,22 @@ class SocialMediaService:
     ) -> List[Dict[str, Any]]:
         """Get trending topics with sentiment breakdown."""
         try:
+            source, params = post_rollup_source("post_tag_daily", date_from, date_to)
             query_parts = [
-                """
+                f"""
                 WITH topic_data AS (
                     SELECT 
-                        json_each.value as topic,
+                        tag as topic,
                         sentiment,
-                        COUNT(*) as count
+                        SUM(post_count) as count
                     FROM 
-                        posts,
-                        json_each(posts.tags)
-                    WHERE tags IS NOT NULL
+                        {source}
                 """
             ]
-            params = []
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                params.append(date_to)  
             query_parts.append(
                 """
                 GROUP BY 
-                    json_each.value, sentiment
+                    tag, sentiment
                 )
                 SELECT 
                     topic,
@@ -373,6 +330,8 @@ class SocialMediaService:
                     topic_data
                 GROUP BY 
                     topic
+                HAVING 
+                    total_count > 0
                 ORDER BY 
                     total_count DESC
                 LIMIT ?
@@ -429,25 +388,36 @@ class SocialMediaService:
                 f"""
                 WITH dates AS (
                     {date_range_query}
+                ),
+                daily AS (
+                    SELECT date(bucket_ts, 'unixepoch') as post_date, sentiment, SUM(post_count) as post_count
+                    FROM post_sentiment_hourly
+                    WHERE bucket_ts >= CAST(strftime('%s', (SELECT MIN(post_date) FROM dates)) AS INTEGER)
+                      AND bucket_ts < CAST(strftime('%s', (SELECT MAX(post_date) FROM dates), '+1 day') AS INTEGER)
+                """
+            ]
+            params = []
+            if platform:
+                query_parts.append("AND platform = ?")
+                params.append(platform)
+            query_parts.append(
+                """
+                    GROUP BY 1, 2
                 )
                 SELECT 
                     dates.post_date,
-                    COALESCE(SUM(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END), 0) as positive_count,
-                    COALESCE(SUM(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END), 0) as negative_count,
-                    COALESCE(SUM(CASE WHEN sentiment = 'neutral' THEN 1 ELSE 0 END), 0) as neutral_count,
-                    COALESCE(SUM(CASE WHEN sentiment = 'critical' THEN 1 ELSE 0 END), 0) as critical_count,
-                    COUNT(posts.post_id) as total_count
+                    COALESCE(SUM(CASE WHEN sentiment = 'positive' THEN post_count ELSE 0 END), 0) as positive_count,
+                    COALESCE(SUM(CASE WHEN sentiment = 'negative' THEN post_count ELSE 0 END), 0) as negative_count,
+                    COALESCE(SUM(CASE WHEN sentiment = 'neutral' THEN post_count ELSE 0 END), 0) as neutral_count,
+                    COALESCE(SUM(CASE WHEN sentiment = 'critical' THEN post_count ELSE 0 END), 0) as critical_count,
+                    COALESCE(SUM(post_count), 0) as total_count
                 FROM 
                     dates
                 LEFT JOIN 
-                    posts ON date(posts.post_timestamp) = dates.post_date
+                    daily ON daily.post_date = dates.post_date
+                GROUP BY dates.post_date ORDER BY dates.post_date
                 """
-            ]
-            params = []
-            if platform:
-                query_parts.append("AND posts.platform = ?")
-                params.append(platform)
-            query_parts.append("GROUP BY dates.post_date ORDER BY dates.post_date")
+            )
             query = " ".join(query_parts)
             result = await social_media_db.execute_query(query, tuple(params), fetch=True)
             for day in result:
@@ -486,12 +456,7 @@ class SocialMediaService:
             if sentiment:
                 query_parts.append("AND sentiment = ?")
                 params.append(sentiment)  
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                params.append(date_to)
+            apply_epoch_range(query_parts, params, "post_ts", date_from, date_to)
             query_parts.extend(["ORDER BY total_engagement DESC", "LIMIT ?"])
             params.append(limit)
             query = " ".join(query_parts)
@@ -555,12 +520,7 @@ class SocialMediaService:
                 """
             ]
             params = []
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                params.append(date_to)
+            apply_epoch_range(query_parts, params, "post_ts", date_from, date_to)
             query = " ".join(query_parts)
             result = await social_media_db.execute_query(query, tuple(params), fetch=True, fetch_one=True)
             if not result:
@@ -578,10 +538,8 @@ class SocialMediaService:
                 WHERE 1=1
                 """
             ]
-            if date_from:
-                platform_query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-            if date_to:
-                platform_query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
+            platform_params = []
+            apply_epoch_range(platform_query_parts, platform_params, "post_ts", date_from, date_to)
             platform_query_parts.extend([
                 "GROUP BY platform",
                 "ORDER BY post_count DESC",
@@ -589,7 +547,7 @@ class SocialMediaService:
             ])
             platforms = await social_media_db.execute_query(
                 " ".join(platform_query_parts), 
-                tuple(params), 
+                tuple(platform_params), 
                 fetch=True
             )
             result_dict["platforms"] = platforms
@@ -2,18 +2,29 @@ from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
 from datetime import datetime
 from services.db_service import sources_db, tracking_db
+from services.pagination import Keyset, count_cache
+from db.loaders import attach, load_source_categories, load_source_last_crawled
 from models.source_schemas import SourceCreate, SourceUpdate, SourceFeedCreate, PaginatedSources
 
 
+SOURCE_KEYSET = Keyset(["s.name", "s.id"], descending=False)
+
+
 class SourceService:
     """Service for managing source operations with the new database structure."""
 
     async def get_sources(
-        self, page: int = 1, per_page: int = 10, category: Optional[str] = None, search: Optional[str] = None, include_inactive: bool = False
+        self,
+        page: int = 1,
+        per_page: int = 10,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        include_inactive: bool = False,
+        cursor: Optional[str] = None,
     ) -> PaginatedSources:
-        """Get sources with pagination and filtering."""
+        """Get sources with pagination and filtering; a cursor switches from page offsets to keyset pagination."""
         try:
-            query_parts = ["SELECT s.id, s.name, s.url, s.description, s.is_active, s.created_at", "FROM sources s", "WHERE 1=1"]
+            query_parts = [f"SELECT s.id, s.name, s.url, s.description, s.is_active, s.created_at, {SOURCE_KEYSET.select_sql()}", "FROM sources s", "WHERE 1=1"]
             query_params = []
             if not include_inactive:
                 query_parts.append("AND s.is_active = 1")
@@ -30,26 +41,31 @@ class SourceService:
                 query_parts.append("AND (s.name LIKE ? OR s.description LIKE ?)")
                 search_param = f"%{search}%"
                 query_params.extend([search_param, search_param])
-            count_query = " ".join(query_parts).replace("SELECT s.id, s.name, s.url, s.description, s.is_active, s.created_at", "SELECT COUNT(*)")
-            total_sources = await sources_db.execute_query(count_query, tuple(query_params), fetch=True, fetch_one=True)
-            total_count = total_sources.get("COUNT(*)", 0) if total_sources else 0
-            query_parts.append("ORDER BY s.name")
+            total_count = await count_cache.count(sources_db, " ".join(query_parts[1:]), query_params, id_column="s.id")
             offset = (page - 1) * per_page
+            if cursor:
+                keyset_condition, keyset_params = SOURCE_KEYSET.after_sql(cursor)
+                query_parts.append(f"AND {keyset_condition}")
+                query_params.extend(keyset_params)
+                offset = 0
+            query_parts.append(SOURCE_KEYSET.order_sql())
             query_parts.append("LIMIT ? OFFSET ?")
-            query_params.extend([per_page, offset])
+            query_params.extend([per_page + 1, offset])
             final_query = " ".join(query_parts)
-            sources = await sources_db.execute_query(final_query, tuple(query_params), fetch=True)
-            for source in sources:
-                source["categories"] = await self.get_source_categories(source["id"])
-                source["last_crawled"] = await self.get_source_last_crawled(source["id"])
-                source["website"] = source["url"]
-                if source["categories"] and isinstance(source["categories"], list):
-                    source["category"] = source["categories"][0] if source["categories"] else ""
+            sources, next_cursor = SOURCE_KEYSET.paginate(await sources_db.execute_query(final_query, tuple(query_params), fetch=True), per_page)
+            await self.attach_related(sources)
             total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
-            has_next = page < total_pages
-            has_prev = page > 1
+            has_next = next_cursor is not None
+            has_prev = page > 1 or bool(cursor)
             return PaginatedSources(
-                items=sources, total=total_count, page=page, per_page=per_page, total_pages=total_pages, has_next=has_next, has_prev=has_prev
+                items=sources,
+                total=total_count,
+                page=page,
+                per_page=per_page,
+                total_pages=total_pages,
+                has_next=has_next,
+                has_prev=has_prev,
+                next_cursor=next_cursor,
             )
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -75,25 +91,27 @@ class SourceService:
 
     async def get_source_categories(self, source_id: int) -> List[str]:
         """Get all categories for a specific source."""
-        query = """
-        SELECT c.name
-        FROM source_categories sc
-        JOIN categories c ON sc.category_id = c.id
-        WHERE sc.source_id = ?
-        ORDER BY c.name
-        """
-        categories = await sources_db.execute_query(query, (source_id,), fetch=True)
-        return [category.get("name", "") for category in categories if category.get("name")]
+        categories = await sources_db.run_read(load_source_categories, [source_id])
+        return categories.get(source_id, [])
 
     async def get_source_last_crawled(self, source_id: int) -> Optional[str]:
         """Get the last crawl time for a source's feeds."""
-        query = """
-        SELECT MAX(ft.last_processed) as last_crawled
-        FROM feed_tracking ft
-        WHERE ft.source_id = ?
-        """
-        result = await tracking_db.execute_query(query, (source_id,), fetch=True, fetch_one=True)
-        return result.get("last_crawled") if result else None
+        last_crawled = await tracking_db.run_read(load_source_last_crawled, [source_id])
+        return last_crawled.get(source_id)
+
+    async def attach_related(self, sources: List[Dict[str, Any]], include_last_crawled: bool = True) -> List[Dict[str, Any]]:
+        """Attach categories (and last crawl times) to a list of sources with one query per relation."""
+        source_ids = [source["id"] for source in sources]
+        if not source_ids:
+            return sources
+        attach(sources, "id", "categories", await sources_db.run_read(load_source_categories, source_ids), default=list)
+        if include_last_crawled:
+            attach(sources, "id", "last_crawled", await tracking_db.run_read(load_source_last_crawled, source_ids))
+        for source in sources:
+            source["website"] = source["url"]
+            if source["categories"] and isinstance(source["categories"], list):
+                source["category"] = source["categories"][0] if source["categories"] else ""
+        return sources
 
     async def get_source_by_name(self, name: str) -> Dict[str, Any]:
         """Get a specific source by name."""
@@ -148,12 +166,7 @@ class SourceService:
         ORDER BY s.name
         """
         sources = await sources_db.execute_query(query, (category_name,), fetch=True)
-        for source in sources:
-            source["categories"] = await self.get_source_categories(source["id"])
-            source["website"] = source["url"]
-            if source["categories"] and isinstance(source["categories"], list):
-                source["category"] = source["categories"][0] if source["categories"] else ""
-        return sources
+        return await self.attach_related(sources, include_last_crawled=False)
 
     async def create_source(self, source_data: SourceCreate) -> Dict[str, Any]:
         """Create a new source."""
@@ -2,6 +2,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from fastapi import HTTPException
 from services.db_service import tasks_db
+from db.rollups import TASK_EXECUTION_STATS_SQL
 from models.tasks_schemas import TASK_TYPES
 
 
@@ -292,19 +293,7 @@ class TaskService:
             """
             task_stats = await tasks_db.execute_query(task_query, fetch=True, fetch_one=True)
             cutoff_date = (datetime.now() - timedelta(days=7)).isoformat()
-            exec_query = """
-            SELECT 
-                COUNT(*) as total_executions,
-                COALESCE(SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END), 0) as successful_executions,
-                COALESCE(SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END), 0) as failed_executions,
-                COALESCE(SUM(CASE WHEN status = 'running' THEN 1 ELSE 0 END), 0) as running_executions,
-                COALESCE(AVG(CASE WHEN end_time IS NOT NULL 
-                    THEN (julianday(end_time) - julianday(start_time)) * 86400.0 
-                    ELSE NULL END), 0) as avg_execution_time_seconds
-            FROM task_executions
-            WHERE start_time >= ?
-            """
-            exec_stats = await tasks_db.execute_query(exec_query, (cutoff_date,), fetch=True, fetch_one=True)
+            exec_stats = await tasks_db.execute_query(TASK_EXECUTION_STATS_SQL, (cutoff_date,), fetch=True, fetch_one=True)
             return {"tasks": task_stats or {}, "executions": exec_stats or {}}
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import pytest
+
+DATABASES = ["sources_db", "tracking_db", "podcasts_db", "tasks_db", "internal_sessions_db", "social_media_db"]
+
+
+def use_temp_databases(directory):
+    """
+    Point every application database at `directory`.
+
+    The DatabaseService instances capture their paths on import, so when services.db_service
+    is already loaded they are re-pointed too, and the cached listing totals are dropped.
+    """
+    for db_name in DATABASES:
+        os.environ[f"{db_name.upper()}_PATH"] = os.path.join(directory, f"{db_name}.db")
+    if "services.db_service" not in sys.modules:
+        return
+    from db.config import ATTACH_ALIASES, get_db_path
+    from services import db_service
+    from services.pagination import count_cache
+
+    for service in (db_service.sources_db, db_service.tracking_db, db_service.podcasts_db, db_service.tasks_db, db_service.social_media_db):
+        service.db_path = get_db_path(service.db_name)
+        service.attach = {alias: get_db_path(ATTACH_ALIASES[alias]) for alias in service.attach}
+    count_cache._entries.clear()
+
+
+@pytest.fixture(scope="module")
+def temp_databases(tmp_path_factory):
+    """A fresh, migrated set of application databases for the tests of one module."""
+    from db.migrations import ensure_schema
+
+    directory = str(tmp_path_factory.mktemp("databases"))
+    use_temp_databases(directory)
+    for db_name in DATABASES:
+        ensure_schema(db_name)
+    return directory
+
+
+@pytest.fixture(scope="module")
+def tokyo_timezone():
+    """Run a module's tests on a host ahead of UTC, where naive local "now" values land in the future."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("TZ", "Asia/Tokyo")
+        time.tzset()
+        yield
+    time.tzset()
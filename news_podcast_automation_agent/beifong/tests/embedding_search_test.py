@@ -9,7 +9,7 @@ from utils.load_api_keys import load_api_key
 from db.config import get_faiss_db_path
 
 EMBEDDING_MODEL = "text-embedding-3-small"
-FAISS_INDEX_PATH, FAIS_MAPPING_PATH = get_faiss_db_path()
+FAISS_INDEX_PATH = get_faiss_db_path()
 
 
 def generate_query_embedding(client, query_text, model=EMBEDDING_MODEL):
@@ -27,12 +27,6 @@ def load_faiss_index(index_path=FAISS_INDEX_PATH):
     return faiss.read_index(index_path)
 
 
-def load_id_mapping(mapping_path=FAIS_MAPPING_PATH):
-    if not os.path.exists(mapping_path):
-        raise FileNotFoundError(f"ID mapping not found at {mapping_path}")
-    return np.load(mapping_path).tolist()
-
-
 def get_article_details(tracking_db_path, article_ids):
     if not article_ids:
         return []
@@ -50,7 +44,6 @@ def search_articles(
     tracking_db_path=None,
     openai_api_key=None,
     index_path="databases/faiss/article_index.faiss",
-    mapping_path="databases/faiss/article_id_map.npy",
     top_k=5,
     search_params=None,
 ):
@@ -67,32 +60,32 @@ def search_articles(
     query_vector = np.array([query_embedding]).astype(np.float32)
     try:
         faiss_index = load_faiss_index(index_path)
-        id_map = load_id_mapping(mapping_path)
+        base_index = faiss.downcast_index(faiss_index.index) if isinstance(faiss_index, faiss.IndexIDMap) else faiss_index
         if search_params:
-            if isinstance(faiss_index, faiss.IndexIVF) and "nprobe" in search_params:
-                faiss_index.nprobe = search_params["nprobe"]
-                print(f"Set nprobe to {faiss_index.nprobe}")
-            if hasattr(faiss_index, "hnsw") and "ef" in search_params:
-                faiss_index.hnsw.efSearch = search_params["ef"]
-                print(f"Set efSearch to {faiss_index.hnsw.efSearch}")
+            if isinstance(base_index, faiss.IndexIVF) and "nprobe" in search_params:
+                base_index.nprobe = search_params["nprobe"]
+                print(f"Set nprobe to {base_index.nprobe}")
+            if hasattr(base_index, "hnsw") and "ef" in search_params:
+                base_index.hnsw.efSearch = search_params["ef"]
+                print(f"Set efSearch to {base_index.hnsw.efSearch}")
         index_type = "unknown"
-        if isinstance(faiss_index, faiss.IndexFlatL2):
+        if isinstance(base_index, faiss.IndexFlatL2):
             index_type = "flat"
-        elif isinstance(faiss_index, faiss.IndexIVFFlat):
+        elif isinstance(base_index, faiss.IndexIVFFlat):
             index_type = "ivfflat"
-            print(f"Using IVF index with nprobe = {faiss_index.nprobe}")
-        elif isinstance(faiss_index, faiss.IndexIVFPQ):
+            print(f"Using IVF index with nprobe = {base_index.nprobe}")
+        elif isinstance(base_index, faiss.IndexIVFPQ):
             index_type = "ivfpq"
-            print(f"Using IVF-PQ index with nprobe = {faiss_index.nprobe}")
-        elif hasattr(faiss_index, "hnsw"):
+            print(f"Using IVF-PQ index with nprobe = {base_index.nprobe}")
+        elif hasattr(base_index, "hnsw"):
             index_type = "hnsw"
-            print(f"Using HNSW index with efSearch = {faiss_index.hnsw.efSearch}")
-        print(f"Searching {index_type} FAISS index with {len(id_map)} articles...")
-        distances, indices = faiss_index.search(query_vector, top_k)
-        result_article_ids = [id_map[idx] for idx in indices[0] if idx < len(id_map)]
-        results = get_article_details(tracking_db_path, result_article_ids)
-        for i, result in enumerate(results):
-            distance = float(distances[0][i])
+            print(f"Using HNSW index with efSearch = {base_index.hnsw.efSearch}")
+        print(f"Searching {index_type} FAISS index with {faiss_index.ntotal} articles...")
+        distances, article_ids = faiss_index.search(query_vector, top_k)
+        distance_by_article = {int(article_id): float(distances[0][i]) for i, article_id in enumerate(article_ids[0]) if article_id >= 0}
+        results = get_article_details(tracking_db_path, list(distance_by_article.keys()))
+        for result in results:
+            distance = distance_by_article[result["id"]]
             similarity = float(np.exp(-distance))
             result["distance"] = distance
             result["similarity"] = similarity
@@ -157,11 +150,6 @@ def parse_arguments():
         default=FAISS_INDEX_PATH,
         help="Path to the FAISS index file",
     )
-    parser.add_argument(
-        "--mapping_path",
-        default=FAIS_MAPPING_PATH,
-        help="Path to the ID mapping file",
-    )
     return parser.parse_args()
 
 
@@ -182,7 +170,6 @@ if __name__ == "__main__":
             openai_api_key=api_key,
             top_k=args.top_k,
             index_path=args.index_path,
-            mapping_path=args.mapping_path,
             search_params=search_params,
         )
         print_search_results(results)
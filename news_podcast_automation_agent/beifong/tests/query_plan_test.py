@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from tests.conftest import DATABASES, use_temp_databases
+
+SEED_ROWS = 2000
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def seed_databases(rows=SEED_ROWS, seed=7):
+    """Migrate every database and fill it with enough rows that the planner has a choice to make."""
+    from db.config import get_db_path
+    from db.migrations import migrate
+    from db.rollups import rebuild_post_rollups
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    connections = {}
+    for db_name in DATABASES:
+        conn = sqlite3.connect(get_db_path(db_name))
+        migrate(conn, db_name)
+        connections[db_name] = conn
+    sources = connections["sources_db"]
+    for i in range(1, 51):
+        sources.execute("INSERT INTO sources (id, name, url, is_active) VALUES (?, ?, ?, ?)", (i, f"source {i}", f"https://s{i}.example", int(i % 7 != 0)))
+        sources.execute("INSERT INTO source_feeds (id, source_id, feed_url) VALUES (?, ?, ?)", (i, i, f"https://s{i}.example/rss"))
+    for i, name in enumerate(["tech", "science", "world", "business"], 1):
+        sources.execute("INSERT INTO categories (id, name) VALUES (?, ?)", (i, name))
+        sources.executemany("INSERT INTO source_categories (source_id, category_id) VALUES (?, ?)", [(s, i) for s in range(i, 51, 4)])
+    tracking = connections["tracking_db"]
+    for i in range(1, rows + 1):
+        published = (now - timedelta(hours=rng.randint(0, 24 * 60))).isoformat()
+        feed_id = rng.randint(1, 50)
+        tracking.execute(
+            "INSERT INTO feed_entries (id, feed_id, source_id, entry_id, title, link, published_date, crawl_status) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (i, feed_id, feed_id, f"e{i}", f"entry {i}", f"https://e.example/{i}", published, rng.choice(["pending", "success", "failed"])),
+        )
+        tracking.execute(
+            """
+            INSERT INTO crawled_articles (id, entry_id, source_id, feed_id, title, url, published_date, raw_content, summary, processed, ai_status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (i, i, feed_id, feed_id, f"article {i}", f"https://a.example/{i}", published, "raw", "summary", int(i % 5 != 0), "success" if i % 5 else "pending"),
+        )
+        tracking.execute("INSERT INTO article_categories (article_id, category_name) VALUES (?, ?)", (i, rng.choice(["tech", "science", "world"])))
+    tracking.executemany("INSERT INTO feed_tracking (feed_id, source_id, feed_url, last_processed) VALUES (?, ?, ?, ?)", [(i, i, f"https://s{i}.example/rss", now.isoformat()) for i in range(1, 51)])
+    podcasts = connections["podcasts_db"]
+    podcasts.executemany(
+        "INSERT INTO podcasts (title, date, content_json, sources_json, banner_images) VALUES (?, ?, '{}', '[]', '[]')",
+        [(f"podcast {i}", (now - timedelta(days=i)).date().isoformat()) for i in range(rows // 10)],
+    )
+    tasks = connections["tasks_db"]
+    tasks.executemany(
+        "INSERT INTO tasks (name, command, frequency, frequency_unit, enabled, last_run) VALUES (?, 'true', ?, 'hours', ?, ?)",
+        [(f"task {i}", rng.randint(1, 24), int(i % 3 != 0), (now - timedelta(hours=rng.randint(0, 48))).isoformat()) for i in range(200)],
+    )
+    social = connections["social_media_db"]
+    for i in range(rows):
+        posted = (now - timedelta(hours=rng.randint(0, 24 * 30))).isoformat()
+        social.execute(
+            """
+            INSERT INTO posts (post_id, platform, user_handle, user_display_name, post_timestamp, post_text, sentiment, categories, engagement_like_count, post_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                f"p{i}",
+                rng.choice(["x.com", "facebook.com"]),
+                f"user{rng.randint(1, 300)}",
+                "User",
+                posted,
+                f"post {i}",
+                rng.choice(["positive", "negative", "neutral", "critical"]),
+                '["news"]',
+                rng.randint(0, 500),
+                int(datetime.fromisoformat(posted).timestamp()),
+            ),
+        )
+        social.execute("INSERT INTO post_categories (post_id, category) VALUES (?, ?)", (f"p{i}", rng.choice(["news", "sports", "tech"])))
+        social.execute("INSERT INTO post_tags (post_id, tag) VALUES (?, ?)", (f"p{i}", f"topic {rng.randint(1, 40)}"))
+    rebuild_post_rollups(social)
+    social.execute("UPDATE posts SET trending_score = engagement_like_count WHERE engagement_like_count > 0")
+    for conn in connections.values():
+        conn.commit()
+        conn.close()
+
+
+def trace_pool_queries(statements):
+    """Record every statement run on the shared connection pool as (db path, SQL with parameters inlined)."""
+    from db.connection import get_connection_pool
+
+    pool = get_connection_pool()
+    pool.close_all()
+    open_connection = pool._open
+
+    def traced_open(db_path):
+        conn = open_connection(db_path)
+        conn.set_trace_callback(lambda sql: statements.append((db_path, sql)))
+        return conn
+
+    pool._open = traced_open
+
+
+def hot_query_scenarios():
+    """
+    (name, callable, allowed full scans) for the request paths that run on every page view or
+    processor batch. Full scans are only allowed where the query reads the whole table on purpose.
+    """
+    from db.config import get_attach_paths, get_db_path
+    from db.connection import db_connection
+    from db.articles import (
+        get_article_ids_matching_filters,
+        get_article_stats,
+        get_articles_by_category,
+        get_articles_by_date_range,
+        get_articles_with_source_info,
+        get_unprocessed_articles,
+    )
+    from db.feeds import get_feed_stats, get_uncrawled_entries
+    from db.tasks import get_execution_stats, get_pending_tasks, get_recent_task_executions
+    from services.article_service import article_service
+    from services.podcast_service import podcast_service
+    from services.social_media_service import social_media_service
+    from services.source_service import source_service
+    from tools.hybrid_search import keyword_search
+    from tools.social_media_search import social_media_trending_search
+    from utils.get_articles import _execute_search
+
+    tracking = get_db_path("tracking_db")
+    week_ago = (datetime.now() - timedelta(days=7)).isoformat()
+    yesterday = (datetime.now() - timedelta(days=1)).isoformat()
+
+    async def article_pages():
+        first = await article_service.get_articles(per_page=20, date_from=week_ago, category="tech")
+        await article_service.get_articles(per_page=20, cursor=first.next_cursor)
+        await article_service.get_articles(per_page=20, source="source 3")
+        await article_service.get_articles(per_page=20, search='"article 12" summ*')
+        await article_service.get_article(1)
+
+    async def post_pages():
+        first = await social_media_service.get_posts(per_page=20, platform="x.com", date_from=week_ago)
+        await social_media_service.get_posts(per_page=20, cursor=first.next_cursor)
+        await social_media_service.get_posts(per_page=20, category="news", search="post")
+
+    def term_search():
+        with db_connection(tracking, attach=get_attach_paths("sources")) as conn:
+            return _execute_search(conn.cursor(), ["article", "tech"], week_ago, "OR", 20)
+
+    return [
+        ("db.articles.get_unprocessed_articles", lambda: get_unprocessed_articles(tracking, limit=20), set()),
+        ("db.articles.get_articles_by_date_range", lambda: get_articles_by_date_range(tracking, week_ago, yesterday, limit=50), set()),
+        ("db.articles.get_articles_by_category", lambda: get_articles_by_category(tracking, "tech"), set()),
+        ("db.articles.get_articles_with_source_info", lambda: get_articles_with_source_info(tracking), set()),
+        ("db.articles.get_article_ids_matching_filters", lambda: get_article_ids_matching_filters(tracking, from_date=week_ago), set()),
+        ("db.feeds.get_uncrawled_entries", lambda: get_uncrawled_entries(tracking), set()),
+        ("db.articles.get_article_stats", lambda: get_article_stats(tracking), set()),
+        ("db.feeds.get_feed_stats", lambda: get_feed_stats(tracking), set()),
+        ("db.tasks.get_execution_stats", lambda: get_execution_stats(get_db_path("tasks_db")), set()),
+        ("services.article_service.get_categories", article_service.get_categories, set()),
+        ("db.tasks.get_pending_tasks", lambda: get_pending_tasks(get_db_path("tasks_db")), set()),
+        ("db.tasks.get_recent_task_executions", lambda: get_recent_task_executions(get_db_path("tasks_db"), task_id=1), set()),
+        ("services.article_service.get_articles", article_pages, set()),
+        ("tools.hybrid_search.keyword_search", lambda: keyword_search(tracking, "article summary", filters={"from_date": week_ago}), set()),
+        ("utils.get_articles._execute_search", term_search, set()),
+        ("services.social_media_service.get_posts", post_pages, set()),
+        ("services.social_media_service.get_sentiments", lambda: social_media_service.get_sentiments(date_from=week_ago), set()),
+        ("services.social_media_service.get_categories", lambda: social_media_service.get_categories(date_from=week_ago), set()),
+        ("services.social_media_service.get_category_sentiment", lambda: social_media_service.get_category_sentiment(date_from=week_ago), {"category_data"}),
+        ("services.social_media_service.get_trending_topics", lambda: social_media_service.get_trending_topics(date_from=week_ago), {"topic_data"}),
+        ("services.social_media_service.get_user_sentiment", lambda: social_media_service.get_user_sentiment(platform="x.com", date_from=week_ago), set()),
+        ("services.social_media_service.get_sentiment_over_time", lambda: social_media_service.get_sentiment_over_time(), {"date_range", "dates"}),
+        ("services.social_media_service.get_top_users", lambda: social_media_service.get_top_users(date_from=week_ago), set()),
+        ("tools.social_media_search.social_media_trending_search", lambda: social_media_trending_search(None, 10), set()),
+        ("services.podcast_service.get_podcasts", lambda: podcast_service.get_podcasts(per_page=20), set()),
+        ("services.source_service.get_sources", lambda: source_service.get_sources(per_page=20), set()),
+    ]
+
+
+def explain(db_path, sql):
+    from db.config import ATTACH_ALIASES, get_db_path
+    from db.connection import attach_database
+
+    with sqlite3.connect(db_path, uri=True) as conn:
+        for alias, db_name in ATTACH_ALIASES.items():
+            if os.path.abspath(get_db_path(db_name)) != os.path.abspath(db_path):
+                attach_database(conn, alias, get_db_path(db_name))
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+
+
+def check_query_plans(verbose=False):
+    """Run every hot query scenario and return the statements that fell back to a full table scan."""
+    statements = []
+    trace_pool_queries(statements)
+    failures = []
+    for name, scenario, allowed_scans in hot_query_scenarios():
+        statements.clear()
+        result = scenario()
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+        selects = [(db_path, sql) for db_path, sql in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+        if not selects:
+            failures.append((name, "", ["no query was traced"]))
+        for db_path, sql in selects:
+            plan = explain(db_path, sql)
+            scans = [detail for detail in plan if (match := FULL_SCAN.match(detail)) and match.group(1) not in allowed_scans]
+            if scans:
+                failures.append((name, sql, scans))
+            if verbose:
+                print(f"{name}: {' | '.join(plan)}")
+    return failures
+
+
+def test_hot_queries_use_indexes(temp_databases):
+    seed_databases()
+    failures = check_query_plans()
+    assert not failures, "\n".join(f"{name}: {scans} in {' '.join(sql.split())}" for name, sql, scans in failures)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Fail when a hot query regresses to a full table scan")
+    parser.add_argument("--rows", type=int, default=SEED_ROWS, help="Rows seeded into the large tables")
+    parser.add_argument("--verbose", action="store_true", help="Print the plan of every traced query")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    use_temp_databases(tempfile.mkdtemp(prefix="query_plans_"))
+    seed_databases(rows=args.rows)
+    failures = check_query_plans(verbose=args.verbose)
+    for name, sql, scans in failures:
+        print(f"FULL SCAN in {name}: {scans}\n    {' '.join(sql.split())}")
+    print(f"{len(failures)} query plan regressions")
+    sys.exit(1 if failures else 0)
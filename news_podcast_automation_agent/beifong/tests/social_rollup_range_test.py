@@ -0,0 +1,94 @@
+import asyncio
+import random
+import sqlite3
+from datetime import datetime, timezone
+import pytest
+
+DAY = 86400
+BASE_TS = int(datetime(2026, 10, 10, tzinfo=timezone.utc).timestamp())
+# (date_from, date_to): bounds on bucket boundaries, inside buckets, and open-ended
+RANGES = [
+    ("2026-10-11", "2026-10-12"),
+    ("2026-10-11T09:00:00", "2026-10-12T23:00:00"),
+    ("2026-10-11T09:30:00", "2026-10-11T17:15:00"),
+    ("2026-10-12T06:00:00", None),
+    (None, "2026-10-11T12:00:00"),
+]
+
+
+@pytest.fixture(scope="module")
+def social_db(temp_databases):
+    """Add posts spread over a few days to the database the social service reads, with their rollups."""
+    from db.config import get_db_path
+    from db.rollups import add_to_post_rollups
+
+    rng = random.Random(11)
+    db_path = get_db_path("social_media_db")
+    with sqlite3.connect(db_path) as conn:
+        post_ids = []
+        for i in range(400):
+            post_id = f"range_{i}"
+            post_ts = BASE_TS + rng.randint(0, 4 * DAY - 1)
+            conn.execute(
+                "INSERT INTO posts (post_id, platform, user_handle, user_display_name, post_timestamp, post_text, sentiment, post_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    post_id,
+                    rng.choice(["x.com", "facebook.com"]),
+                    f"range_user{rng.randint(1, 12)}",
+                    "Range User",
+                    datetime.fromtimestamp(post_ts, timezone.utc).isoformat(),
+                    f"range post {i}",
+                    rng.choice(["positive", "negative", "neutral", "critical"]),
+                    post_ts,
+                ),
+            )
+            conn.execute("INSERT INTO post_categories (post_id, category) VALUES (?, ?)", (post_id, rng.choice(["range news", "range tech"])))
+            conn.execute("INSERT INTO post_tags (post_id, tag) VALUES (?, ?)", (post_id, f"range topic {rng.randint(1, 5)}"))
+            post_ids.append(post_id)
+        add_to_post_rollups(conn, post_ids)
+    return db_path
+
+
+def raw_counts(db_path, sql, date_from, date_to):
+    from db.timestamps import to_epoch
+
+    span = (to_epoch(date_from) if date_from else 0, to_epoch(date_to) if date_to else 2**62)
+    with sqlite3.connect(db_path) as conn:
+        return dict(conn.execute(sql, span).fetchall())
+
+
+def test_rollup_reads_match_raw_posts_in_range(social_db):
+    from services.social_media_service import social_media_service
+
+    for date_from, date_to in RANGES:
+        users = asyncio.run(social_media_service.get_top_users(limit=10000, date_from=date_from, date_to=date_to))
+        expected = raw_counts(
+            social_db,
+            "SELECT user_handle, COUNT(*) FROM posts WHERE user_handle != '' AND post_ts >= ? AND post_ts < ? GROUP BY user_handle",
+            date_from,
+            date_to,
+        )
+        assert {row["user_handle"]: row["post_count"] for row in users} == expected, ("get_top_users", date_from, date_to)
+
+        sentiments = asyncio.run(social_media_service.get_sentiments(date_from=date_from, date_to=date_to))
+        expected = raw_counts(social_db, "SELECT sentiment, COUNT(*) FROM posts WHERE sentiment != '' AND post_ts >= ? AND post_ts < ? GROUP BY sentiment", date_from, date_to)
+        assert {row["sentiment"]: row["post_count"] for row in sentiments} == expected, ("get_sentiments", date_from, date_to)
+
+        categories = asyncio.run(social_media_service.get_categories(date_from=date_from, date_to=date_to))
+        expected = raw_counts(
+            social_db,
+            "SELECT c.category, COUNT(*) FROM post_categories c JOIN posts p ON p.post_id = c.post_id WHERE p.post_ts >= ? AND p.post_ts < ? GROUP BY c.category",
+            date_from,
+            date_to,
+        )
+        assert {row["category"]: row["post_count"] for row in categories} == expected, ("get_categories", date_from, date_to)
+
+        topics = asyncio.run(social_media_service.get_trending_topics(date_from=date_from, date_to=date_to, limit=10000))
+        expected = raw_counts(
+            social_db,
+            "SELECT t.tag, COUNT(*) FROM post_tags t JOIN posts p ON p.post_id = t.post_id WHERE p.post_ts >= ? AND p.post_ts < ? GROUP BY t.tag",
+            date_from,
+            date_to,
+        )
+        assert {row["topic"]: row["total_count"] for row in topics} == expected, ("get_trending_topics", date_from, date_to)
+
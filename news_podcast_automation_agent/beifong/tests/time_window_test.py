@@ -0,0 +1,54 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+
+WINDOW_HOURS = 6
+TOLERANCE_SECONDS = 60
+
+
+@pytest.fixture(scope="module")
+def tracking_db(temp_databases, tokyo_timezone):
+    """Store the test articles, some without a publish date, while the host is ahead of UTC."""
+    from db.articles import store_crawl_results, store_crawled_article
+    from db.config import get_db_path
+
+    tracking = get_db_path("tracking_db")
+    hour_ago = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    store_crawl_results(
+        tracking,
+        [
+            ({"id": 1, "title": "rocket launch recent", "link": "https://a.example/1", "published_date": hour_ago}, "raw", {}),
+            ({"id": 2, "title": "rocket launch undated", "link": "https://a.example/2"}, "raw", {}),
+            ({"id": 3, "title": "rocket launch old", "link": "https://a.example/3", "published_date": yesterday}, "raw", {}),
+        ],
+    )
+    store_crawled_article(tracking, {"id": 4, "title": "rocket launch single", "link": "https://a.example/4"}, "raw", {})
+    with sqlite3.connect(tracking) as conn:
+        conn.execute("UPDATE crawled_articles SET processed = 1")
+    return tracking
+
+
+def test_build_filters_window_is_relative_to_utc_now(tokyo_timezone):
+    from db.timestamps import to_epoch
+    from tools.hybrid_search import build_filters
+
+    from_ts = to_epoch(build_filters(hours=WINDOW_HOURS)["from_date"])
+    assert abs(from_ts - (time.time() - WINDOW_HOURS * 3600)) < TOLERANCE_SECONDS, f"window starts {from_ts - time.time():+.0f}s from now"
+
+
+def test_undated_articles_are_stamped_with_the_current_instant(tracking_db):
+    with sqlite3.connect(tracking_db) as conn:
+        stamps = dict(conn.execute("SELECT entry_id, published_ts FROM crawled_articles WHERE entry_id IN (2, 4)").fetchall())
+    for entry_id, published_ts in stamps.items():
+        assert abs(published_ts - time.time()) < TOLERANCE_SECONDS, f"entry {entry_id} stamped {published_ts - time.time():+.0f}s from now"
+
+
+def test_recent_window_finds_recent_articles(tracking_db):
+    from tools.hybrid_search import build_filters, keyword_search
+
+    found = keyword_search(tracking_db, "rocket launch", filters=build_filters(hours=WINDOW_HOURS))
+    with sqlite3.connect(tracking_db) as conn:
+        titles = {row[0] for row in conn.execute(f"SELECT title FROM crawled_articles WHERE id IN ({','.join('?' * len(found))})", found)}
+    assert titles == {"rocket launch recent", "rocket launch undated", "rocket launch single"}, titles
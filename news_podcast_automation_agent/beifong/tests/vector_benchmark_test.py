@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import faiss
+from db.connection import db_connection
+from db.vector_store import embedding_rows_to_vectors
+from processors.faiss_indexing_processor import MAX_TRAINING_VECTORS, create_faiss_index
+
+INDEX_TYPES = ["flat", "ivfflat", "ivfpq", "hnsw"]
+CHUNK_SIZE = 50000
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+class SyntheticCorpus:
+    """
+    Clustered, unit-normalized vectors shaped like text embeddings. Every chunk is
+    regenerated from its own seed, so corpora of millions of vectors can be streamed
+    into the index and again through the exact search without being held in memory.
+    """
+
+    def __init__(self, size, dimension, n_clusters=256, noise=1.4, seed=42):
+        self.size = size
+        self.dimension = dimension
+        self.noise = noise
+        self.seed = seed
+        self.centers = normalize(np.random.default_rng(seed).standard_normal((n_clusters, dimension)))
+
+    def _generate(self, count, seed):
+        rng = np.random.default_rng(seed)
+        assignments = rng.integers(0, len(self.centers), size=count)
+        return normalize(self.centers[assignments] + self.noise * rng.standard_normal((count, self.dimension)) / np.sqrt(self.dimension))
+
+    def chunks(self, chunk_size=CHUNK_SIZE):
+        for offset in range(0, self.size, chunk_size):
+            count = min(chunk_size, self.size - offset)
+            yield offset, self._generate(count, self.seed + 1 + offset // chunk_size)
+
+    def sample(self, count, seed):
+        return self._generate(count, seed)
+
+    def queries(self, count):
+        return self._generate(count, self.seed - 1)
+
+
+class RecordedCorpus:
+    """Embeddings recorded from production: a .npy file or the article_embeddings table."""
+
+    def __init__(self, vectors, size=None):
+        self.vectors = vectors if size is None else vectors[:size]
+        self.size = self.vectors.shape[0]
+        self.dimension = self.vectors.shape[1]
+
+    @classmethod
+    def from_npy(cls, path, size=None):
+        return cls(np.load(path, mmap_mode="r"), size)
+
+    @classmethod
+    def from_tracking_db(cls, tracking_db_path, size=None):
+        with db_connection(tracking_db_path) as conn:
+            rows = conn.execute(
+                """
+                SELECT article_id, embedding, vector_offset FROM article_embeddings
+                WHERE id IN (SELECT MAX(id) FROM article_embeddings GROUP BY article_id)
+                ORDER BY id
+                """
+            ).fetchall()
+        _, vectors = embedding_rows_to_vectors(rows)
+        if vectors is None:
+            raise ValueError(f"No embeddings found in {tracking_db_path}")
+        return cls(vectors, size)
+
+    def chunks(self, chunk_size=CHUNK_SIZE):
+        for offset in range(0, self.size, chunk_size):
+            yield offset, np.ascontiguousarray(self.vectors[offset : offset + chunk_size], dtype=np.float32)
+
+    def sample(self, count, seed):
+        rows = np.sort(np.random.default_rng(seed).choice(self.size, size=min(count, self.size), replace=False))
+        return np.ascontiguousarray(self.vectors[rows], dtype=np.float32)
+
+    def queries(self, count):
+        # Perturbed corpus rows stand in for unseen queries on the same topics
+        base = self.sample(count, seed=7)
+        return normalize(base + 0.05 * np.random.default_rng(11).standard_normal(base.shape) / np.sqrt(self.dimension))
+
+
+def exact_ground_truth(corpus, queries, k):
+    heap = faiss.ResultHeap(queries.shape[0], k)
+    for offset, chunk in corpus.chunks():
+        distances, labels = faiss.knn(queries, chunk, min(k, chunk.shape[0]))
+        if labels.shape[1] < k:
+            pad = k - labels.shape[1]
+            distances = np.hstack([distances, np.full((queries.shape[0], pad), np.inf, dtype=np.float32)])
+            labels = np.hstack([labels, np.full((queries.shape[0], pad), -1, dtype=np.int64)])
+        heap.add_result(distances, np.where(labels >= 0, labels + offset, -1))
+    heap.finalize()
+    return heap.I
+
+
+def build_index(corpus, index_type, n_list=None):
+    rss_before = current_rss_bytes()
+    start_time = time.time()
+    training_vectors = None
+    if index_type not in ("flat", "hnsw"):
+        training_vectors = corpus.sample(min(corpus.size, MAX_TRAINING_VECTORS), seed=3)
+    faiss_index, metadata = create_faiss_index(corpus.dimension, index_type, training_vectors, n_list)
+    train_seconds = time.time() - start_time
+    for offset, chunk in corpus.chunks():
+        faiss_index.add_with_ids(chunk, np.arange(offset, offset + chunk.shape[0], dtype=np.int64))
+    build_seconds = time.time() - start_time
+    rss_after = current_rss_bytes()
+    with tempfile.NamedTemporaryFile(suffix=".faiss") as temp_file:
+        faiss.write_index(faiss_index, temp_file.name)
+        index_bytes = os.path.getsize(temp_file.name)
+    return faiss_index, {
+        "built_index_type": metadata["index_type"],
+        "n_list": metadata.get("n_list"),
+        "train_seconds": round(train_seconds, 3),
+        "build_seconds": round(build_seconds, 3),
+        "index_bytes": index_bytes,
+        "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+    }
+
+
+def search_configurations(faiss_index, nprobe_values, ef_search_values):
+    base_index = faiss.downcast_index(faiss_index.index) if isinstance(faiss_index, faiss.IndexIDMap) else faiss_index
+    if isinstance(base_index, faiss.IndexIVF):
+        for nprobe in nprobe_values:
+            if nprobe <= base_index.nlist:
+                base_index.nprobe = nprobe
+                yield {"nprobe": nprobe}
+    elif isinstance(base_index, faiss.IndexHNSW):
+        for ef_search in ef_search_values:
+            base_index.hnsw.efSearch = ef_search
+            yield {"ef_search": ef_search}
+    else:
+        yield {}
+
+
+def measure_search(faiss_index, queries, ground_truth, k):
+    latencies = []
+    found = np.full((queries.shape[0], k), -1, dtype=np.int64)
+    for i in range(queries.shape[0]):
+        start_time = time.perf_counter()
+        _, labels = faiss_index.search(queries[i : i + 1], k)
+        latencies.append(time.perf_counter() - start_time)
+        found[i] = labels[0]
+    start_time = time.perf_counter()
+    faiss_index.search(queries, k)
+    batch_seconds = time.perf_counter() - start_time
+    hits = sum(len(set(found[i][found[i] >= 0]) & set(ground_truth[i][ground_truth[i] >= 0])) for i in range(queries.shape[0]))
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        f"recall_at_{k}": round(hits / (queries.shape[0] * k), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+        "batch_qps": round(queries.shape[0] / batch_seconds, 1) if batch_seconds > 0 else None,
+    }
+
+
+def run_benchmark(corpus, index_types, num_queries, k, n_list=None, nprobe_values=(1, 8, 32, 128), ef_search_values=(16, 64, 256)):
+    queries = corpus.queries(num_queries)
+    print(f"Computing exact ground truth for {num_queries} queries over {corpus.size} vectors...")
+    ground_truth = exact_ground_truth(corpus, queries, k)
+    results = []
+    for index_type in index_types:
+        print(f"\nBuilding {index_type} index over {corpus.size} x {corpus.dimension} vectors...")
+        faiss_index, build_stats = build_index(corpus, index_type, n_list)
+        for search_params in search_configurations(faiss_index, nprobe_values, ef_search_values):
+            result = {"index_type": index_type, "corpus_size": corpus.size, "dimension": corpus.dimension, "k": k, "queries": num_queries}
+            result.update(build_stats)
+            result.update(search_params)
+            result.update(measure_search(faiss_index, queries, ground_truth, k))
+            results.append(result)
+            print(
+                f"  {build_stats['built_index_type']:8s} {json.dumps(search_params):20s} recall@{k}={result[f'recall_at_{k}']:.3f} "
+                f"p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms build={build_stats['build_seconds']:.1f}s "
+                f"size={build_stats['index_bytes'] / 1e6:.1f}MB"
+            )
+        del faiss_index
+    return results
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index types on synthetic or recorded embeddings")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000], help="Corpus sizes to benchmark, e.g. 10000 100000 1000000 5000000")
+    parser.add_argument("--dimension", type=int, default=1536, help="Vector dimension of the synthetic corpus")
+    parser.add_argument("--index_types", choices=INDEX_TYPES, nargs="+", default=INDEX_TYPES, help="Index types to benchmark")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries per configuration")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query for recall@k")
+    parser.add_argument("--n_list", type=int, default=None, help="IVF cluster count (default: chosen from corpus size)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 8, 32, 128], help="nprobe values to sweep for IVF indexes")
+    parser.add_argument("--ef_search", type=int, nargs="+", default=[16, 64, 256], help="efSearch values to sweep for HNSW")
+    parser.add_argument("--corpus_npy", help="Benchmark recorded embeddings from a .npy file instead of synthetic vectors")
+    parser.add_argument("--tracking_db", help="Benchmark recorded embeddings from an article_embeddings table")
+    parser.add_argument("--output", default="vector_benchmark_results.json", help="Where to write the machine-readable results")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    faiss.omp_set_num_threads(os.cpu_count() or 1)
+    all_results = []
+    for size in args.sizes:
+        if args.corpus_npy:
+            corpus = RecordedCorpus.from_npy(args.corpus_npy, size)
+        elif args.tracking_db:
+            corpus = RecordedCorpus.from_tracking_db(args.tracking_db, size)
+        else:
+            corpus = SyntheticCorpus(size, args.dimension)
+        all_results.extend(run_benchmark(corpus, args.index_types, args.queries, args.k, args.n_list, args.nprobe, args.ef_search))
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "faiss_version": faiss.__version__,
+        "machine": {"platform": platform.platform(), "processor": platform.processor(), "cpu_count": os.cpu_count()},
+        "corpus": args.corpus_npy or args.tracking_db or "synthetic",
+        "results": all_results,
+    }
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"\nWrote {len(all_results)} results to {args.output}")
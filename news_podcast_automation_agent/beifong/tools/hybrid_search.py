@@ -0,0 +1,171 @@
+import json
+import re
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from agno.agent import Agent
+from db.config import get_tracking_db_path
+from db.connection import db_connection
+from db.articles import build_article_filter_clause, filter_article_ids, get_article_ids_matching_filters
+from db.fts import ARTICLE_BM25_SQL, build_match_query
+from db.faiss_index import get_article_vector_index
+from tools.embedding_search import generate_query_embedding, get_article_details
+
+RRF_K = 60
+CANDIDATES_PER_RETRIEVER = 50
+MAX_FILTER_IDS = 20000
+BROAD_FILTER_OVERFETCH = 4
+DEFAULT_TOP_K = 10
+DEFAULT_TOKEN_BUDGET = 3000
+DESCRIPTION_CHARS = 600
+STOPWORDS = {"the", "and", "for", "with", "about", "from", "that", "this", "what", "news", "latest", "are", "was", "how", "why"}
+
+
+def extract_query_terms(query):
+    terms = [term for term in re.findall(r"\w+", query.lower()) if len(term) > 2 and term not in STOPWORDS]
+    return list(dict.fromkeys(terms))[:8]
+
+
+def keyword_search(tracking_db_path, query, limit=CANDIDATES_PER_RETRIEVER, filters=None):
+    match_query = build_match_query(extract_query_terms(query), operator="OR")
+    if not match_query:
+        return []
+    filter_clause, filter_params = build_article_filter_clause(**(filters or {}))
+    query_sql = f"""
+    SELECT ca.id
+    FROM articles_fts
+    JOIN crawled_articles ca ON ca.id = articles_fts.rowid
+    WHERE articles_fts MATCH ? AND ca.processed = 1 {f"AND {filter_clause}" if filter_clause else ""}
+    ORDER BY {ARTICLE_BM25_SQL}, ca.published_ts DESC
+    LIMIT ?
+    """
+    with db_connection(tracking_db_path) as conn:
+        rows = conn.execute(query_sql, [match_query] + filter_params + [limit]).fetchall()
+    return [row["id"] for row in rows]
+
+
+def vector_search(query, limit=CANDIDATES_PER_RETRIEVER, tracking_db_path=None, filters=None):
+    index_holder = get_article_vector_index()
+    _, error = index_holder.get()
+    if error:
+        return []
+    query_embedding, error = generate_query_embedding(query)
+    if query_embedding is None:
+        print(f"Vector leg of hybrid search skipped: {error}")
+        return []
+    query_vector = np.array([query_embedding]).astype(np.float32)
+    allowed_ids = None
+    if filters:
+        allowed_ids = get_article_ids_matching_filters(tracking_db_path, **filters, limit=MAX_FILTER_IDS + 1)
+        if len(allowed_ids) > MAX_FILTER_IDS:
+            # A broad filter rejects few neighbours, so over-fetch unfiltered and check the candidates instead of listing every match
+            allowed_ids = None
+    post_filter = bool(filters) and allowed_ids is None
+    filters = filters or {}
+    _, article_ids, error = index_holder.search(
+        query_vector,
+        limit * BROAD_FILTER_OVERFETCH if post_filter else limit,
+        allowed_ids=allowed_ids,
+        tracking_db_path=tracking_db_path,
+        from_date=filters.get("from_date"),
+        to_date=filters.get("to_date"),
+    )
+    if error:
+        return []
+    found = [int(article_id) for article_id in dict.fromkeys(article_ids[0]) if article_id >= 0]
+    if post_filter:
+        found = filter_article_ids(tracking_db_path, found, **filters)[:limit]
+    return found
+
+
+def reciprocal_rank_fusion(ranked_lists, k=RRF_K):
+    scores = {}
+    matched_by = {}
+    for name, ranked_ids in ranked_lists.items():
+        for rank, article_id in enumerate(ranked_ids):
+            scores[article_id] = scores.get(article_id, 0.0) + 1.0 / (k + rank + 1)
+            matched_by.setdefault(article_id, []).append(name)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [(article_id, score, matched_by[article_id]) for article_id, score in fused]
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def build_filters(hours=None, from_date=None, to_date=None, source_ids=None, categories=None):
+    if hours and not from_date:
+        from_date = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+    filters = {"from_date": from_date, "to_date": to_date, "source_ids": source_ids, "categories": categories}
+    filters = {key: value for key, value in filters.items() if value}
+    return filters or None
+
+
+def hybrid_retrieve(query, top_k=DEFAULT_TOP_K, token_budget=DEFAULT_TOKEN_BUDGET, tracking_db_path=None, filters=None):
+    if tracking_db_path is None:
+        tracking_db_path = get_tracking_db_path()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        keyword_future = executor.submit(keyword_search, tracking_db_path, query, CANDIDATES_PER_RETRIEVER, filters)
+        vector_future = executor.submit(vector_search, query, CANDIDATES_PER_RETRIEVER, tracking_db_path, filters)
+        ranked_lists = {"keyword": keyword_future.result(), "semantic": vector_future.result()}
+    fused = reciprocal_rank_fusion(ranked_lists)[:top_k]
+    if not fused:
+        return []
+    details = {row["id"]: row for row in get_article_details(tracking_db_path, [article_id for article_id, _, _ in fused])}
+    results = []
+    used_tokens = 0
+    for article_id, score, matched_by in fused:
+        row = details.get(article_id)
+        if not row:
+            continue
+        source_id = str(row.get("source_id", "unknown"))
+        description = row.get("summary") or row.get("content") or ""
+        result = {
+            "id": article_id,
+            "title": row.get("title", "Untitled"),
+            "url": row.get("url", "#"),
+            "published_date": row.get("published_date"),
+            "description": description[:DESCRIPTION_CHARS],
+            "source_id": source_id,
+            "source_name": row.get("source_name") or source_id,
+            "score": round(score, 5),
+            "matched_by": matched_by,
+            "categories": ["internal"],
+            "is_scrapping_required": False,
+        }
+        result_tokens = estimate_tokens(json.dumps(result))
+        if results and used_tokens + result_tokens > token_budget:
+            break
+        results.append(result)
+        used_tokens += result_tokens
+    return results
+
+
+def hybrid_search(agent: Agent, query: str, hours: Optional[int] = None, categories: Optional[List[str]] = None) -> str:
+    """
+    Search the internal articles database (crawled from the user's preselected RSS feeds) with one call.
+    Runs keyword and semantic (embedding) retrieval together and fuses them into a single ranked,
+    deduplicated list, so there is no need to call separate keyword and semantic search tools.
+
+    Args:
+        agent: The Agno agent instance
+        query: The search topic or query
+        hours: Only return articles published within this many hours (optional, defaults to the session's time_range_hours)
+        categories: Only return articles tagged with one of these categories (optional)
+
+    Returns:
+        Search results
+    """
+    if hours is None:
+        hours = (agent.session_state or {}).get("time_range_hours")
+    print("Hybrid Search Input:", query, f"(hours={hours}, categories={categories})")
+    try:
+        results = hybrid_retrieve(query, filters=build_filters(hours=hours, categories=categories))
+        if not results:
+            return "No relevant articles found in our internal database. Continuing with other search methods."
+        return f"Found {len(results)}, results: {json.dumps(results, indent=2)}"
+    except Exception as e:
+        traceback.print_exc()
+        return f"Error in internal article search: {str(e)}. Continuing with other search methods."
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 import uuid
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
@@ -9,7 +9,7 @@ from textwrap import dedent
 from tools.wikipedia_search import wikipedia_search
 from tools.google_news_discovery import google_news_discovery_run
 from tools.jikan_search import jikan_search
-from tools.embedding_search import embedding_search
+from tools.hybrid_search import hybrid_search
 from tools.social_media_search import social_media_search, social_media_trending_search
 
 
@@ -60,7 +60,7 @@ SEARCH_AGENT_INSTRUCTIONS = dedent("""
     """)
 
 
-def search_agent_run(query: str) -> str:
+def search_agent_run(query: str, time_range_hours: Optional[int] = None) -> str:
     try:
         session_id = str(uuid.uuid4())
         search_agent = Agent(
@@ -74,10 +74,11 @@ def search_agent_run(query: str) -> str:
                 DuckDuckGoTools(),
                 wikipedia_search,
                 jikan_search,
-                embedding_search,
+                hybrid_search,
                 social_media_search,
                 social_media_trending_search,
             ],
+            session_state={"time_range_hours": time_range_hours},
             session_id=session_id,
         )
         response = search_agent.run(query, session_id=session_id)
@@ -2,13 +2,17 @@ import sqlite3
 from typing import List, Union
 from agno.agent import Agent
 from db.config import get_tracking_db_path
+from db.fts import ARTICLE_BM25_SQL, ARTICLE_SNIPPET_SQL, build_match_query
+from db.loaders import load_article_categories
 import json
 
 
 def search_articles(agent: Agent, terms: Union[str, List[str]]) -> str:
     """
-    Search for articles related to a podcast topic using direct SQL queries.
-    The agent can pass either a string topic or a list of search terms.
+    Search for articles related to a podcast topic using the full-text article index.
+    The agent can pass either a string topic or a list of search terms. Each term is matched
+    as a phrase in the title, summary or content; end a term with * to match word prefixes.
+    Results are ranked by relevance and include a snippet around the match.
 
     Args:
         agent: The agent instance
@@ -27,8 +31,9 @@ def search_articles(agent: Agent, terms: Union[str, List[str]]) -> str:
             results = execute_simple_search(conn, search_terms, limit)
             if not results:
                 return "No relevant articles found in our database. Would you like to try a different topic or provide specific URLs?"
+            categories = get_categories_for_articles(conn, [article["id"] for article in results])
             for article in results:
-                article["categories"] = get_article_categories(conn, article["id"])
+                article["categories"] = categories.get(article["id"], [])
                 article["source_name"] = article.get("source_id", "Unknown Source")
             return f"is_scrapping_required: False, Found {len(results)}, {json.dumps(results, indent=2)} potential sources that might be relevant to your topic careful my search is text bassed do quality check and ignore invalid resutls."
     except Exception as e:
@@ -37,31 +42,27 @@ def search_articles(agent: Agent, terms: Union[str, List[str]]) -> str:
 
 
 def execute_simple_search(conn, terms, limit):
-    base_query = """
-        SELECT DISTINCT ca.id, ca.title, ca.url, ca.published_date, 
+    match_query = build_match_query(terms, operator="OR")
+    if not match_query:
+        return []
+    query = f"""
+        SELECT ca.id, ca.title, ca.url, ca.published_date,
                COALESCE(ca.summary, ca.content) as content,
+               {ARTICLE_SNIPPET_SQL} as snippet,
                ca.source_id, ca.feed_id
-        FROM crawled_articles ca
-        WHERE ca.processed = 1 
-          AND (
+        FROM articles_fts
+        JOIN crawled_articles ca ON ca.id = articles_fts.rowid
+        WHERE articles_fts MATCH ? AND ca.processed = 1
+        ORDER BY {ARTICLE_BM25_SQL}, ca.published_ts DESC
+        LIMIT ?
     """
-    clauses = []
-    params = []
-    for term in terms:
-        like_term = f"%{term}%"
-        clauses.append("(ca.title LIKE ? OR ca.content LIKE ? OR ca.summary LIKE ?)")
-        params.extend([like_term, like_term, like_term])
-
-    query = base_query + " OR ".join(clauses) + ") ORDER BY ca.published_date DESC LIMIT ?"
-    params.append(limit)
-    cursor = conn.execute(query, params)
+    cursor = conn.execute(query, [match_query, limit])
     return [dict(row) for row in cursor.fetchall()]
 
 
-def get_article_categories(conn, article_id):
+def get_categories_for_articles(conn, article_ids):
     try:
-        cursor = conn.execute("SELECT category_name FROM article_categories WHERE article_id = ?", (article_id,))
-        return [row["category_name"] for row in cursor.fetchall()]
+        return load_article_categories(conn, article_ids)
     except Exception as e:
         print(f"Error fetching article categories: {e}")
-        return []
\ No newline at end of file
+        return {}
\ No newline at end of file
@@ -1,8 +1,8 @@
 from agno.agent import Agent
 from datetime import datetime
 from db.config import get_podcasts_db_path, DB_PATH
+from db.writer import execute_write, run_write
 import os
-import sqlite3
 import json
 
 
@@ -50,7 +50,6 @@ def _save_podcast_to_database_sync(session_state: dict) -> tuple[bool, str, int]
         db_directory = DB_PATH
         os.makedirs(db_directory, exist_ok=True)
 
-        conn = sqlite3.connect(db_path)
         content_json = json.dumps(generated_script)
         sources_json = json.dumps(sources) if sources else None
         current_time = datetime.now().isoformat()
@@ -69,7 +68,9 @@ def _save_podcast_to_database_sync(session_state: dict) -> tuple[bool, str, int]
                 banner_images
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
-        conn.execute(
+        podcast_id = run_write(
+            db_path,
+            execute_write,
             query,
             (
                 generated_script.get("title", "Untitled Podcast"),
@@ -85,13 +86,6 @@ def _save_podcast_to_database_sync(session_state: dict) -> tuple[bool, str, int]
                 banner_images,
             ),
         )
-        conn.commit()
-
-        cursor = conn.execute("SELECT last_insert_rowid()")
-        podcast_id = cursor.fetchone()
-        podcast_id = podcast_id[0] if podcast_id else None
-        cursor.close()
-        conn.close()
 
         session_state["podcast_id"] = podcast_id
         return True, f"Podcast successfully saved with ID: {podcast_id}", podcast_id
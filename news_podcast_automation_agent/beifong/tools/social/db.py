@@ -1,49 +1,33 @@
-import sqlite3
 import json
-
-
-def create_connection(db_file="x_posts.db"):
-    conn = sqlite3.connect(db_file)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def setup_database(conn):
-    create_posts_table = """
-    CREATE TABLE IF NOT EXISTS posts (
-        post_id TEXT PRIMARY KEY,
-        platform TEXT,
-        user_display_name TEXT,
-        user_handle TEXT,
-        user_profile_pic_url TEXT,
-        post_timestamp TEXT,
-        post_display_time TEXT,
-        post_url TEXT,
-        post_text TEXT,
-        post_mentions TEXT,
-        engagement_reply_count INTEGER,
-        engagement_retweet_count INTEGER,
-        engagement_like_count INTEGER,
-        engagement_bookmark_count INTEGER,
-        engagement_view_count INTEGER,
-        media TEXT,  -- Stored as JSON
-        media_count INTEGER,
-        is_ad BOOLEAN,
-        sentiment TEXT,
-        categories TEXT,
-        tags TEXT,
-        analysis_reasoning TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """
-
-    conn.execute(create_posts_table)
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_platform ON posts(platform)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_user_handle ON posts(user_handle)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_post_timestamp ON posts(post_timestamp)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_sentiment ON posts(sentiment)")
-    conn.commit()
+from db.bulk import bulk_upsert
+from db.engagement import ENGAGEMENT_METRICS, load_velocity_state, record_engagement
+from db.rollups import add_to_post_rollups
+from db.timestamps import to_epoch_or_now
+from db.writer import run_write
+
+POST_COLUMNS = [
+    "post_id",
+    "platform",
+    "user_display_name",
+    "user_handle",
+    "user_profile_pic_url",
+    "post_timestamp",
+    "post_display_time",
+    "post_url",
+    "post_text",
+    "post_mentions",
+    *ENGAGEMENT_METRICS,
+    "media",
+    "media_count",
+    "is_ad",
+    "sentiment",
+    "categories",
+    "tags",
+    "analysis_reasoning",
+    "post_ts",
+]
+# JSON list column -> normalized (table, column) kept in step with it for indexed filters and counts
+LABEL_TABLES = {"categories": ("post_categories", "category"), "tags": ("post_tags", "tag")}
 
 
 def parse_engagement_count(count_str):
@@ -70,7 +54,7 @@ def parse_engagement_count(count_str):
 
 def process_post_data(post_data):
     data = post_data.copy()
-    metrics = ["engagement_reply_count", "engagement_retweet_count", "engagement_like_count", "engagement_bookmark_count", "engagement_view_count"]
+    metrics = ENGAGEMENT_METRICS
     for metric in metrics:
         if metric in data:
             data[metric] = parse_engagement_count(data[metric])
@@ -82,44 +66,104 @@ def process_post_data(post_data):
         data["tags"] = json.dumps(data["tags"])
     if "is_ad" in data:
         data["is_ad"] = 1 if data["is_ad"] else 0
+    data["post_ts"] = to_epoch_or_now(data.get("post_timestamp"))
     return data
 
 
+def parse_labels(value):
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return []
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [label.strip() for label in value if isinstance(label, str) and label.strip()]
+
+
+def store_post_labels(conn, posts):
+    """Replace the post_categories and post_tags rows of `posts` (post_id -> data with categories and tags)."""
+    post_ids = list(posts)
+    for field, (table, column) in LABEL_TABLES.items():
+        for i in range(0, len(post_ids), 500):
+            chunk = post_ids[i : i + 500]
+            placeholders = ",".join(["?"] * len(chunk))
+            conn.execute(f"DELETE FROM {table} WHERE post_id IN ({placeholders})", chunk)
+        rows = [(post_id, label) for post_id, data in posts.items() for label in parse_labels(data.get(field))]
+        conn.executemany(f"INSERT OR IGNORE INTO {table} (post_id, {column}) VALUES (?, ?)", rows)
+
+
 def get_post(conn, post_id):
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM posts WHERE post_id = ?", (post_id,))
     return cursor.fetchone()
 
 
-def insert_post(conn, post_data):
+def insert_post(db_path, post_data):
     data = process_post_data(post_data)
     columns = ", ".join(data.keys())
     placeholders = ", ".join(["?"] * len(data))
     values = list(data.values())
     sql = f"INSERT INTO posts ({columns}) VALUES ({placeholders})"
-    conn.execute(sql, values)
-    conn.commit()
 
+    def write(conn):
+        conn.execute(sql, values)
+        record_engagement(conn, {data["post_id"]: data}, {})
+        store_post_labels(conn, {data["post_id"]: data})
+        add_to_post_rollups(conn, [data["post_id"]])
+
+    run_write(db_path, write)
 
-def check_and_store_post(conn, post_data):
+
+def check_and_store_post(db_path, post_data):
     post_id = post_data.get("post_id")
     if not post_id:
         return False
     if post_data.get("is_ad", False):
         return False
-    data = process_post_data(post_data)
-    existing_post = get_post(conn, post_id)
-    if not existing_post:
-        needs_analysis = bool(data.get("post_text"))
-        insert_post(conn, data)
-        return needs_analysis
-    else:
-        update_changed_metrics(conn, existing_post, data)
-        return False
+    return post_id in store_posts_batch(db_path, [post_data])
 
 
-def update_changed_metrics(conn, existing_post, new_data):
-    metrics = ["engagement_reply_count", "engagement_retweet_count", "engagement_like_count", "engagement_bookmark_count", "engagement_view_count"]
+def store_posts_batch(db_path, posts):
+    """
+    Store a batch of scraped posts in one transaction on the database's writer.
+
+    New posts are inserted and existing ones get their engagement metrics refreshed by
+    a single executemany upsert; updated_at only moves when a metric actually changed.
+    Metric changes are appended to engagement_snapshots and move the trending velocity.
+    Ads and posts without an id are skipped.
+
+    Returns:
+        Ids of newly inserted posts that have text to analyze
+    """
+    latest = {}
+    for post_data in posts:
+        if post_data.get("post_id") and not post_data.get("is_ad", False):
+            latest[post_data["post_id"]] = process_post_data(post_data)
+    if not latest:
+        return []
+    rows = [tuple(data.get(column) for column in POST_COLUMNS) for data in latest.values()]
+    changed = " OR ".join(f"(excluded.{metric} IS NOT NULL AND excluded.{metric} IS NOT posts.{metric})" for metric in ENGAGEMENT_METRICS)
+    updates = {metric: f"COALESCE(excluded.{metric}, posts.{metric})" for metric in ENGAGEMENT_METRICS}
+    updates["updated_at"] = "CURRENT_TIMESTAMP"
+
+    def write(conn):
+        previous = load_velocity_state(conn, latest.keys())
+        existing = set(previous)
+        bulk_upsert(conn, "posts", POST_COLUMNS, rows, conflict_columns=["post_id"], update_columns=updates, update_where=changed)
+        record_engagement(conn, latest, previous)
+        new_posts = {post_id: data for post_id, data in latest.items() if post_id not in existing}
+        store_post_labels(conn, new_posts)
+        add_to_post_rollups(conn, new_posts)
+        return [post_id for post_id, data in new_posts.items() if data.get("post_text")]
+
+    return run_write(db_path, write)
+
+
+def update_changed_metrics(db_path, existing_post, new_data):
+    metrics = ENGAGEMENT_METRICS
     changes = {}
     for metric in metrics:
         if metric in new_data and metric in existing_post:
@@ -131,11 +175,16 @@ def update_changed_metrics(conn, existing_post, new_data):
         set_sql += ", updated_at = CURRENT_TIMESTAMP"
         sql = f"UPDATE posts SET {set_sql} WHERE post_id = ?"
         params = list(changes.values()) + [existing_post["post_id"]]
-        conn.execute(sql, params)
-        conn.commit()
+
+        def write(conn):
+            previous = load_velocity_state(conn, [existing_post["post_id"]])
+            conn.execute(sql, params)
+            record_engagement(conn, {existing_post["post_id"]: changes}, previous)
+
+        run_write(db_path, write)
 
 
-def update_posts_with_analysis(conn, post_ids, analysis_results):
+def update_posts_with_analysis(db_path, post_ids, analysis_results):
     if not analysis_results:
         return
     analysis_by_id = {}
@@ -143,19 +192,28 @@ def update_posts_with_analysis(conn, post_ids, analysis_results):
         post_id = analysis.get("post_id")
         if post_id:
             analysis_by_id[post_id] = analysis
-    for post_id in post_ids:
-        if post_id in analysis_by_id:
-            analysis = analysis_by_id[post_id]
-            categories = json.dumps(analysis.get("categories", []))
-            tags = json.dumps(analysis.get("tags", []))
-            conn.execute(
-                """UPDATE posts SET 
-                   sentiment = ?, 
-                   categories = ?, 
-                   tags = ?, 
-                   analysis_reasoning = ?,
-                   updated_at = CURRENT_TIMESTAMP 
-                   WHERE post_id = ?""",
-                (analysis.get("sentiment"), categories, tags, analysis.get("reasoning"), post_id),
-            )
-    conn.commit()
\ No newline at end of file
+    analyzed_ids = list(dict.fromkeys(post_id for post_id in post_ids if post_id in analysis_by_id))
+
+    def write(conn):
+        add_to_post_rollups(conn, analyzed_ids, sign=-1)
+        labels = {}
+        for post_id in post_ids:
+            if post_id in analysis_by_id:
+                analysis = analysis_by_id[post_id]
+                labels[post_id] = analysis
+                categories = json.dumps(analysis.get("categories", []))
+                tags = json.dumps(analysis.get("tags", []))
+                conn.execute(
+                    """UPDATE posts SET 
+                       sentiment = ?, 
+                       categories = ?, 
+                       tags = ?, 
+                       analysis_reasoning = ?,
+                       updated_at = CURRENT_TIMESTAMP 
+                       WHERE post_id = ?""",
+                    (analysis.get("sentiment"), categories, tags, analysis.get("reasoning"), post_id),
+                )
+        store_post_labels(conn, labels)
+        add_to_post_rollups(conn, analyzed_ids)
+
+    run_write(db_path, write)
\ No newline at end of file
@@ -3,7 +3,8 @@ import json
 from tools.social.browser import create_browser_context
 from tools.social.fb_post_extractor import parse_facebook_posts, normalize_facebook_posts_batch
 from tools.social.x_agent import analyze_posts_sentiment
-from tools.social.db import create_connection, setup_database, check_and_store_post, update_posts_with_analysis
+from db.migrations import ensure_schema
+from tools.social.db import store_posts_batch, update_posts_with_analysis
 
 
 def contains_facebook_posts(json_obj):
@@ -26,11 +27,12 @@ def contains_facebook_posts(json_obj):
         return False
 
 
-def process_facebook_graphql_response(response_text, seen_post_ids, analysis_queue, queue_post_ids, conn):
+def process_facebook_graphql_response(response_text, seen_post_ids, analysis_queue, queue_post_ids, db_file):
     posts_processed = 0
     if not response_text:
         return posts_processed
     lines = response_text.split("\n")
+    scraped_posts = []
     for line in lines:
         line = line.strip()
         if not line:
@@ -48,22 +50,25 @@ def process_facebook_graphql_response(response_text, seen_post_ids, analysis_que
                         continue
                     seen_post_ids.add(post_id)
                     posts_processed += 1
-                    needs_analysis = check_and_store_post(conn, post_data)
-                    if needs_analysis and post_data.get("post_text"):
-                        analysis_queue.append(post_data)
-                        queue_post_ids.append(post_id)
+                    scraped_posts.append(post_data)
         except json.JSONDecodeError:
             continue
         except Exception as e:
             print(f"Error processing Facebook post: {e}")
             continue
+    posts_by_id = {post_data["post_id"]: post_data for post_data in scraped_posts}
+    try:
+        for post_id in store_posts_batch(db_file, scraped_posts):
+            analysis_queue.append(posts_by_id[post_id])
+            queue_post_ids.append(post_id)
+    except Exception as e:
+        print(f"Error storing Facebook posts: {e}")
 
     return posts_processed
 
 
 def crawl_facebook_feed(target_url="https://facebook.com", db_file="fb_posts.db"):
-    conn = create_connection(db_file)
-    setup_database(conn)
+    ensure_schema("social_media_db", db_file)
     seen_post_ids = set()
     analysis_queue = []
     queue_post_ids = []
@@ -83,7 +88,7 @@ def crawl_facebook_feed(target_url="https://facebook.com", db_file="fb_posts.db"
                 if 'text/html; charset="utf-8"' not in content_type:
                     return
                 response_text = response.text()
-                posts_found = process_facebook_graphql_response(response_text, seen_post_ids, analysis_queue, queue_post_ids, conn)
+                posts_found = process_facebook_graphql_response(response_text, seen_post_ids, analysis_queue, queue_post_ids, db_file)
                 if posts_found > 0:
                     post_count += posts_found
                 if len(analysis_queue) >= batch_size:
@@ -93,7 +98,7 @@ def crawl_facebook_feed(target_url="https://facebook.com", db_file="fb_posts.db"
                     queue_post_ids = queue_post_ids[batch_size:]
                     try:
                         analysis_results = analyze_posts_sentiment(analysis_batch)
-                        update_posts_with_analysis(conn, batch_post_ids, analysis_results)
+                        update_posts_with_analysis(db_file, batch_post_ids, analysis_results)
                     except Exception:
                         pass
             except Exception:
@@ -119,9 +124,8 @@ def crawl_facebook_feed(target_url="https://facebook.com", db_file="fb_posts.db"
         if analysis_queue:
             try:
                 analysis_results = analyze_posts_sentiment(analysis_queue)
-                update_posts_with_analysis(conn, queue_post_ids, analysis_results)
+                update_posts_with_analysis(db_file, queue_post_ids, analysis_results)
             except Exception:
                 pass
 
-        conn.close()
         return post_count
@@ -2,15 +2,15 @@ import time
 from tools.social.browser import create_browser_context
 from tools.social.x_post_extractor import x_post_extractor
 from tools.social.x_agent import analyze_posts_sentiment
-from tools.social.db import create_connection, setup_database, check_and_store_post, update_posts_with_analysis
+from db.migrations import ensure_schema
+from tools.social.db import store_posts_batch, update_posts_with_analysis
 
 
 def crawl_x_profile(profile_url, db_file="x_posts.db"):
     if not profile_url.startswith("http"):
         profile_url = f"https://x.com/{profile_url}"
 
-    conn = create_connection(db_file)
-    setup_database(conn)
+    ensure_schema("social_media_db", db_file)
     seen_post_ids = set()
     analysis_queue = []
     queue_post_ids = []
@@ -25,6 +25,7 @@ def crawl_x_profile(profile_url, db_file="x_posts.db"):
         try:
             while True:
                 tweet_articles = page.query_selector_all('article[role="article"]')
+                scraped_posts = []
                 for article in tweet_articles:
                     article_id = article.evaluate('(element) => element.getAttribute("id")')
                     if article_id in seen_post_ids:
@@ -47,12 +48,12 @@ def crawl_x_profile(profile_url, db_file="x_posts.db"):
 
                     seen_post_ids.add(post_id)
                     post_count += 1
+                    scraped_posts.append(post_data)
 
-                    needs_analysis = check_and_store_post(conn, post_data)
-
-                    if needs_analysis and post_data.get("post_text"):
-                        analysis_queue.append(post_data)
-                        queue_post_ids.append(post_id)
+                posts_by_id = {post_data["post_id"]: post_data for post_data in scraped_posts}
+                for post_id in store_posts_batch(db_file, scraped_posts):
+                    analysis_queue.append(posts_by_id[post_id])
+                    queue_post_ids.append(post_id)
 
                 if len(analysis_queue) >= batch_size:
                     analysis_batch = analysis_queue[:batch_size]
@@ -64,7 +65,7 @@ def crawl_x_profile(profile_url, db_file="x_posts.db"):
                     try:
                         analysis_results = analyze_posts_sentiment(analysis_batch)
 
-                        update_posts_with_analysis(conn, batch_post_ids, analysis_results)
+                        update_posts_with_analysis(db_file, batch_post_ids, analysis_results)
                     except Exception:
                         pass
 
@@ -79,10 +80,9 @@ def crawl_x_profile(profile_url, db_file="x_posts.db"):
             if analysis_queue:
                 try:
                     analysis_results = analyze_posts_sentiment(analysis_queue)
-                    update_posts_with_analysis(conn, queue_post_ids, analysis_results)
+                    update_posts_with_analysis(db_file, queue_post_ids, analysis_results)
                 except Exception:
                     pass
 
-            conn.close()
             return post_count
         return post_count
\ No newline at end of file
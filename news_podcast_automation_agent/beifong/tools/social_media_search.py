@@ -1,20 +1,13 @@
-import sqlite3
 import json
 from datetime import datetime, timedelta
-from contextlib import contextmanager
 from agno.agent import Agent
 from db.config import get_db_path
+from db.connection import db_connection
+from db.fts import POST_MATCH_SQL, build_match_query
 
 
-@contextmanager
 def get_social_media_db():
-    db_path = get_db_path("social_media_db")
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
+    return db_connection(get_db_path("social_media_db"))
 
 
 def social_media_search(agent: Agent, topic: str, limit: int = 10) -> str:
@@ -33,10 +26,13 @@ def social_media_search(agent: Agent, topic: str, limit: int = 10) -> str:
     print(f"Social Media News Search: {topic}")
     try:
         days_back: int = 7
-        date_from = (datetime.now() - timedelta(days=days_back)).isoformat()
+        date_from = int((datetime.now() - timedelta(days=days_back)).timestamp())
+        match_query = build_match_query([topic])
+        if not match_query:
+            return f"No positive news posts found for '{topic}' in the last {days_back} days."
         with get_social_media_db() as conn:
             cursor = conn.cursor()
-            sql_query = """
+            sql_query = f"""
             SELECT 
                 post_id,
                 user_display_name,
@@ -46,15 +42,14 @@ def social_media_search(agent: Agent, topic: str, limit: int = 10) -> str:
                 platform
             FROM posts 
             WHERE 
-                categories LIKE '%"news"%' 
+                post_id IN (SELECT post_id FROM post_categories WHERE category = 'news')
                 AND sentiment = 'positive'
-                AND datetime(post_timestamp) >= datetime(?)
-                AND (post_text LIKE ? OR user_display_name LIKE ?)
-            ORDER BY datetime(post_timestamp) DESC
+                AND post_ts >= ?
+                AND {POST_MATCH_SQL}
+            ORDER BY post_ts DESC
             LIMIT ?
             """
-            search_term = f"%{topic}%"
-            cursor.execute(sql_query, (date_from, search_term, search_term, limit))
+            cursor.execute(sql_query, (date_from, match_query, limit))
             rows = cursor.fetchall()
             if not rows:
                 return f"No positive news posts found for '{topic}' in the last {days_back} days."
@@ -79,8 +74,8 @@ def social_media_search(agent: Agent, topic: str, limit: int = 10) -> str:
 def social_media_trending_search(agent: Agent, limit: int = 10) -> str:
     """
     Get trending positive news posts from social media.
-    Returns trending news posts in standard results format.
-
+    Returns trending news posts in standard results format, ranked by engagement
+    velocity so posts gaining likes, retweets and replies fastest come first.
 
     Args:
         agent: The agent instance
@@ -92,7 +87,7 @@ def social_media_trending_search(agent: Agent, limit: int = 10) -> str:
     print(f"Social Media Trending Search: {limit}")
     days_back = 3
     try:
-        date_from = (datetime.now() - timedelta(days=days_back)).isoformat()
+        date_from = int((datetime.now() - timedelta(days=days_back)).timestamp())
         with get_social_media_db() as conn:
             cursor = conn.cursor()
             trending_sql = """
@@ -105,14 +100,11 @@ def social_media_trending_search(agent: Agent, limit: int = 10) -> str:
                 platform
             FROM posts
             WHERE 
-                categories LIKE '%"news"%'
+                post_id IN (SELECT post_id FROM post_categories WHERE category = 'news')
                 AND sentiment = 'positive'
-                AND datetime(post_timestamp) >= datetime(?)
-            ORDER BY 
-                (COALESCE(engagement_like_count, 0) + 
-                 COALESCE(engagement_retweet_count, 0) + 
-                 COALESCE(engagement_reply_count, 0)) DESC,
-                datetime(post_timestamp) DESC
+                AND trending_score IS NOT NULL
+                AND +post_ts >= ?
+            ORDER BY trending_score DESC
             LIMIT ?
             """
             cursor.execute(trending_sql, (date_from, limit))
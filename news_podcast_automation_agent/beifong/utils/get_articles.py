@@ -1,10 +1,22 @@
 import sqlite3
 import openai
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any
+from db.config import get_sources_db_path
+from db.connection import attach_database
+from db.fts import ARTICLE_MATCH_SQL, build_match_query
+from db.loaders import load_article_categories
+from db.timestamps import to_epoch
 
 TOPIC_EXTRACTION_MODEL = "gpt-4o-mini"
+# Name of the article's source, else of its feed's source, from the attached sources database
+SOURCE_NAME_SQL = "COALESCE(s.name, fs.name, 'Unknown Source') AS source_name"
+SOURCE_JOINS = """
+LEFT JOIN sources.sources s ON s.id = ca.source_id
+LEFT JOIN sources.source_feeds sf ON sf.id = ca.feed_id
+LEFT JOIN sources.sources fs ON fs.id = sf.source_id
+"""
 
 
 def extract_search_terms(prompt: str, api_key: str, max_terms: int = 10) -> list:
@@ -46,7 +58,7 @@ def search_articles(
     fallback_to_broader: bool = True,
 ) -> List[Dict[str, Any]]:
     if from_date is None:
-        from_date = (datetime.now() - timedelta(hours=48)).isoformat()
+        from_date = (datetime.now(timezone.utc) - timedelta(hours=48)).isoformat()
     terms = extract_search_terms(prompt, api_key)
     if not terms:
         return []
@@ -56,6 +68,7 @@ def search_articles(
     cursor = conn.cursor()
     results = []
     try:
+        attach_database(conn, "sources", get_sources_db_path())
         results = _execute_search(cursor, terms, from_date, operator, limit, use_categories)
         if fallback_to_broader and len(results) < min(5, limit):
             print(f"Initial search returned only {len(results)} results. Trying broader search...")
@@ -71,10 +84,9 @@ def search_articles(
                 if len(broader_results) > len(results):
                     print(f"Broader search found {len(broader_results)} results")
                     results = broader_results
-        if results:
-            _add_source_names(cursor, results)
+        categories = _get_categories_for_articles(cursor, [article["id"] for article in results])
         for article in results:
-            article["categories"] = _get_article_categories(cursor, article["id"])
+            article["categories"] = categories.get(article["id"], [])
     except Exception as e:
         print(f"Error searching articles: {e}")
     finally:
@@ -99,92 +111,45 @@ def _execute_search(
             from_date = adjusted_date
         except Exception as e:
             print(f"Warning: Could not adjust date with fallback: {e}")
-    base_query = """
+    base_query = f"""
         SELECT DISTINCT ca.id, ca.title, ca.url, ca.published_date, ca.summary as content, 
-               ca.source_id, ca.feed_id
+               ca.source_id, ca.feed_id, {SOURCE_NAME_SQL}
         FROM crawled_articles ca
-        WHERE ca.processed = 1 AND ca.published_date >= ?
+        {SOURCE_JOINS}
+        WHERE ca.processed = 1 AND ca.published_ts >= ?
     """
     if use_categories:
-        base_query = """
+        base_query = f"""
             SELECT DISTINCT ca.id, ca.title, ca.url, ca.published_date, ca.summary as content,
-                   ca.source_id, ca.feed_id
+                   ca.source_id, ca.feed_id, {SOURCE_NAME_SQL}
             FROM crawled_articles ca
+            {SOURCE_JOINS}
             LEFT JOIN article_categories ac ON ca.id = ac.article_id
-            WHERE ca.processed = 1 AND ca.published_date >= ?
+            WHERE ca.processed = 1 AND ca.published_ts >= ?
         """
-    clauses, params = [], [from_date]
+    clauses, params = [], [to_epoch(from_date) or 0]
     for term in terms:
         term_clauses = []
-        like = f"%{term}%"
-        term_clauses.append("(ca.title LIKE ? OR ca.content LIKE ? OR ca.summary LIKE ?)")
-        params.extend([like, like, like])
+        match_query = build_match_query([term])
+        if match_query:
+            term_clauses.append(f"({ARTICLE_MATCH_SQL})")
+            params.append(match_query)
         if use_categories:
             term_clauses.append("(ac.category_name LIKE ?)")
-            params.append(like)
+            params.append(f"%{term}%")
         if term_clauses:
             clauses.append(f"({' OR '.join(term_clauses)})")
+    if not clauses:
+        return []
     where = f" {operator} ".join(clauses)
-    sql = f"{base_query} AND ({where}) ORDER BY ca.published_date DESC LIMIT {limit}"
+    sql = f"{base_query} AND ({where}) ORDER BY ca.published_ts DESC LIMIT {limit}"
     cursor.execute(sql, params)
     return [dict(row) for row in cursor.fetchall()]
 
 
-def _add_source_names(cursor, articles):
-    source_ids = {a.get("source_id") for a in articles if a.get("source_id")}
-    feed_ids = {a.get("feed_id") for a in articles if a.get("feed_id")}
-    if not source_ids and not feed_ids:
-        return
-    source_names = {}
-    if source_ids:
-        source_ids = [id for id in source_ids if id is not None]
-        if source_ids:
-            placeholders = ",".join(["?"] * len(source_ids))
-            try:
-                cursor.execute(
-                    f"SELECT id, name FROM sources WHERE id IN ({placeholders})",
-                    list(source_ids),
-                )
-                for row in cursor.fetchall():
-                    source_names[row["id"]] = row["name"]
-            except Exception as e:
-                print(f"Error fetching source names: {e}")
-    if feed_ids:
-        feed_ids = [id for id in feed_ids if id is not None]
-        if feed_ids:
-            placeholders = ",".join(["?"] * len(feed_ids))
-            try:
-                cursor.execute(
-                    f"""
-                    SELECT sf.id, s.name 
-                    FROM source_feeds sf
-                    JOIN sources s ON sf.source_id = s.id
-                    WHERE sf.id IN ({placeholders})
-                """,
-                    list(feed_ids),
-                )
-                for row in cursor.fetchall():
-                    source_names[row["id"]] = row["name"]
-            except Exception as e:
-                print(f"Error fetching feed source names: {e}")
-    for article in articles:
-        source_id = article.get("source_id")
-        feed_id = article.get("feed_id")
-        if source_id and source_id in source_names:
-            article["source_name"] = source_names[source_id]
-        elif feed_id and feed_id in source_names:
-            article["source_name"] = source_names[feed_id]
-        else:
-            article["source_name"] = "Unknown Source"
-
-
-def _get_article_categories(cursor, article_id):
+def _get_categories_for_articles(cursor, article_ids):
     try:
-        cursor.execute(
-            "SELECT category_name FROM article_categories WHERE article_id = ?",
-            (article_id,),
-        )
-        return [row["category_name"] for row in cursor.fetchall()]
+        return load_article_categories(cursor.connection, article_ids)
     except Exception as e:
         print(f"Error fetching article categories: {e}")
-        return []
+        return {}